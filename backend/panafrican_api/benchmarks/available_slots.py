@@ -0,0 +1,101 @@
+"""
+Benchmark du calcul des créneaux libres d'un mentor.
+
+Compare, sur des périodes de plus en plus longues, l'algorithme d'origine
+de `get_available_slots` (parcours de chaque pas de 30 minutes, clés
+`strftime`, sessions découpées en pas de 30 minutes) et le calcul par
+intervalles de services/slots.py, avec l'agenda par défaut
+(lundi-vendredi, 9h-12h et 14h-18h) et `--bookings` sessions par jour.
+
+Usage (depuis le dossier panafrican_api) :
+    python benchmarks/available_slots.py --days 7 30 90 365 --bookings 3
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+from datetime import datetime, time, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services import slots  # noqa: E402
+from src.services.slots import AvailabilityWindow  # noqa: E402
+
+WEEKLY_SCHEDULE = [
+    AvailabilityWindow(day, start, end)
+    for day in range(5)
+    for start, end in ((time(9, 0), time(12, 0)), (time(14, 0), time(18, 0)))
+]
+
+
+class Booking:
+    def __init__(self, session_date, duration_minutes):
+        self.session_date = session_date
+        self.duration_minutes = duration_minutes
+
+
+def make_bookings(start, days, per_day, rng):
+    bookings = []
+    for day in range(days):
+        for _ in range(per_day):
+            minute = rng.choice([9 * 60, 10 * 60 + 10, 14 * 60 + 30, 16 * 60 + 45])
+            bookings.append(Booking(start + timedelta(days=day, minutes=minute), rng.choice([30, 60])))
+    return bookings
+
+
+def legacy_slots(availabilities, bookings, start_date, days, duration):
+    booked = set()
+    for session in bookings:
+        session_end = session.session_date + timedelta(minutes=session.duration_minutes)
+        current = session.session_date
+        while current < session_end:
+            booked.add(current.strftime('%Y-%m-%d %H:%M'))
+            current += timedelta(minutes=30)
+
+    available = []
+    for day_offset in range(days):
+        current_date = start_date.date() + timedelta(days=day_offset)
+        for availability in [av for av in availabilities if av.day_of_week == current_date.weekday()]:
+            current = datetime.combine(current_date, availability.start_time)
+            end = datetime.combine(current_date, availability.end_time)
+            while current + timedelta(minutes=duration) <= end:
+                if current > start_date and current.strftime('%Y-%m-%d %H:%M') not in booked:
+                    available.append(current)
+                current += timedelta(minutes=30)
+    return available
+
+
+def interval_slots(availabilities, bookings, start_date, days, duration):
+    start = slots.to_minutes(start_date)
+    end = start + days * slots.MINUTES_PER_DAY
+    free = slots.free_intervals(availabilities, slots.session_intervals(bookings), start + 1, end)
+    return list(slots.slot_starts(free, duration, 30))
+
+
+def measure(fn, *args, repeat=5):
+    runs = max(1, int(0.2 / max(timeit.timeit(lambda: fn(*args), number=1), 1e-6)))
+    return min(timeit.repeat(lambda: fn(*args), number=runs, repeat=repeat)) / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark du calcul des créneaux libres')
+    parser.add_argument('--days', type=int, nargs='+', default=[7, 30, 90, 365])
+    parser.add_argument('--bookings', type=int, default=3, help='Sessions réservées par jour.')
+    parser.add_argument('--duration', type=int, default=60)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    start_date = datetime(2025, 1, 6, 8, 0)
+    print(f"{'jours':>6} {'créneaux':>9} {'origine':>12} {'intervalles':>12} {'gain':>7}")
+    for days in args.days:
+        bookings = make_bookings(start_date, days, args.bookings, rng)
+        slot_count = len(interval_slots(WEEKLY_SCHEDULE, bookings, start_date, days, args.duration))
+        legacy = measure(legacy_slots, WEEKLY_SCHEDULE, bookings, start_date, days, args.duration)
+        current = measure(interval_slots, WEEKLY_SCHEDULE, bookings, start_date, days, args.duration)
+        print(f"{days:>6} {slot_count:>9} {legacy * 1000:>10.2f}ms {current * 1000:>10.2f}ms {legacy / current:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""
+Benchmark du hachage des mots de passe sous eventlet, avec et sans pool.
+
+Pour chaque mode, un serveur eventlet (`socketio.run`, comme main.py) est
+lancé sur une base temporaire contenant `--users` comptes ; des threads
+enchaînent les connexions (`POST /api/auth/login`) pendant qu'une sonde
+interroge en continu une route bon marché (`GET /api/questions/stats`).
+
+- `pool` : hachage dans le pool borné de threads natifs (services/hashing.py) ;
+- `inline` : hachage directement dans le greenlet de la requête (comportement
+  d'origine), qui bloque le hub eventlet pendant chaque calcul.
+
+Affiche les connexions par seconde, les latences de connexion et surtout
+les latences vues par la sonde (les autres routes) dans chaque mode.
+
+Usage (depuis le dossier panafrican_api) :
+    pip install -r requirements-dev.txt
+    python benchmarks/password_hashing.py --duration 10 --concurrency 16
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PASSWORD = 'bench-password'
+
+
+def serve(args):
+    import eventlet
+    eventlet.monkey_patch()
+
+    sys.path.insert(0, BASE_DIR)
+    os.environ['DATABASE_URL'] = f'sqlite:///{args.db}'
+    from werkzeug.security import generate_password_hash
+    from src import create_app, socketio
+    from src.models.user import db, User
+    from src.schema import upgrade_schema
+    from src.services import hashing
+
+    if args.mode == 'inline':
+        hashing.hashing_pool.run = lambda fn, *fn_args: fn(*fn_args)
+
+    app = create_app()
+    with app.app_context():
+        upgrade_schema()
+        if User.query.count() < args.users:
+            password_hash = generate_password_hash(PASSWORD)
+            db.session.add_all([
+                User(username=f'bench{i}', email=f'bench{i}@example.org', password_hash=password_hash,
+                     first_name='Bench', last_name=str(i), country='SN')
+                for i in range(args.users)
+            ])
+            db.session.commit()
+    socketio.run(app, host='127.0.0.1', port=args.port, debug=False, log_output=False)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Serveur injoignable : {url}')
+
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_load(base_url, users, duration, concurrency):
+    logins, rejected, probes = [], [0], []
+    stop = time.monotonic() + duration
+
+    def login_worker(index):
+        http = requests.Session()
+        i = index
+        while time.monotonic() < stop:
+            started = time.monotonic()
+            response = http.post(f'{base_url}/api/auth/login',
+                                 json={'username': f'bench{i % users}', 'password': PASSWORD})
+            if response.status_code == 200:
+                logins.append(time.monotonic() - started)
+            elif response.status_code == 503:
+                rejected[0] += 1
+            i += concurrency
+
+    def probe_worker():
+        http = requests.Session()
+        while time.monotonic() < stop:
+            started = time.monotonic()
+            http.get(f'{base_url}/api/questions/stats')
+            probes.append(time.monotonic() - started)
+            time.sleep(0.02)
+
+    threads = [threading.Thread(target=login_worker, args=(i,)) for i in range(concurrency)]
+    threads.append(threading.Thread(target=probe_worker))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return logins, rejected[0], probes
+
+
+def bench(mode, args):
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        server = subprocess.Popen(
+            [sys.executable, __file__, '--serve', '--mode', mode, '--port', str(port),
+             '--db', os.path.join(tmp, 'bench.db'), '--users', str(args.users)],
+            cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            base_url = f'http://127.0.0.1:{port}'
+            wait_ready(f'{base_url}/api/questions/stats')
+            logins, rejected, probes = run_load(base_url, args.users, args.duration, args.concurrency)
+        finally:
+            server.terminate()
+            server.wait()
+
+    ms = lambda seconds: seconds * 1000
+    print(f"[{mode}] {len(logins) / args.duration:.1f} connexions/s, {rejected} rejet(s) 503")
+    print(f"    connexion : p50 {ms(percentile(logins, 0.5)):.0f} ms, p99 {ms(percentile(logins, 0.99)):.0f} ms")
+    print(f"    autres routes : p50 {ms(percentile(probes, 0.5)):.1f} ms, p99 {ms(percentile(probes, 0.99)):.1f} ms, "
+          f"max {ms(max(probes)) if probes else float('nan'):.1f} ms, moyenne {ms(statistics.fmean(probes)) if probes else float('nan'):.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark du hachage des mots de passe')
+    parser.add_argument('--duration', type=float, default=10, help='Durée de chaque mode (secondes).')
+    parser.add_argument('--concurrency', type=int, default=16, help='Connexions simultanées.')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--mode', choices=['pool', 'inline'], action='append',
+                        help='Mode(s) à mesurer (par défaut : les deux).')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        args.mode = args.mode[0]
+        serve(args)
+        return
+    for mode in args.mode or ['pool', 'inline']:
+        bench(mode, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+"""
+Benchmark de la diffusion Socket.IO vers des milliers de sockets répartis
+sur plusieurs workers.
+
+Démarre socketio_queue_server.py (ou utilise `--queue redis://...`) et
+`--workers` workers `python -m src.main` sur une base temporaire contenant
+`--clients` comptes. Des processus clients (eventlet, `--client-processes`)
+ouvrent une connexion WebSocket authentifiée par compte, réparties à tour
+de rôle sur les workers. Le benchmark publie ensuite `--events` événements
+dans la file de messages depuis un processus externe (émetteur
+Flask-SocketIO en écriture seule, comme le ferait un worker) : chaque
+worker les relaie à ses propres sockets.
+
+Affiche les livraisons reçues / attendues, les messages diffusés par
+seconde et la latence entre la publication et la réception, au total et
+par worker.
+
+Usage (depuis le dossier panafrican_api) :
+    pip install -r requirements-dev.txt
+    python benchmarks/socketio_fanout.py --clients 1000 --workers 2
+    python benchmarks/socketio_fanout.py --clients 10000 --workers 4 --client-processes 8
+
+Chaque socket occupe un descripteur de fichier côté client et côté worker :
+relever `ulimit -n` au besoin. Les workers acceptent `--clients` connexions
+chacun (MAX_CONNECTIONS, voir src/main.py).
+"""
+
+import argparse
+import datetime
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+EVENT = 'bench_fanout'
+
+
+def run_clients(args):
+    """Processus client : connecter les sockets, attendre GO, compter les réceptions."""
+    import eventlet
+    eventlet.monkey_patch()
+    from eventlet import tpool
+    import socketio
+
+    with open(args.tokens) as tokens_file:
+        tokens = json.load(tokens_file)[args.offset:args.offset + args.count]
+    ports = [int(port) for port in args.ports.split(',')]
+    latencies = {port: [] for port in ports}
+    last_received = [0.0]
+    clients, failed = [], [0]
+
+    def on_event(port):
+        def handler(data):
+            now = time.time()
+            latencies[port].append(now - data['sent'])
+            last_received[0] = max(last_received[0], now)
+        return handler
+
+    def connect(index, token):
+        port = ports[(args.offset + index) % len(ports)]
+        client = socketio.Client(reconnection=False)
+        client.on(EVENT, on_event(port))
+        try:
+            client.connect(f'http://127.0.0.1:{port}', auth={'token': token},
+                           transports=['websocket'], wait_timeout=60)
+            clients.append(client)
+        except Exception:
+            failed[0] += 1
+
+    pool = eventlet.GreenPool(args.connect_concurrency)
+    for index, token in enumerate(tokens):
+        pool.spawn_n(connect, index, token)
+    pool.waitall()
+    print(json.dumps({'ready': len(clients), 'failed': failed[0]}), flush=True)
+
+    # Lecture bloquante de stdin hors du hub pour ne pas geler les sockets
+    tpool.execute(sys.stdin.readline)
+    expected = args.events * len(clients)
+    deadline = time.monotonic() + args.timeout
+    while sum(map(len, latencies.values())) < expected and time.monotonic() < deadline:
+        eventlet.sleep(0.05)
+
+    print(json.dumps({'latencies': {str(port): values for port, values in latencies.items()},
+                      'last_received': last_received[0]}), flush=True)
+    for client in clients:
+        client.disconnect()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(url, timeout=60):
+    import requests
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Worker injoignable : {url}')
+
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def create_users(count, tokens_path):
+    """Créer `count` comptes dans la base DATABASE_URL ; écrire leurs jetons."""
+    import jwt
+    from src import create_app
+    from src.models.user import db, User
+    from src.schema import upgrade_schema
+
+    app = create_app()
+    with app.app_context():
+        upgrade_schema()
+        db.session.execute(db.insert(User), [
+            dict(username=f'fanout{i}', email=f'fanout{i}@example.org', password_hash='-',
+                 first_name='Fanout', last_name=str(i), country='SN')
+            for i in range(count)
+        ])
+        db.session.commit()
+        user_ids = db.session.scalars(db.select(User.id).where(User.username.like('fanout%'))).all()
+
+    expires = datetime.datetime.utcnow() + datetime.timedelta(days=1)
+    tokens = [jwt.encode({'user_id': user_id, 'exp': expires}, app.config['SECRET_KEY'], algorithm='HS256')
+              for user_id in user_ids]
+    with open(tokens_path, 'w') as tokens_file:
+        json.dump(tokens, tokens_file)
+
+
+def start(args, env=None):
+    return subprocess.Popen([sys.executable] + args, cwd=BASE_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def bench(args):
+    _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    sys.path.insert(0, BASE_DIR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'fanout.db')}"
+        tokens_path = os.path.join(tmp, 'tokens.json')
+        create_users(args.clients, tokens_path)
+
+        processes = []
+        try:
+            queue_url = args.queue
+            if not queue_url:
+                queue_port = free_port()
+                processes.append(start(['socketio_queue_server.py', '--port', str(queue_port)]))
+                queue_url = f'redis://127.0.0.1:{queue_port}/0'
+
+            ports = [free_port() for _ in range(args.workers)]
+            for port in ports:
+                processes.append(start(['-m', 'src.main'], dict(
+                    os.environ, PORT=str(port), FLASK_DEBUG='0', BACKGROUND_JOBS='0',
+                    SOCKETIO_MESSAGE_QUEUE=queue_url, SLOT_HOLD_STORE='database',
+                    MAX_CONNECTIONS=str(args.clients + 100)
+                )))
+            for port in ports:
+                wait_ready(f'http://127.0.0.1:{port}/api/questions/stats')
+
+            started = time.monotonic()
+            per_process = -(-args.clients // args.client_processes)
+            clients = [
+                subprocess.Popen(
+                    [sys.executable, __file__, '--client', '--tokens', tokens_path, '--ports', ','.join(map(str, ports)),
+                     '--offset', str(offset), '--count', str(per_process), '--events', str(args.events),
+                     '--timeout', str(args.timeout), '--connect-concurrency', str(args.connect_concurrency)],
+                    cwd=BASE_DIR, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+                )
+                for offset in range(0, args.clients, per_process)
+            ]
+            processes += clients
+            statuses = [json.loads(client.stdout.readline()) for client in clients]
+            connected = sum(status['ready'] for status in statuses)
+            print(f"{connected} sockets connectés sur {args.workers} workers en {time.monotonic() - started:.1f} s"
+                  f" ({sum(status['failed'] for status in statuses)} échec(s))")
+
+            for client in clients:
+                client.stdin.write('GO\n')
+                client.stdin.flush()
+            first_sent = publish(queue_url, args.events, args.interval)
+            results = [json.loads(client.stdout.readline()) for client in clients]
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.wait()
+        os.environ.pop('DATABASE_URL')
+
+    report(args, ports, connected, first_sent, results)
+
+
+def publish(queue_url, events, interval):
+    """Publier `events` événements dans la file, sans application Flask."""
+    from flask_socketio import SocketIO
+    from src import SOCKETIO_CHANNEL
+
+    emitter = SocketIO(message_queue=queue_url, channel=SOCKETIO_CHANNEL)
+    first_sent = time.time()
+    for seq in range(events):
+        emitter.emit(EVENT, {'seq': seq, 'sent': time.time()})
+        time.sleep(interval)
+    return first_sent
+
+
+def report(args, ports, connected, first_sent, results):
+    by_port = {port: [] for port in ports}
+    for result in results:
+        for port, values in result['latencies'].items():
+            by_port[int(port)].extend(values)
+    latencies = [value for values in by_port.values() for value in values]
+    elapsed = max(result['last_received'] for result in results) - first_sent
+
+    ms = lambda seconds: seconds * 1000
+    expected = connected * args.events
+    print(f"{len(latencies)}/{expected} livraisons, {len(latencies) / elapsed if latencies else 0:.0f} messages/s "
+          f"({args.events} événements x {connected} sockets en {elapsed:.2f} s)")
+    print(f"    latence : p50 {ms(percentile(latencies, 0.5)):.0f} ms, p99 {ms(percentile(latencies, 0.99)):.0f} ms, "
+          f"max {ms(max(latencies)) if latencies else float('nan'):.0f} ms")
+    for port, values in by_port.items():
+        print(f"    worker :{port} : {len(values)} livraisons, p99 {ms(percentile(values, 0.99)):.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la diffusion Socket.IO multi-workers')
+    parser.add_argument('--clients', type=int, default=1000, help='Sockets connectés (un compte chacun).')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--events', type=int, default=10, help='Événements diffusés à tous les sockets.')
+    parser.add_argument('--interval', type=float, default=0, help='Secondes entre deux événements (0 : en rafale).')
+    parser.add_argument('--client-processes', type=int, default=2)
+    parser.add_argument('--connect-concurrency', type=int, default=50, help='Connexions ouvertes en parallèle par processus client.')
+    parser.add_argument('--timeout', type=float, default=60, help='Attente maximale des livraisons (secondes).')
+    parser.add_argument('--queue', help='URL Redis existante (par défaut : socketio_queue_server.py).')
+    parser.add_argument('--client', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--tokens', help=argparse.SUPPRESS)
+    parser.add_argument('--ports', help=argparse.SUPPRESS)
+    parser.add_argument('--offset', type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument('--count', type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.client:
+        run_clients(args)
+    else:
+        bench(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,9 @@
 """
-Script pour créer les tables de réservation de sessions.
+Script pour créer les tables de réservation de sessions et mettre à jour
+le schéma d'une base existante (colonnes ajoutées aux modèles).
 Ce script peut être exécuté directement depuis le dossier `panafrican_api`.
+
+Équivalent à `flask --app src upgrade-db`.
 """
 
 import os
@@ -17,27 +20,8 @@ if os.path.basename(os.getcwd()) != 'panafrican_api':
 
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
-from src import create_app, db
-
-
-def create_tables():
-    """Créer les nouvelles tables pour les réservations"""
-
-    app = create_app()
-    with app.app_context():
-        print("🚀 Création des tables de réservation...\n")
-
-        try:
-            # Créer toutes les tables définies dans les modèles
-            db.create_all()
-            print("✅ Tables créées avec succès !")
-            print("   - mentor_availability")
-            print("   - mentor_session")
-
-        except Exception as e:
-            print(f"❌ Erreur lors de la création des tables: {str(e)}")
-            raise
+from src.commands import run_command
 
 
 if __name__ == '__main__':
-    create_tables()
+    run_command('upgrade-db', sys.argv[1:])
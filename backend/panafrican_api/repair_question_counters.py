@@ -0,0 +1,27 @@
+"""
+Script pour recalculer les compteurs dénormalisés des questions
+(`answers_count`, `has_accepted_answer`) à partir de la table `answer`.
+Peut être relancé à tout moment ; exécutable depuis le dossier `panafrican_api`.
+
+Équivalent à `flask --app src repair-question-counters`.
+"""
+
+import os
+import sys
+
+# Ensure the package root is on sys.path when running this script directly
+if os.path.basename(os.getcwd()) != 'panafrican_api':
+    try:
+        repo_root = os.path.dirname(__file__)
+        os.chdir(repo_root)
+    except Exception:
+        pass
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.commands import run_command
+
+
+if __name__ == '__main__':
+    print("🔧 Réparation des compteurs de questions...\n")
+    run_command('repair-question-counters')
@@ -0,0 +1,126 @@
+"""
+Lancer plusieurs workers eventlet derrière un routage persistant (sticky).
+
+Chaque worker est un `python -m src.main` sur son propre port ; tous
+partagent la file de messages Socket.IO (`--queue`, ou `--local-queue`
+pour démarrer socketio_queue_server.py), si bien qu'un emit vers la salle
+`user_<id>` atteint l'utilisateur quel que soit le worker auquel il est
+connecté.
+
+Le transport « polling » de Socket.IO envoie plusieurs requêtes HTTP par
+session, qui doivent arriver au même worker : le proxy TCP intégré choisit
+le worker d'après l'adresse IP du client (comme `ip_hash` de nginx). En
+production, préférer nginx (`ip_hash`) devant les workers et un vrai Redis.
+
+Seul le premier worker exécute les tâches de fond (rappels, index) ; les
+blocages de créneaux et la présence en ligne passent en base
+(`SLOT_HOLD_STORE=database`, `PRESENCE_STORE=database`) pour être vus par
+tous les workers.
+
+Usage :
+    python run_workers.py --workers 4 --port 5000 --local-queue
+    python run_workers.py --workers 4 --port 5000 --queue redis://localhost:6379/0
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import zlib
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+
+
+def start_process(args, env):
+    return subprocess.Popen([sys.executable] + args, cwd=BASE_DIR, env=env)
+
+
+def start_workers(count, first_port, queue_url):
+    workers = []
+    for index in range(count):
+        env = dict(os.environ)
+        env.update({
+            'PORT': str(first_port + index),
+            'FLASK_DEBUG': '0',
+            'SOCKETIO_MESSAGE_QUEUE': queue_url,
+            'BACKGROUND_JOBS': '1' if index == 0 else '0',
+        })
+        env.setdefault('SLOT_HOLD_STORE', 'database')
+        env.setdefault('PRESENCE_STORE', 'database')
+        workers.append(start_process(['-m', 'src.main'], env))
+    return workers
+
+
+def pick_backend(peer, ports):
+    """Même client (adresse IP) -> même worker."""
+    host = peer[0] if peer else ''
+    return ports[zlib.crc32(host.encode()) % len(ports)]
+
+
+async def pipe(reader, writer):
+    try:
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def run_proxy(host, port, ports):
+    async def handle(client_reader, client_writer):
+        backend = pick_backend(client_writer.get_extra_info('peername'), ports)
+        try:
+            backend_reader, backend_writer = await asyncio.open_connection('127.0.0.1', backend)
+        except OSError:
+            client_writer.close()
+            return
+        await asyncio.gather(pipe(client_reader, backend_writer), pipe(backend_reader, client_writer))
+
+    server = await asyncio.start_server(handle, host, port)
+    print(f"🔀 Routage sticky sur http://{host}:{port} -> workers {', '.join(map(str, ports))}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lancer plusieurs workers Socket.IO')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000, help='Port public du proxy sticky.')
+    parser.add_argument('--worker-port', type=int, default=5101, help='Port du premier worker.')
+    parser.add_argument('--queue', default=os.environ.get('SOCKETIO_MESSAGE_QUEUE'),
+                        help='URL de la file de messages (redis://...).')
+    parser.add_argument('--local-queue', action='store_true',
+                        help='Démarrer socketio_queue_server.py comme file de messages.')
+    parser.add_argument('--local-queue-port', type=int, default=6380)
+    args = parser.parse_args()
+
+    processes = []
+    queue_url = args.queue
+    if args.local_queue:
+        processes.append(start_process(['socketio_queue_server.py', '--port', str(args.local_queue_port)], dict(os.environ)))
+        queue_url = f'redis://127.0.0.1:{args.local_queue_port}/0'
+    if not queue_url:
+        parser.error('--queue ou --local-queue est requis avec plusieurs workers')
+
+    processes += start_workers(args.workers, args.worker_port, queue_url)
+    ports = [args.worker_port + index for index in range(args.workers)]
+    try:
+        asyncio.run(run_proxy(args.host, args.port, ports))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
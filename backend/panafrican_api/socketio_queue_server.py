@@ -0,0 +1,123 @@
+"""
+Serveur pub/sub minimal parlant le protocole Redis, pour le développement.
+
+Remplace un vrai Redis comme file de messages Socket.IO entre plusieurs
+workers (voir run_workers.py) : seules les commandes utilisées par le
+client Redis de python-socketio sont gérées (HELLO, SUBSCRIBE,
+UNSUBSCRIBE, PUBLISH, PING), en RESP2 comme en RESP3 ; les autres
+répondent +OK. Aucune persistance, aucune
+sécurité : ne pas l'utiliser en production.
+
+Usage : python socketio_queue_server.py [--host 127.0.0.1] [--port 6380]
+"""
+
+import argparse
+import asyncio
+
+
+class PubSubServer:
+    def __init__(self):
+        # canal -> {flux abonné: protocole RESP3 ?}
+        self.channels = {}
+
+    async def handle(self, reader, writer):
+        subscriptions = set()
+        resp3 = False
+        try:
+            while True:
+                command = await read_command(reader)
+                if command is None:
+                    break
+                if not command:
+                    continue
+                name = command[0].upper()
+                if name == b'HELLO':
+                    resp3 = len(command) > 1 and command[1] == b'3'
+                    info = [b'server', b'redis', b'version', b'7.0.0', b'proto', 3 if resp3 else 2,
+                            b'id', id(writer), b'mode', b'standalone', b'role', b'master', b'modules', []]
+                    if resp3:
+                        writer.write(b'%%%d\r\n' % (len(info) // 2) + b''.join(encode(item) for item in info))
+                    else:
+                        writer.write(encode(info))
+                elif name == b'SUBSCRIBE':
+                    for channel in command[1:]:
+                        subscriptions.add(channel)
+                        self.channels.setdefault(channel, {})[writer] = resp3
+                        writer.write(encode([b'subscribe', channel, len(subscriptions)], push=resp3))
+                elif name == b'UNSUBSCRIBE':
+                    for channel in command[1:] or list(subscriptions):
+                        subscriptions.discard(channel)
+                        self.channels.get(channel, {}).pop(writer, None)
+                        writer.write(encode([b'unsubscribe', channel, len(subscriptions)], push=resp3))
+                elif name == b'PUBLISH' and len(command) == 3:
+                    _, channel, payload = command
+                    subscribers = self.channels.get(channel, {})
+                    message = [b'message', channel, payload]
+                    for subscriber, push in subscribers.items():
+                        subscriber.write(encode(message, push=push))
+                    writer.write(encode(len(subscribers)))
+                elif name == b'PING':
+                    if subscriptions:
+                        writer.write(encode([b'pong', command[1] if len(command) > 1 else b''], push=resp3))
+                    else:
+                        writer.write(b'+PONG\r\n')
+                elif name == b'QUIT':
+                    writer.write(b'+OK\r\n')
+                    break
+                else:
+                    writer.write(b'+OK\r\n')
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for channel in subscriptions:
+                self.channels.get(channel, {}).pop(writer, None)
+            writer.close()
+
+
+async def read_command(reader):
+    """Lire une commande (tableau RESP ou commande en ligne) ; None en fin de flux."""
+    line = await reader.readline()
+    if not line:
+        return None
+    line = line.rstrip(b'\r\n')
+    if not line.startswith(b'*'):
+        return line.split()
+    arguments = []
+    for _ in range(int(line[1:])):
+        header = await reader.readline()
+        length = int(header.rstrip(b'\r\n')[1:])
+        data = await reader.readexactly(length + 2)
+        arguments.append(data[:-2])
+    return arguments
+
+
+def encode(value, push=False):
+    """Encoder une réponse ; `push` : message pub/sub d'un client RESP3."""
+    if isinstance(value, int):
+        return b':%d\r\n' % value
+    if isinstance(value, bytes):
+        return b'$%d\r\n%s\r\n' % (len(value), value)
+    return (b'>' if push else b'*') + b'%d\r\n' % len(value) + b''.join(encode(item) for item in value)
+
+
+async def serve(host, port):
+    server = await asyncio.start_server(PubSubServer().handle, host, port)
+    print(f"📡 File de messages Socket.IO sur redis://{host}:{port}/0")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6380)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
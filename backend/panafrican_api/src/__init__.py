@@ -2,6 +2,13 @@
 Initialize the panafrican_api package
 """
 import os
+
+if os.environ.get('SOCKETIO_MESSAGE_QUEUE'):
+    # Le client de la file (Redis) doit utiliser les sockets d'eventlet :
+    # patcher avant tout autre import
+    import eventlet
+    eventlet.monkey_patch()
+
 from flask import Flask
 from flask_cors import CORS
 from flask_socketio import SocketIO
@@ -9,6 +16,12 @@ from .models.user import db
 
 __version__ = '0.1.0'
 
+# File de messages partagée entre processus serveur (ex. redis://localhost:6379/0).
+# Sans elle, un emit n'atteint que les clients connectés au même processus :
+# obligatoire dès que plusieurs workers tournent (voir run_workers.py).
+SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE') or None
+SOCKETIO_CHANNEL = os.environ.get('SOCKETIO_CHANNEL', 'panafrican-socketio')
+
 # Use eventlet for async mode (if available) to support real WebSocket upgrades.
 socketio = SocketIO(async_mode='eventlet', cors_allowed_origins="*")
 
@@ -21,14 +34,15 @@ def create_app():
     db_dir = os.path.join(base_dir, 'database')
     os.makedirs(db_dir, exist_ok=True)
     db_path = os.path.join(db_dir, 'app.db')
-    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{db_path}"
+    # DATABASE_URL (comme dans config.py) pointe vers une autre base : tests, benchmarks
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL') or f"sqlite:///{db_path}"
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
     # Allow CORS for API endpoints; be explicit about allowed methods and headers
     CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=True, allow_headers="*", expose_headers=["Content-Type", "Authorization"], methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"])
     db.init_app(app)
     # socketio already configured with cors_allowed_origins; just init with app
-    socketio.init_app(app)
+    socketio.init_app(app, message_queue=SOCKETIO_MESSAGE_QUEUE, channel=SOCKETIO_CHANNEL)
 
     # Create tables if they don't exist and import models so mappers are registered
     # Wrap in try/except: if table creation fails we still want the app to start
@@ -39,12 +53,12 @@ def create_app():
             logging.getLogger().info('SQLAlchemy metadata before create_all: %s', list(db.metadata.tables.keys()))
             # Import all model modules so SQLAlchemy registers every table and
             # foreign key relationships before creating tables.
-            from .models.user import User
-            from .models.message import Message
-            from .models.question import Question, Answer, QuestionVote
-            from .models.mentor import Mentor, MentorshipRequest, MentorAvailability, MentorSession
+            from .models.user import User, SocketPresence, UserPresence
+            from .models.message import Message, Conversation
+            from .models.question import Question, Answer, QuestionVote, AnswerVote
+            from .models.mentor import Mentor, MentorshipRequest, MentorAvailability, MentorSession, MentorSpecialty, MentorFreeInterval, SlotHold, SessionReminder
             from .models.badge import Badge, UserBadge, UserPoints
-            from .models.notification import Notification, Opportunity
+            from .models.notification import Notification, NotificationCounter, Opportunity
         # Table creation is handled by management scripts (create_booking_tables.py)
         # to avoid startup-time issues when models have interdependencies.
         except Exception as e:
@@ -71,6 +85,10 @@ def create_app():
     app.register_blueprint(notifications_bp, url_prefix='/api')
     app.register_blueprint(stats_bp, url_prefix='/api')
 
+    # Commandes de gestion des données (flask --app src <commande>)
+    from .commands import register_commands
+    register_commands(app)
+
     # Ensure Access-Control headers are present for all responses (safe fallback)
     @app.after_request
     def add_cors_headers(response):
@@ -80,3 +98,21 @@ def create_app():
         return response
 
     return app
+
+def start_background_jobs(app):
+    """Démarrer les tâches de fond périodiques du serveur (appelé par main.py)."""
+    from .services.hot_ranking import run_rescore_loop
+    from .services.availability_index import run_index_loop
+    from .services.reminders import run_reminder_loop
+
+    socketio.start_background_task(run_rescore_loop, app, socketio.sleep)
+    socketio.start_background_task(run_index_loop, app, socketio.sleep)
+    socketio.start_background_task(run_reminder_loop, app, socketio.sleep)
+
+def start_invalidation_listener():
+    """S'abonner aux invalidations de cache des autres workers (appelé par
+    main.py dans chaque worker ; sans effet sans file de messages)."""
+    from .services.broadcast import run_listener
+
+    if SOCKETIO_MESSAGE_QUEUE:
+        socketio.start_background_task(run_listener, socketio.sleep)
@@ -0,0 +1,219 @@
+"""Commandes de gestion des données (`flask <commande>`).
+
+Depuis le dossier `panafrican_api` :
+
+    flask --app src upgrade-db
+    flask --app src seed-availabilities --batch-size 5000 --dry-run
+    flask --app src repair-question-counters
+    flask --app src rebuild-mentor-indexes
+    flask --app src rescore-hot
+    flask --app src rebuild-conversations
+    flask --app src repair-unread-counts
+
+Les scripts `create_booking_tables.py` et `init_mentor_availabilities.py`
+appellent les mêmes commandes.
+"""
+import os
+import sys
+from datetime import datetime, time
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import exists, func, insert, literal, select
+
+from .models.user import db
+
+# Disponibilités créées par défaut : du lundi au vendredi, 9h-12h et 14h-18h
+DEFAULT_WEEKLY_SCHEDULE = [
+    (day, start, end)
+    for day in range(5)
+    for start, end in ((time(9, 0), time(12, 0)), (time(14, 0), time(18, 0)))
+]
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+@click.command('upgrade-db')
+@with_appcontext
+def upgrade_db_command():
+    """Créer les tables, ajouter colonnes et index manquants, remplir les
+    données dérivées nouvellement ajoutées."""
+    from .models.mentor import Mentor, MentorSpecialty
+    from .models.message import Conversation, Message
+    from .models.notification import Notification, NotificationCounter
+    from .schema import upgrade_schema
+    from .services.availability_index import rebuild_free_intervals
+    from .services.conversations import rebuild_conversations
+    from .services.hot_ranking import rescore_hot_questions
+    from .services.mentor_search import rebuild_mentor_specialties
+    from .services.notification_counter import repair_unread_counts
+    from .services.question_counters import rebuild_question_counters
+
+    click.echo("🚀 Mise à jour du schéma...\n")
+    added_columns = upgrade_schema()
+    click.echo("✅ Tables à jour")
+    for column in added_columns:
+        click.echo(f"   + colonne {column}")
+
+    # Remplir les compteurs dénormalisés nouvellement ajoutés
+    if any(column.startswith('question.') for column in added_columns):
+        updated = rebuild_question_counters()
+        click.echo(f"✅ Compteurs recalculés pour {updated} question(s)")
+    if 'question.hot_score' in added_columns:
+        rescored, _ = rescore_hot_questions()
+        click.echo(f"✅ Score hot calculé pour {rescored} question(s) récente(s)")
+
+    # Index des spécialités : parsé une fois depuis les blobs JSON
+    if MentorSpecialty.query.first() is None and Mentor.query.first() is not None:
+        inserted = rebuild_mentor_specialties()
+        click.echo(f"✅ Index des spécialités construit ({inserted} entrée(s))")
+
+    # Index des intervalles libres (recherche multi-mentors)
+    intervals = rebuild_free_intervals()
+    db.session.commit()
+    click.echo(f"✅ Index des disponibilités construit ({intervals} intervalle(s) libre(s))")
+
+    # Boîte de réception matérialisée, depuis l'historique des messages
+    if Conversation.query.first() is None and Message.query.first() is not None:
+        conversations = rebuild_conversations()
+        click.echo(f"✅ Table des conversations construite ({conversations} conversation(s))")
+
+    # Compteurs de notifications non lues, depuis les notifications existantes
+    if NotificationCounter.query.first() is None and Notification.query.filter_by(is_read=False).first() is not None:
+        users = repair_unread_counts()
+        click.echo(f"✅ Compteurs de notifications non lues construits ({users} utilisateur(s))")
+
+
+@click.command('seed-availabilities')
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True,
+              help='Nombre de mentors traités par transaction.')
+@click.option('--dry-run', is_flag=True, help="Compter les mentors concernés sans rien écrire.")
+@click.option('--index/--no-index', default=True, show_default=True,
+              help="Mettre à jour l'index des intervalles libres des mentors traités.")
+@with_appcontext
+def seed_availabilities_command(batch_size, dry_run, index):
+    """Ajouter les disponibilités par défaut aux mentors qui n'en ont aucune."""
+    from .models.mentor import Mentor, MentorAvailability
+    from .services.availability_index import rebuild_free_intervals
+
+    # Anti-jointure : mentors sans aucune disponibilité, parcourus par id
+    without_availability = select(Mentor.id).where(
+        ~exists().where(MentorAvailability.mentor_id == Mentor.id)
+    )
+    total = db.session.execute(
+        select(func.count()).select_from(without_availability.subquery())
+    ).scalar()
+    click.echo(f"✅ {total} mentor(s) sans disponibilités")
+    if dry_run or not total:
+        if dry_run:
+            click.echo(f"ℹ️  Simulation : {total * len(DEFAULT_WEEKLY_SCHEDULE)} disponibilité(s) seraient créées")
+        return
+
+    created_at = datetime.utcnow()
+    done = 0
+    last_id = 0
+    while True:
+        mentor_ids = db.session.execute(
+            without_availability.where(Mentor.id > last_id).order_by(Mentor.id).limit(batch_size)
+        ).scalars().all()
+        if not mentor_ids:
+            break
+
+        # Un INSERT ... SELECT par créneau hebdomadaire : les valeurs ne
+        # sont converties qu'une fois par lot, pas une fois par ligne
+        for day, start, end in DEFAULT_WEEKLY_SCHEDULE:
+            db.session.execute(
+                insert(MentorAvailability).from_select(
+                    ['mentor_id', 'day_of_week', 'start_time', 'end_time', 'is_active', 'created_at'],
+                    select(
+                        Mentor.id,
+                        literal(day, MentorAvailability.day_of_week.type),
+                        literal(start, MentorAvailability.start_time.type),
+                        literal(end, MentorAvailability.end_time.type),
+                        literal(True, MentorAvailability.is_active.type),
+                        literal(created_at, MentorAvailability.created_at.type)
+                    ).where(Mentor.id.in_(mentor_ids))
+                )
+            )
+        if index:
+            rebuild_free_intervals(mentor_ids)
+        db.session.commit()
+
+        done += len(mentor_ids)
+        last_id = mentor_ids[-1]
+        click.echo(f"   {done}/{total} mentor(s)")
+
+    click.echo("\n✅ Initialisation terminée avec succès !")
+
+
+@click.command('repair-question-counters')
+@with_appcontext
+def repair_question_counters_command():
+    """Recalculer les compteurs dénormalisés de toutes les questions."""
+    from .schema import upgrade_schema
+    from .services.question_counters import rebuild_question_counters
+
+    # S'assurer que les colonnes existent sur une ancienne base
+    upgrade_schema()
+    updated = rebuild_question_counters()
+    click.echo(f"✅ Compteurs recalculés pour {updated} question(s)")
+
+
+@click.command('rebuild-mentor-indexes')
+@with_appcontext
+def rebuild_mentor_indexes_command():
+    """Reconstruire l'index des spécialités et celui des intervalles libres."""
+    from .services.availability_index import rebuild_free_intervals
+    from .services.mentor_search import rebuild_mentor_specialties
+
+    inserted = rebuild_mentor_specialties()
+    click.echo(f"✅ Index des spécialités reconstruit ({inserted} entrée(s))")
+    intervals = rebuild_free_intervals()
+    db.session.commit()
+    click.echo(f"✅ Index des disponibilités reconstruit ({intervals} intervalle(s) libre(s))")
+
+
+@click.command('rescore-hot')
+@with_appcontext
+def rescore_hot_command():
+    """Recalculer les scores « hot » des questions récentes."""
+    from .services.hot_ranking import rescore_hot_questions
+
+    rescored, expired = rescore_hot_questions()
+    click.echo(f"✅ {rescored} question(s) recalculée(s), {expired} sortie(s) de la fenêtre")
+
+
+@click.command('rebuild-conversations')
+@with_appcontext
+def rebuild_conversations_command():
+    """Reconstruire la table des conversations depuis les messages."""
+    from .services.conversations import rebuild_conversations
+
+    conversations = rebuild_conversations()
+    click.echo(f"✅ Table des conversations reconstruite ({conversations} conversation(s))")
+
+
+@click.command('repair-unread-counts')
+@with_appcontext
+def repair_unread_counts_command():
+    """Recalculer les compteurs de notifications non lues depuis les notifications."""
+    from .services.notification_counter import repair_unread_counts
+
+    users = repair_unread_counts()
+    click.echo(f"✅ Compteurs de notifications non lues recalculés ({users} utilisateur(s))")
+
+
+def register_commands(app):
+    for command in (upgrade_db_command, seed_availabilities_command, repair_question_counters_command,
+                    rebuild_mentor_indexes_command, rescore_hot_command, rebuild_conversations_command,
+                    repair_unread_counts_command):
+        app.cli.add_command(command)
+
+
+def run_command(command_name, args=None):
+    """Exécuter une commande depuis un script Python (`python script.py ...`)."""
+    from . import create_app
+
+    app = create_app()
+    with app.app_context():
+        app.cli.main(args=[command_name] + list(args or []), prog_name=os.path.basename(sys.argv[0]))
@@ -3,20 +3,27 @@
 This file intentionally keeps the process simple: import the app factory
 and socketio object from the package root and run the server. Avoids
 manipulating sys.path here.
+
+Variables d'environnement (positionnées par run_workers.py pour chaque
+worker) : PORT, FLASK_DEBUG, BACKGROUND_JOBS (0 pour ne pas lancer les
+tâches de fond) et SOCKETIO_MESSAGE_QUEUE. MAX_CONNECTIONS fixe le nombre
+de connexions simultanées par worker (1024 par défaut, limite d'eventlet ;
+chaque socket WebSocket en occupe une).
 """
+import os
 
 try:
     # Preferred when running as package: python -m src.main
-    from . import create_app, socketio
+    from . import create_app, socketio, start_background_jobs, start_invalidation_listener
 except Exception:
     # Fallback when running as script: python src/main.py
     # Ensure the package parent directory is on sys.path so `import src` works
-    import os, sys
+    import sys
     package_parent = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
     if package_parent not in sys.path:
         sys.path.insert(0, package_parent)
     try:
-        from src import create_app, socketio
+        from src import create_app, socketio, start_background_jobs, start_invalidation_listener
     except ModuleNotFoundError as e:
         missing = str(e)
         # Helpful message when dependencies (like Flask) are missing in system Python
@@ -32,5 +39,10 @@ except Exception:
 
 if __name__ == '__main__':
     app = create_app()
+    start_invalidation_listener()
+    if os.environ.get('BACKGROUND_JOBS', '1') == '1':
+        start_background_jobs(app)
     # Allow Werkzeug in this development environment. In production, use a proper WSGI server.
-    socketio.run(app, host='0.0.0.0', port=5000, debug=True, allow_unsafe_werkzeug=True)
\ No newline at end of file
+    socketio.run(app, host='0.0.0.0', port=int(os.environ.get('PORT', 5000)),
+                 debug=os.environ.get('FLASK_DEBUG', '1') == '1', allow_unsafe_werkzeug=True,
+                 max_size=int(os.environ.get('MAX_CONNECTIONS', 1024)))
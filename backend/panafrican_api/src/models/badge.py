@@ -10,6 +10,7 @@ class Badge(db.Model):
     criteria = db.Column(db.Text, nullable=False)  # JSON string des critères
     points_required = db.Column(db.Integer, nullable=False)
     category = db.Column(db.String(50), nullable=False)  # contribution, mentorship, learning
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1', onupdate=db.text('version + 1'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def to_dict(self):
@@ -33,6 +34,10 @@ class UserBadge(db.Model):
     # Relations
     user = db.relationship('User', backref='user_badges')
     badge = db.relationship('Badge', backref='badge_users')
+
+    __table_args__ = (
+        db.Index('ix_user_badge_user_id_earned_at', 'user_id', 'earned_at'),
+    )
     
     def to_dict(self):
         return {
@@ -54,6 +59,14 @@ class UserPoints(db.Model):
     
     # Relation
     user = db.relationship('User', backref='points', uselist=False)
+
+    # Un index par classement du leaderboard
+    __table_args__ = (
+        db.Index('ix_user_points_total_points', 'total_points'),
+        db.Index('ix_user_points_contribution_points', 'contribution_points'),
+        db.Index('ix_user_points_mentorship_points', 'mentorship_points'),
+        db.Index('ix_user_points_learning_points', 'learning_points'),
+    )
     
     def to_dict(self):
         return {
@@ -14,10 +14,16 @@ class Mentor(db.Model):
     rating = db.Column(db.Float, default=0.0)
     total_sessions = db.Column(db.Integer, default=0)
     is_available = db.Column(db.Boolean, default=True)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1', onupdate=db.text('version + 1'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relation avec l'utilisateur
     user = db.relationship('User', backref='mentor_profile', lazy=True)
+
+    __table_args__ = (
+        db.Index('ix_mentor_user_id', 'user_id'),
+        db.Index('ix_mentor_is_available_rating', 'is_available', 'rating'),
+    )
     
     def to_dict(self):
         return {
@@ -47,6 +53,11 @@ class MentorshipRequest(db.Model):
     # Relations
     student = db.relationship('User', foreign_keys=[student_id], backref='mentorship_requests')
     mentor = db.relationship('Mentor', backref='requests')
+
+    __table_args__ = (
+        db.Index('ix_mentorship_request_mentor_id_created_at', 'mentor_id', 'created_at'),
+        db.Index('ix_mentorship_request_student_id_created_at', 'student_id', 'created_at'),
+    )
     
     def to_dict(self):
         return {
@@ -60,6 +71,22 @@ class MentorshipRequest(db.Model):
             'created_at': self.created_at.isoformat()
         }
 
+# Index normalisé des spécialités (une ligne par mentor et par spécialité),
+# tenu à jour depuis Mentor.specialties (voir services/mentor_search.py)
+class MentorSpecialty(db.Model):
+    __tablename__ = 'mentor_specialty'
+    id = db.Column(db.Integer, primary_key=True)
+    mentor_id = db.Column(db.Integer, db.ForeignKey('mentor.id'), nullable=False)
+    specialty_slug = db.Column(db.String(200), nullable=False)
+
+    # Relation
+    mentor = db.relationship('Mentor', backref=db.backref('specialty_index', lazy=True, cascade='all, delete-orphan'))
+
+    __table_args__ = (
+        db.UniqueConstraint('mentor_id', 'specialty_slug', name='uix_mentor_specialty'),
+        db.Index('ix_mentor_specialty_slug_mentor_id', 'specialty_slug', 'mentor_id'),
+    )
+
 # Modèle pour les disponibilités des mentors
 class MentorAvailability(db.Model):
     __tablename__ = 'mentor_availability'
@@ -73,6 +100,10 @@ class MentorAvailability(db.Model):
     
     # Relation
     mentor = db.relationship('Mentor', backref='availabilities')
+
+    __table_args__ = (
+        db.Index('ix_mentor_availability_mentor_id_is_active', 'mentor_id', 'is_active'),
+    )
     
     def to_dict(self):
         return {
@@ -86,6 +117,47 @@ class MentorAvailability(db.Model):
             'created_at': self.created_at.isoformat()
         }
 
+# Index des intervalles libres des mentors (disponibilités moins sessions
+# réservées), en minutes depuis l'époque ; maintenu par
+# services/availability_index.py
+class MentorFreeInterval(db.Model):
+    __tablename__ = 'mentor_free_interval'
+    id = db.Column(db.Integer, primary_key=True)
+    mentor_id = db.Column(db.Integer, db.ForeignKey('mentor.id'), nullable=False)
+    start_minute = db.Column(db.Integer, nullable=False)
+    end_minute = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_mentor_free_interval_mentor_id_start_minute', 'mentor_id', 'start_minute'),
+        db.Index('ix_mentor_free_interval_start_minute_end_minute', 'start_minute', 'end_minute', 'mentor_id'),
+    )
+
+# Créneau bloqué temporairement pendant une réservation (voir services/holds.py)
+class SlotHold(db.Model):
+    __tablename__ = 'slot_hold'
+    id = db.Column(db.String(32), primary_key=True)
+    mentor_id = db.Column(db.Integer, db.ForeignKey('mentor.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    start_at = db.Column(db.DateTime, nullable=False)
+    end_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)  # UTC
+
+    __table_args__ = (
+        db.Index('ix_slot_hold_mentor_id_start_at', 'mentor_id', 'start_at'),
+        db.Index('ix_slot_hold_expires_at', 'expires_at'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'mentor_id': self.mentor_id,
+            'user_id': self.user_id,
+            'session_date': self.start_at.isoformat(),
+            'end_date': self.end_at.isoformat(),
+            'duration_minutes': int((self.end_at - self.start_at).total_seconds() // 60),
+            'expires_at': self.expires_at.isoformat()
+        }
+
 # Modèle pour les sessions réservées
 class MentorSession(db.Model):
     __tablename__ = 'mentor_session'
@@ -105,6 +177,12 @@ class MentorSession(db.Model):
     # Relations
     mentor = db.relationship('Mentor', backref='sessions')
     student = db.relationship('User', foreign_keys=[student_id], backref='mentor_sessions')
+
+    __table_args__ = (
+        db.Index('ix_mentor_session_mentor_id_session_date_status', 'mentor_id', 'session_date', 'status'),
+        db.Index('ix_mentor_session_student_id_session_date', 'student_id', 'session_date'),
+        db.Index('ix_mentor_session_status_session_date', 'status', 'session_date'),
+    )
     
     def to_dict(self):
         return {
@@ -123,3 +201,15 @@ class MentorSession(db.Model):
             'updated_at': self.updated_at.isoformat()
         }
 
+# Rappel envoyé pour une session (un par décalage) : rend l'envoi idempotent
+# d'un redémarrage à l'autre (voir services/reminders.py)
+class SessionReminder(db.Model):
+    __tablename__ = 'session_reminder'
+    id = db.Column(db.Integer, primary_key=True)
+    session_id = db.Column(db.Integer, db.ForeignKey('mentor_session.id'), nullable=False)
+    offset_minutes = db.Column(db.Integer, nullable=False)
+    sent_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('session_id', 'offset_minutes', name='uix_session_reminder_session_offset'),
+    )
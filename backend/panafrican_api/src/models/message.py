@@ -14,14 +14,50 @@ class Message(db.Model):
     sender = db.relationship('User', foreign_keys=[sender_id], backref=db.backref('sent_messages', lazy=True))
     recipient = db.relationship('User', foreign_keys=[recipient_id], backref=db.backref('received_messages', lazy=True))
 
-    def to_dict(self):
-        return {
+    __table_args__ = (
+        db.Index('ix_messages_sender_id_recipient_id_created_at', 'sender_id', 'recipient_id', 'created_at'),
+        db.Index('ix_messages_recipient_id_created_at', 'recipient_id', 'created_at'),
+    )
+
+    def to_dict(self, include_users=True):
+        data = {
             'id': self.id,
             'sender_id': self.sender_id,
             'recipient_id': self.recipient_id,
             'content': self.content,
             'created_at': self.created_at.isoformat(),
-            'read_at': self.read_at.isoformat() if self.read_at else None,
-            'sender': self.sender.to_dict_simple(),
-            'recipient': self.recipient.to_dict_simple()
+            'read_at': self.read_at.isoformat() if self.read_at else None
         }
+        if include_users:
+            data['sender'] = self.sender.to_dict_simple()
+            data['recipient'] = self.recipient.to_dict_simple()
+        return data
+
+
+class Conversation(db.Model):
+    """Résumé d'une conversation : une ligne par paire d'utilisateurs
+    (`user_low_id` < `user_high_id`), tenue à jour à chaque message."""
+    __tablename__ = 'conversation'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_low_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_high_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    last_message_id = db.Column(db.Integer, db.ForeignKey('messages.id'), nullable=True)
+    last_activity_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Messages non lus par chacun des deux utilisateurs
+    unread_low = db.Column(db.Integer, nullable=False, default=0)
+    unread_high = db.Column(db.Integer, nullable=False, default=0)
+
+    last_message = db.relationship('Message', foreign_keys=[last_message_id])
+
+    __table_args__ = (
+        db.UniqueConstraint('user_low_id', 'user_high_id', name='uix_conversation_users'),
+        db.Index('ix_conversation_user_low_id_last_activity_at', 'user_low_id', 'last_activity_at', 'id'),
+        db.Index('ix_conversation_user_high_id_last_activity_at', 'user_high_id', 'last_activity_at', 'id'),
+    )
+
+    def partner_id(self, user_id):
+        return self.user_high_id if self.user_low_id == user_id else self.user_low_id
+
+    def unread_count(self, user_id):
+        return self.unread_low if self.user_low_id == user_id else self.unread_high
@@ -14,6 +14,11 @@ class Notification(db.Model):
     
     # Relation
     user = db.relationship('User', backref='notifications')
+
+    __table_args__ = (
+        db.Index('ix_notification_user_id_is_read_created_at', 'user_id', 'is_read', 'created_at'),
+        db.Index('ix_notification_user_id_created_at', 'user_id', 'created_at'),
+    )
     
     def to_dict(self):
         return {
@@ -27,6 +32,15 @@ class Notification(db.Model):
             'created_at': self.created_at.isoformat()
         }
 
+class NotificationCounter(db.Model):
+    """Nombre de notifications non lues d'un utilisateur, tenu à jour dans
+    la transaction qui crée, lit ou supprime ses notifications (voir
+    services/notification_counter.py). Pas de ligne : aucune non lue."""
+    __tablename__ = 'notification_counter'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    unread_count = db.Column(db.Integer, nullable=False, default=0)
+
 class Opportunity(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -39,6 +53,10 @@ class Opportunity(db.Model):
     link = db.Column(db.String(500), nullable=True)
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_opportunity_is_active_created_at', 'is_active', 'created_at'),
+    )
     
     def to_dict(self):
         return {
@@ -1,6 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 from .user import db
+from ..services.votes import vote_buffer
 
 class Question(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -10,6 +11,15 @@ class Question(db.Model):
     level = db.Column(db.String(50), nullable=False)
     country = db.Column(db.String(50), nullable=False)
     votes = db.Column(db.Integer, default=0)
+    # Compteurs dénormalisés, maintenus par create_answer / accept_answer
+    # (reconstruits par repair_question_counters.py)
+    answers_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    has_accepted_answer = db.Column(db.Boolean, nullable=False, default=False, server_default='0')
+    # Score « hot » stocké (voir services/hot_ranking.py)
+    hot_score = db.Column(db.Float, nullable=False, default=0.0, server_default='0')
+    # Version de ligne, incrémentée à chaque UPDATE (y compris les UPDATE SQL
+    # directs) : sert d'ETag aux routes de lecture
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1', onupdate=db.text('version + 1'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
@@ -17,6 +27,19 @@ class Question(db.Model):
     answers = db.relationship('Answer', backref='question', lazy=True, cascade='all, delete-orphan')
     # Votes (par utilisateur)
     votes_rel = db.relationship('QuestionVote', backref='question', lazy=True, cascade='all, delete-orphan')
+
+    # Index des filtres et tris de GET /api/questions (l'id, tie-break du
+    # tri, est implicitement inclus via le rowid)
+    __table_args__ = (
+        db.Index('ix_question_created_at', 'created_at'),
+        db.Index('ix_question_votes_created_at', 'votes', 'created_at'),
+        db.Index('ix_question_answers_count_created_at', 'answers_count', 'created_at'),
+        db.Index('ix_question_hot_score_created_at', 'hot_score', 'created_at'),
+        db.Index('ix_question_subject_created_at', 'subject', 'created_at'),
+        db.Index('ix_question_level_created_at', 'level', 'created_at'),
+        db.Index('ix_question_country_created_at', 'country', 'created_at'),
+        db.Index('ix_question_user_id', 'user_id'),
+    )
     
     def to_dict(self):
         author = None
@@ -35,11 +58,13 @@ class Question(db.Model):
             'subject': self.subject,
             'level': self.level,
             'country': self.country,
-            'votes': self.votes,
+            # Inclut les deltas de votes pas encore écrits en base
+            'votes': (self.votes or 0) + vote_buffer.pending(Question, self.id),
             'created_at': self.created_at.isoformat(),
             'user_id': self.user_id,
             'author': author,
-            'answers_count': len(self.answers)
+            'answers_count': self.answers_count,
+            'has_accepted_answer': self.has_accepted_answer
         }
 
 class Answer(db.Model):
@@ -47,9 +72,18 @@ class Answer(db.Model):
     content = db.Column(db.Text, nullable=False)
     votes = db.Column(db.Integer, default=0)
     is_accepted = db.Column(db.Boolean, default=False)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1', onupdate=db.text('version + 1'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=False)
+
+    # Votes (par utilisateur)
+    votes_rel = db.relationship('AnswerVote', backref='answer', lazy=True, cascade='all, delete-orphan')
+
+    __table_args__ = (
+        db.Index('ix_answer_question_id_votes', 'question_id', 'votes'),
+        db.Index('ix_answer_user_id', 'user_id'),
+    )
     
     def to_dict(self):
         author = None
@@ -64,7 +98,7 @@ class Answer(db.Model):
         return {
             'id': self.id,
             'content': self.content,
-            'votes': self.votes,
+            'votes': (self.votes or 0) + vote_buffer.pending(Answer, self.id),
             'is_accepted': self.is_accepted,
             'created_at': self.created_at.isoformat(),
             'user_id': self.user_id,
@@ -83,6 +117,7 @@ class QuestionVote(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint('user_id', 'question_id', name='uix_user_question_vote'),
+        db.Index('ix_question_vote_question_id', 'question_id'),
     )
 
     def to_dict(self):
@@ -94,3 +129,25 @@ class QuestionVote(db.Model):
             'created_at': self.created_at.isoformat()
         }
 
+# Vote model pour les réponses (un vote par utilisateur et par réponse)
+class AnswerVote(db.Model):
+    __tablename__ = 'answer_vote'
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    answer_id = db.Column(db.Integer, db.ForeignKey('answer.id'), nullable=False)
+    is_up = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'answer_id', name='uix_user_answer_vote'),
+        db.Index('ix_answer_vote_answer_id', 'answer_id'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'answer_id': self.answer_id,
+            'is_up': self.is_up,
+            'created_at': self.created_at.isoformat()
+        }
@@ -1,6 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from ..services.hashing import hash_password, verify_password
 
 db = SQLAlchemy()
 
@@ -30,10 +30,10 @@ class User(db.Model):
         return f'<User {self.username}>'
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
 
     def to_dict(self):
         return {
@@ -54,3 +54,22 @@ class User(db.Model):
             'first_name': self.first_name,
             'last_name': self.last_name
         }
+
+class SocketPresence(db.Model):
+    """Socket Socket.IO ouvert et son dernier signe de vie (présence
+    partagée entre workers, voir services/presence.py)."""
+    __tablename__ = 'socket_presence'
+    sid = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    seen_at = db.Column(db.DateTime, nullable=False)  # UTC
+
+    __table_args__ = (
+        db.Index('ix_socket_presence_user_id_seen_at', 'user_id', 'seen_at'),
+        db.Index('ix_socket_presence_seen_at', 'seen_at'),
+    )
+
+class UserPresence(db.Model):
+    """Dernier signe de vie ou déconnexion d'un utilisateur."""
+    __tablename__ = 'user_presence'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    last_seen_at = db.Column(db.DateTime, nullable=False)  # UTC
@@ -1,6 +1,8 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, g
 from ..models.user import db, User
 from ..models.badge import UserPoints
+from ..services.principals import decode_token, load_principal
+from ..services.hashing import HashingPoolBusy
 from sqlalchemy.exc import IntegrityError
 import jwt
 import datetime
@@ -10,24 +12,48 @@ auth_bp = Blueprint('auth', __name__)
 
 # Clé secrète pour JWT (à changer en production)
 
+def _resolve_principal():
+    """Résoudre (utilisateur, message d'erreur) depuis l'en-tête Authorization.
+
+    Le résultat est mémoïsé sur `g` pour la durée de la requête ; le décodage
+    du jeton et le chargement de l'utilisateur passent par les caches de
+    `services.principals`.
+    """
+    if '_principal' in g:
+        return g._principal
+
+    result = authenticate_token(request.headers.get('Authorization'))
+    g._principal = result
+    return result
+
+def authenticate_token(token):
+    """(utilisateur, message d'erreur) pour un jeton JWT, préfixé ou non
+    par « Bearer » (en-tête HTTP ou connexion Socket.IO)."""
+    if not token:
+        return (None, 'Token manquant')
+    try:
+        if token.startswith('Bearer '):
+            token = token[7:]
+        data = decode_token(token, current_app.config['SECRET_KEY'])
+        current_user = load_principal(data.get('user_id'))
+        if current_user:
+            return (current_user, None)
+        return (None, 'Utilisateur non trouvé')
+    except jwt.ExpiredSignatureError:
+        return (None, 'Token expiré')
+    except jwt.InvalidTokenError:
+        return (None, 'Token invalide')
+
+def get_current_user():
+    """Utilisateur authentifié de la requête, ou None (authentification optionnelle)."""
+    return _resolve_principal()[0]
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token:
-            return jsonify({'message': 'Token manquant'}), 401
-        
-        try:
-            if token.startswith('Bearer '):
-                token = token[7:]
-            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-            current_user = User.query.get(data['user_id'])
-            if not current_user:
-                return jsonify({'message': 'Utilisateur non trouvé'}), 401
-        except jwt.ExpiredSignatureError:
-            return jsonify({'message': 'Token expiré'}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({'message': 'Token invalide'}), 401
+        current_user, error = _resolve_principal()
+        if error:
+            return jsonify({'message': error}), 401
         
         return f(current_user, *args, **kwargs)
     return decorated
@@ -85,6 +111,9 @@ def register():
             'user': user.to_dict()
         }), 201
         
+    except HashingPoolBusy:
+        db.session.rollback()
+        return jsonify({'message': 'Serveur surchargé, veuillez réessayer dans un instant'}), 503, {'Retry-After': '1'}
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': f'Erreur lors de l\'inscription: {str(e)}'}), 500
@@ -118,6 +147,9 @@ def login():
         else:
             return jsonify({'message': 'Identifiants invalides'}), 401
             
+    except HashingPoolBusy:
+        db.session.rollback()
+        return jsonify({'message': 'Serveur surchargé, veuillez réessayer dans un instant'}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'message': f'Erreur lors de la connexion: {str(e)}'}), 500
 
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from ..models.user import db, User
 from ..models.badge import Badge, UserBadge, UserPoints
+from ..services.http_cache import conditional_json
+from ..services.pagination import InvalidCursor, keyset_paginate, order_clauses, wants_cursor_pagination
 from .auth import token_required
 
 badges_bp = Blueprint('badges', __name__)
@@ -14,11 +16,17 @@ def get_badges():
         if category:
             query = query.filter(Badge.category == category)
         
-        badges = query.order_by(Badge.points_required.asc()).all()
+        watermark = query.with_entities(
+            db.func.count(Badge.id), db.func.max(Badge.id),
+            db.func.sum(Badge.version), db.func.max(Badge.created_at)
+        ).one()
         
-        return jsonify({
-            'badges': [badge.to_dict() for badge in badges]
-        }), 200
+        def build():
+            badges = query.order_by(Badge.points_required.asc()).all()
+            return {'badges': [badge.to_dict() for badge in badges]}
+        
+        # Le catalogue de badges change très rarement
+        return conditional_json(build, watermark[:3], last_modified=watermark[3], max_age=3600)
         
     except Exception as e:
         return jsonify({'message': f'Erreur lors de la récupération: {str(e)}'}), 500
@@ -63,17 +71,43 @@ def get_leaderboard():
         category = request.args.get('category', 'total')  # total, contribution, mentorship, learning
         
         if category == 'total':
-            order_by = UserPoints.total_points.desc()
+            points_column = UserPoints.total_points
         elif category == 'contribution':
-            order_by = UserPoints.contribution_points.desc()
+            points_column = UserPoints.contribution_points
         elif category == 'mentorship':
-            order_by = UserPoints.mentorship_points.desc()
+            points_column = UserPoints.mentorship_points
         elif category == 'learning':
-            order_by = UserPoints.learning_points.desc()
+            points_column = UserPoints.learning_points
         else:
             return jsonify({'message': 'Catégorie invalide'}), 400
         
-        leaderboard = db.session.query(UserPoints, User).join(User).order_by(order_by).paginate(
+        order = [(points_column, True), (UserPoints.id, True)]
+        query = db.session.query(UserPoints, User).join(User)
+        
+        if wants_cursor_pagination(request.args):
+            with_total = request.args.get('with_total', 'false').lower() == 'true'
+            total = query.count() if with_total else None
+            keyset = keyset_paginate(
+                query, order,
+                key=lambda row: [getattr(row[0], points_column.key), row[0].id],
+                cursor=request.args.get('cursor'), per_page=per_page
+            )
+            # La position est transportée par le curseur : pas de COUNT ni d'OFFSET
+            leaderboard_data = []
+            for rank, (points, user) in enumerate(keyset.items, start=keyset.first_position):
+                leaderboard_data.append({
+                    'rank': rank,
+                    'user': user.to_dict(),
+                    'points': points.to_dict()
+                })
+            return jsonify({
+                'leaderboard': leaderboard_data,
+                'next_cursor': keyset.next_cursor,
+                'prev_cursor': keyset.prev_cursor,
+                'total': total
+            }), 200
+        
+        leaderboard = query.order_by(*order_clauses(order)).paginate(
             page=page, per_page=per_page, error_out=False
         )
         
@@ -92,6 +126,8 @@ def get_leaderboard():
             'current_page': page
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Erreur lors de la récupération: {str(e)}'}), 500
 
@@ -2,18 +2,74 @@ from flask import Blueprint, request, jsonify
 from ..models.user import db, User
 from ..models.mentor import Mentor, MentorshipRequest, MentorAvailability, MentorSession
 from ..models.notification import Notification
-from .auth import token_required
+from ..services.http_cache import conditional_json
+from ..services.mentor_search import filter_by_specialties
+from ..services import slots
+from ..services import availability_index
+from ..services.booking import find_overlapping_session, lock_mentor_schedule
+from ..services import holds
+from ..services import schedule_cache
+from ..services import realtime
+from ..services.pagination import InvalidCursor, keyset_paginate, order_clauses, wants_cursor_pagination
+from .auth import token_required, get_current_user
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import contains_eager, joinedload
 from datetime import datetime, timedelta, time
 import json
 
 mentors_bp = Blueprint('mentors', __name__)
 
+def serialize_with_parties(items, normalized=False):
+    """Sérialiser des sessions ou des demandes avec leur mentor et leur étudiant.
+
+    `item.mentor`, `item.mentor.user` et `item.student` doivent être chargés
+    d'avance (joinedload). Chaque mentor et utilisateur distinct n'est
+    sérialisé qu'une fois ; en mode `normalized`, ils sont renvoyés à part
+    (`mentors`, `users`, indexés par id) et les éléments ne portent que
+    `mentor_id` / `student_id`.
+    """
+    mentors = {}
+    users = {}
+
+    def user_data(user):
+        if user.id not in users:
+            users[user.id] = user.to_dict()
+        return users[user.id]
+
+    def mentor_data(mentor):
+        if mentor.id not in mentors:
+            mentors[mentor.id] = mentor.to_dict()
+            mentor_user = user_data(mentor.user)
+            if not normalized:
+                mentors[mentor.id]['user'] = mentor_user
+        return mentors[mentor.id]
+
+    item_list = []
+    for item in items:
+        item_data = item.to_dict()
+        embedded_mentor = mentor_data(item.mentor)
+        embedded_student = user_data(item.student)
+        if not normalized:
+            item_data['mentor'] = embedded_mentor
+            item_data['student'] = embedded_student
+        item_list.append(item_data)
+    return item_list, mentors, users
+
+def parse_date_range(args):
+    """Bornes ISO `from` / `to` de la requête (None si absentes)."""
+    date_from = datetime.fromisoformat(args['from']) if args.get('from') else None
+    date_to = datetime.fromisoformat(args['to']) if args.get('to') else None
+    return date_from, date_to
+
 @mentors_bp.route('/mentors', methods=['GET'])
 def get_mentors():
     try:
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
-        specialty = request.args.get('specialty')
+        # ?specialty=a&specialty=b ou ?specialty=a,b ; specialty_match=all|any
+        specialties = [s for value in request.args.getlist('specialty') for s in value.split(',') if s.strip()]
+        match_all = request.args.get('specialty_match', 'any').lower() == 'all'
+        specialty_prefix = request.args.get('specialty_prefix')
         country = request.args.get('country')
         education_level = request.args.get('education_level')
         available_only = request.args.get('available_only', 'true').lower() == 'true'
@@ -21,8 +77,8 @@ def get_mentors():
         query = Mentor.query.join(User)
         
         # Filtres
-        if specialty:
-            query = query.filter(Mentor.specialties.contains(specialty))
+        if specialties or specialty_prefix:
+            query = filter_by_specialties(query, specialties, match_all=match_all, prefix=specialty_prefix)
         if country:
             query = query.filter(User.country == country)
         if education_level:
@@ -51,6 +107,72 @@ def get_mentors():
     except Exception as e:
         return jsonify({'message': f'Erreur lors de la récupération: {str(e)}'}), 500
 
+@mentors_bp.route('/mentors/available', methods=['GET'])
+def search_available_mentors():
+    """Mentors ayant un créneau libre d'une durée donnée dans une période"""
+    try:
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 10, type=int)
+        duration = request.args.get('duration', 60, type=int)  # en minutes
+        specialties = [s for value in request.args.getlist('specialty') for s in value.split(',') if s.strip()]
+        match_all = request.args.get('specialty_match', 'any').lower() == 'all'
+        specialty_prefix = request.args.get('specialty_prefix')
+        country = request.args.get('country')
+        
+        now = datetime.now()
+        try:
+            start = datetime.fromisoformat(request.args['start']) if request.args.get('start') else now
+            end = datetime.fromisoformat(request.args['end']) if request.args.get('end') else start + timedelta(days=7)
+        except ValueError:
+            return jsonify({'message': 'Dates start et end invalides (format ISO attendu)'}), 400
+        
+        if not duration or duration < 1 or end <= start:
+            return jsonify({'message': 'Période ou durée invalide'}), 400
+        if end - start < timedelta(minutes=duration):
+            return jsonify({'message': 'La période doit être au moins aussi longue que la durée'}), 400
+        
+        # Seuls les créneaux futurs et indexés sont recherchés
+        window_start = max(slots.to_minutes(start), slots.to_minutes(now) + 1)
+        window_end = slots.to_minutes(end)
+        if window_end > availability_index.horizon_end(now):
+            return jsonify({'message': f'La période ne peut pas dépasser {availability_index.HORIZON_DAYS} jours'}), 400
+        
+        query = Mentor.query.join(User).options(contains_eager(Mentor.user)).filter(
+            Mentor.is_available == True,
+            Mentor.id.in_(availability_index.mentors_free_between(window_start, window_end, duration))
+        )
+        if specialties or specialty_prefix:
+            query = filter_by_specialties(query, specialties, match_all=match_all, prefix=specialty_prefix)
+        if country:
+            query = query.filter(User.country == country)
+        
+        mentors = query.order_by(Mentor.rating.desc(), Mentor.id.desc()).paginate(
+            page=page, per_page=per_page, error_out=False
+        )
+        windows = availability_index.free_windows(
+            [mentor.id for mentor in mentors.items], window_start, window_end, duration
+        )
+        
+        mentor_list = []
+        for mentor in mentors.items:
+            mentor_data = mentor.to_dict()
+            mentor_data['user'] = mentor.user.to_dict()
+            mentor_data['free_intervals'] = [
+                {'start': slots.from_minutes(free_start).isoformat(), 'end': slots.from_minutes(free_end).isoformat()}
+                for free_start, free_end in windows.get(mentor.id, [])
+            ]
+            mentor_list.append(mentor_data)
+        
+        return jsonify({
+            'mentors': mentor_list,
+            'total': mentors.total,
+            'pages': mentors.pages,
+            'current_page': page
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'message': f'Erreur lors de la recherche: {str(e)}'}), 500
+
 @mentors_bp.route('/mentors/become', methods=['POST'])
 @token_required
 def become_mentor(current_user):
@@ -94,12 +216,15 @@ def become_mentor(current_user):
 @mentors_bp.route('/mentors/<int:mentor_id>', methods=['GET'])
 def get_mentor(mentor_id):
     try:
-        mentor = Mentor.query.get_or_404(mentor_id)
+        mentor = Mentor.query.options(joinedload(Mentor.user)).get_or_404(mentor_id)
+        user_data = mentor.user.to_dict()
         
-        mentor_data = mentor.to_dict()
-        mentor_data['user'] = mentor.user.to_dict()
+        def build():
+            mentor_data = mentor.to_dict()
+            mentor_data['user'] = user_data
+            return {'mentor': mentor_data}
         
-        return jsonify({'mentor': mentor_data}), 200
+        return conditional_json(build, (mentor.id, mentor.version, sorted(user_data.items())), max_age=60)
         
     except Exception as e:
         return jsonify({'message': f'Erreur lors de la récupération: {str(e)}'}), 500
@@ -154,6 +279,12 @@ def request_mentorship(current_user, mentor_id):
 @token_required
 def get_mentorship_requests(current_user):
     try:
+        per_page = request.args.get('per_page', 20, type=int)
+        try:
+            date_from, date_to = parse_date_range(request.args)
+        except ValueError:
+            return jsonify({'message': 'Dates from et to invalides (format ISO attendu)'}), 400
+        
         # Récupérer les demandes selon le rôle
         if current_user.role == 'mentor':
             # Demandes reçues par le mentor
@@ -161,21 +292,38 @@ def get_mentorship_requests(current_user):
             if not mentor:
                 return jsonify({'requests': []}), 200
             
-            requests = MentorshipRequest.query.filter_by(mentor_id=mentor.id).order_by(MentorshipRequest.created_at.desc()).all()
+            query = MentorshipRequest.query.filter_by(mentor_id=mentor.id)
         else:
             # Demandes envoyées par l\'étudiant
-            requests = MentorshipRequest.query.filter_by(student_id=current_user.id).order_by(MentorshipRequest.created_at.desc()).all()
+            query = MentorshipRequest.query.filter_by(student_id=current_user.id)
+        
+        if date_from:
+            query = query.filter(MentorshipRequest.created_at >= date_from)
+        if date_to:
+            query = query.filter(MentorshipRequest.created_at < date_to)
+        query = query.options(
+            joinedload(MentorshipRequest.mentor).joinedload(Mentor.user),
+            joinedload(MentorshipRequest.student)
+        )
+        order = [(MentorshipRequest.created_at, True), (MentorshipRequest.id, True)]
+        
+        if wants_cursor_pagination(request.args):
+            keyset = keyset_paginate(query, order, cursor=request.args.get('cursor'), per_page=per_page)
+            request_list, mentors, users = serialize_with_parties(keyset.items, normalized=True)
+            return jsonify({
+                'requests': request_list,
+                'mentors': mentors,
+                'users': users,
+                'next_cursor': keyset.next_cursor,
+                'prev_cursor': keyset.prev_cursor
+            }), 200
         
-        request_list = []
-        for req in requests:
-            req_data = req.to_dict()
-            req_data['student'] = req.student.to_dict()
-            req_data['mentor'] = req.mentor.to_dict()
-            req_data['mentor']['user'] = req.mentor.user.to_dict()
-            request_list.append(req_data)
+        request_list, _, _ = serialize_with_parties(query.order_by(*order_clauses(order)).all())
         
         return jsonify({'requests': request_list}), 200
         
+    except InvalidCursor as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Erreur lors de la récupération: {str(e)}'}), 500
 
@@ -213,12 +361,19 @@ def respond_to_request(current_user, request_id):
 def get_mentor_availabilities(mentor_id):
     """Récupérer les disponibilités d'un mentor"""
     try:
-        mentor = Mentor.query.get_or_404(mentor_id)
-        availabilities = MentorAvailability.query.filter_by(mentor_id=mentor_id, is_active=True).all()
+        now = datetime.now()
+        schedule = schedule_cache.get_schedule(mentor_id, slots.to_minutes(now))
+        if schedule is None:
+            return jsonify({'message': 'Mentor introuvable'}), 404
         
-        return jsonify({
-            'availabilities': [av.to_dict() for av in availabilities]
-        }), 200
+        # Les disponibilités sont remplacées (supprimées puis recréées) à
+        # chaque modification : nombre, id max et date max les identifient
+        watermark = schedule.watermark
+        
+        def build():
+            return {'availabilities': schedule.availabilities}
+        
+        return conditional_json(build, (mentor_id,) + tuple(watermark), last_modified=watermark[2], max_age=60)
         
     except Exception as e:
         return jsonify({'message': f'Erreur: {str(e)}'}), 500
@@ -250,7 +405,9 @@ def set_mentor_availabilities(current_user):
             )
             db.session.add(availability)
         
+        availability_index.rebuild_free_intervals([mentor.id])
         db.session.commit()
+        schedule_cache.invalidate_schedule(mentor.id)
         
         return jsonify({
             'message': 'Disponibilités mises à jour avec succès'
@@ -264,69 +421,34 @@ def set_mentor_availabilities(current_user):
 def get_available_slots(mentor_id):
     """Récupérer les créneaux disponibles d'un mentor pour les 7 prochains jours"""
     try:
-        mentor = Mentor.query.get_or_404(mentor_id)
-        
         # Paramètres
-        days_ahead = int(request.args.get('days', 7))
-        session_duration = int(request.args.get('duration', 60))  # en minutes
-        
-        # Récupérer les disponibilités du mentor
-        availabilities = MentorAvailability.query.filter_by(mentor_id=mentor_id, is_active=True).all()
-        
-        if not availabilities:
+        days_ahead = request.args.get('days', 7, type=int)
+        session_duration = request.args.get('duration', 60, type=int)  # en minutes
+        step = request.args.get('step', 30, type=int)  # granularité de la grille, en minutes
+        if not days_ahead or days_ahead < 1 or not session_duration or session_duration < 1 or not step or step < 1:
+            return jsonify({'message': 'Paramètres days, duration et step invalides'}), 400
+        
+        # Période : du jour courant (créneaux strictement futurs) à J + days
+        now = datetime.now()
+        window_start = slots.to_minutes(now) + 1
+        window_end = slots.to_minutes(datetime.combine(now.date(), time.min)) + days_ahead * slots.MINUTES_PER_DAY
+        
+        # Disponibilités et sessions réservées du mentor (en cache)
+        schedule = schedule_cache.get_schedule(mentor_id, window_end)
+        if schedule is None:
+            return jsonify({'message': 'Mentor introuvable'}), 404
+        
+        if not schedule.windows:
             return jsonify({'slots': []}), 200
         
-        # Récupérer les sessions déjà réservées
-        start_date = datetime.now()
-        end_date = start_date + timedelta(days=days_ahead)
-        booked_sessions = MentorSession.query.filter(
-            MentorSession.mentor_id == mentor_id,
-            MentorSession.session_date >= start_date,
-            MentorSession.session_date < end_date,
-            MentorSession.status.in_(['scheduled', 'completed'])
-        ).all()
-        
-        # Créer un set des créneaux réservés
-        booked_slots = set()
-        for session in booked_sessions:
-            session_end = session.session_date + timedelta(minutes=session.duration_minutes)
-            current = session.session_date
-            while current < session_end:
-                booked_slots.add(current.strftime('%Y-%m-%d %H:%M'))
-                current += timedelta(minutes=30)  # Intervalle de 30 minutes
-        
-        # Générer les créneaux disponibles
-        available_slots = []
-        
-        for day_offset in range(days_ahead):
-            current_date = start_date.date() + timedelta(days=day_offset)
-            day_of_week = current_date.weekday()  # 0=Lundi, 6=Dimanche
-            
-            # Trouver les disponibilités pour ce jour
-            day_availabilities = [av for av in availabilities if av.day_of_week == day_of_week]
-            
-            for availability in day_availabilities:
-                # Générer les créneaux pour cette disponibilité
-                slot_start = datetime.combine(current_date, availability.start_time)
-                slot_end = datetime.combine(current_date, availability.end_time)
-                
-                current_slot = slot_start
-                while current_slot + timedelta(minutes=session_duration) <= slot_end:
-                    # Vérifier si c'est dans le futur
-                    if current_slot > datetime.now():
-                        slot_key = current_slot.strftime('%Y-%m-%d %H:%M')
-                        
-                        # Vérifier si le créneau n'est pas déjà réservé
-                        if slot_key not in booked_slots:
-                            available_slots.append({
-                                'datetime': current_slot.isoformat(),
-                                'date': current_slot.strftime('%Y-%m-%d'),
-                                'time': current_slot.strftime('%H:%M'),
-                                'day_name': ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi', 'Dimanche'][day_of_week],
-                                'available': True
-                            })
-                    
-                    current_slot += timedelta(minutes=30)  # Créneaux de 30 minutes
+        # Les créneaux bloqués par d'autres utilisateurs ne sont pas proposés
+        current_user = get_current_user()
+        held = holds.held_intervals(
+            mentor_id, slots.from_minutes(window_start), slots.from_minutes(window_end),
+            exclude_user_id=current_user.id if current_user else None
+        )
+        free = slots.free_intervals(schedule.windows, schedule.busy + held, window_start, window_end)
+        available_slots = [slots.format_slot(start) for start in slots.slot_starts(free, session_duration, step)]
         
         return jsonify({
             'slots': available_slots,
@@ -351,6 +473,15 @@ def book_session(current_user, mentor_id):
         
         data = request.get_json()
         
+        # Avec un blocage (voir create_slot_hold), le créneau est celui du blocage
+        hold = None
+        if data.get('hold_id'):
+            hold = holds.get_hold(data['hold_id'])
+            if not hold or hold.user_id != current_user.id or hold.mentor_id != mentor_id:
+                return jsonify({'message': 'Blocage de créneau introuvable ou expiré'}), 410
+            data['session_date'] = hold.start_at.isoformat()
+            data['duration_minutes'] = hold.to_dict()['duration_minutes']
+        
         required_fields = ['session_date', 'subject']
         for field in required_fields:
             if field not in data:
@@ -364,26 +495,17 @@ def book_session(current_user, mentor_id):
             return jsonify({'message': 'La date de session doit être dans le futur'}), 400
         
         duration = int(data.get('duration_minutes', 60))
+        if duration < 1 or duration > slots.MAX_SESSION_MINUTES:
+            return jsonify({'message': f'La durée doit être comprise entre 1 et {slots.MAX_SESSION_MINUTES} minutes'}), 400
         session_end = session_date + timedelta(minutes=duration)
         
-        # Vérifier la disponibilité du créneau de manière robuste
-        day_of_session = session_date.date()
-        
-        # 1. Récupérer les sessions existantes pour ce mentor ce jour-là
-        existing_sessions = MentorSession.query.filter(
-            MentorSession.mentor_id == mentor_id,
-            db.func.date(MentorSession.session_date) == day_of_session,
-            MentorSession.status.in_(['scheduled', 'completed'])
-        ).all()
-        
-        # 2. Vérifier le chevauchement en Python
-        for existing_session in existing_sessions:
-            existing_start = existing_session.session_date
-            existing_end = existing_start + timedelta(minutes=existing_session.duration_minutes)
-            
-            # Logique de chevauchement: (start1 < end2) and (start2 < end1)
-            if session_date < existing_end and existing_start < session_end:
-                return jsonify({'message': 'Ce créneau est déjà réservé ou chevauche une autre session.'}), 409
+        # Sérialiser les réservations de ce mentor puis chercher un
+        # chevauchement par une requête indexée (voir services/booking.py)
+        lock_mentor_schedule(mentor_id)
+        if (find_overlapping_session(mentor_id, session_date, session_end)
+                or holds.is_held_by_other(mentor_id, session_date, session_end, current_user.id)):
+            db.session.rollback()
+            return jsonify({'message': 'Ce créneau est déjà réservé ou chevauche une autre session.'}), 409
 
         # Si on arrive ici, le créneau est libre
         
@@ -400,6 +522,10 @@ def book_session(current_user, mentor_id):
         
         db.session.add(session)
         db.session.flush() # Pour obtenir session.id avant le commit
+        availability_index.refresh_for_session(session)
+        if hold:
+            # Libéré seulement si la réservation est validée (voir services/holds.py)
+            holds.release_hold(hold.id)
         
         # Créer une notification pour le mentor
         notification_mentor = Notification(
@@ -420,11 +546,10 @@ def book_session(current_user, mentor_id):
             related_id=session.id
         )
         db.session.add(notification_student)
-        
-        # Incrémenter le nombre de sessions du mentor
-        mentor.total_sessions += 1
+        realtime.push_notifications([notification_mentor, notification_student])
         
         db.session.commit()
+        schedule_cache.add_booking(mentor_id, slots.to_minutes(session_date), slots.to_minutes(session_end))
         
         session_data = session.to_dict()
         session_data['mentor'] = mentor.to_dict()
@@ -436,10 +561,75 @@ def book_session(current_user, mentor_id):
             'session': session_data
         }), 201
         
+    except OperationalError:
+        # Verrou d'écriture non obtenu dans le délai (forte contention)
+        db.session.rollback()
+        return jsonify({'message': 'Réservations très sollicitées, veuillez réessayer'}), 503, {'Retry-After': '1'}
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': f'Erreur lors de la réservation: {str(e)}'}), 500
 
+@mentors_bp.route('/mentors/<int:mentor_id>/holds', methods=['POST'])
+@token_required
+def create_slot_hold(current_user, mentor_id):
+    """Bloquer un créneau quelques minutes le temps de finaliser la réservation"""
+    try:
+        mentor = Mentor.query.get_or_404(mentor_id)
+        
+        if mentor.user_id == current_user.id:
+            return jsonify({'message': 'Vous ne pouvez pas réserver avec vous-même'}), 400
+        
+        data = request.get_json()
+        if 'session_date' not in data:
+            return jsonify({'message': 'Champ session_date requis'}), 400
+        
+        session_date = datetime.fromisoformat(data['session_date'].replace('Z', '+00:00'))
+        if session_date <= datetime.now():
+            return jsonify({'message': 'La date de session doit être dans le futur'}), 400
+        
+        duration = int(data.get('duration_minutes', 60))
+        if duration < 1 or duration > slots.MAX_SESSION_MINUTES:
+            return jsonify({'message': f'La durée doit être comprise entre 1 et {slots.MAX_SESSION_MINUTES} minutes'}), 400
+        ttl = int(data.get('ttl_minutes', holds.HOLD_TTL_MINUTES))
+        if ttl < 1 or ttl > holds.MAX_HOLD_TTL_MINUTES:
+            return jsonify({'message': f'La durée du blocage doit être comprise entre 1 et {holds.MAX_HOLD_TTL_MINUTES} minutes'}), 400
+        
+        hold = holds.place_hold(mentor_id, current_user.id, session_date, session_date + timedelta(minutes=duration), ttl)
+        if hold is None:
+            return jsonify({'message': 'Ce créneau est déjà réservé ou bloqué.'}), 409
+        
+        return jsonify({
+            'message': 'Créneau bloqué',
+            'hold': hold.to_dict()
+        }), 201
+        
+    except OperationalError:
+        db.session.rollback()
+        return jsonify({'message': 'Réservations très sollicitées, veuillez réessayer'}), 503, {'Retry-After': '1'}
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': f'Erreur lors du blocage: {str(e)}'}), 500
+
+@mentors_bp.route('/mentors/holds/<hold_id>', methods=['DELETE'])
+@token_required
+def release_slot_hold(current_user, hold_id):
+    """Libérer un créneau bloqué"""
+    try:
+        hold = holds.get_hold(hold_id)
+        if not hold:
+            return jsonify({'message': 'Blocage de créneau introuvable ou expiré'}), 404
+        if hold.user_id != current_user.id:
+            return jsonify({'message': 'Non autorisé'}), 403
+        
+        holds.release_hold(hold_id)
+        db.session.commit()
+        
+        return jsonify({'message': 'Créneau libéré'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': f'Erreur: {str(e)}'}), 500
+
 @mentors_bp.route('/mentorship/sessions', methods=['GET'])
 @token_required
 def get_sessions(current_user):
@@ -448,6 +638,11 @@ def get_sessions(current_user):
         # Paramètres de filtrage
         role = request.args.get('role', 'student')  # student ou mentor
         status = request.args.get('status')  # scheduled, completed, cancelled
+        per_page = request.args.get('per_page', 20, type=int)
+        try:
+            date_from, date_to = parse_date_range(request.args)
+        except ValueError:
+            return jsonify({'message': 'Dates from et to invalides (format ISO attendu)'}), 400
         
         if role == 'mentor':
             mentor = Mentor.query.filter_by(user_id=current_user.id).first()
@@ -459,19 +654,33 @@ def get_sessions(current_user):
         
         if status:
             query = query.filter_by(status=status)
+        if date_from:
+            query = query.filter(MentorSession.session_date >= date_from)
+        if date_to:
+            query = query.filter(MentorSession.session_date < date_to)
+        query = query.options(
+            joinedload(MentorSession.mentor).joinedload(Mentor.user),
+            joinedload(MentorSession.student)
+        )
+        order = [(MentorSession.session_date, True), (MentorSession.id, True)]
         
-        sessions = query.order_by(MentorSession.session_date.desc()).all()
+        if wants_cursor_pagination(request.args):
+            keyset = keyset_paginate(query, order, cursor=request.args.get('cursor'), per_page=per_page)
+            session_list, mentors, users = serialize_with_parties(keyset.items, normalized=True)
+            return jsonify({
+                'sessions': session_list,
+                'mentors': mentors,
+                'users': users,
+                'next_cursor': keyset.next_cursor,
+                'prev_cursor': keyset.prev_cursor
+            }), 200
         
-        session_list = []
-        for session in sessions:
-            session_data = session.to_dict()
-            session_data['mentor'] = session.mentor.to_dict()
-            session_data['mentor']['user'] = session.mentor.user.to_dict()
-            session_data['student'] = session.student.to_dict()
-            session_list.append(session_data)
+        session_list, _, _ = serialize_with_parties(query.order_by(*order_clauses(order)).all())
         
         return jsonify({'sessions': session_list}), 200
         
+    except InvalidCursor as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Erreur: {str(e)}'}), 500
 
@@ -514,6 +723,7 @@ def cancel_session(current_user, session_id):
             return jsonify({'message': 'Cette session ne peut plus être annulée'}), 400
         
         session.status = 'cancelled'
+        availability_index.refresh_for_session(session)
         
         # Créer une notification pour l\'autre partie
         if session.student_id == current_user.id:
@@ -536,7 +746,9 @@ def cancel_session(current_user, session_id):
             )
         
         db.session.add(notification)
+        realtime.push_notifications([notification])
         db.session.commit()
+        schedule_cache.invalidate_schedule(session.mentor_id)
         
         return jsonify({
             'message': 'Session annulée avec succès',
@@ -545,4 +757,35 @@ def cancel_session(current_user, session_id):
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({'message': f'Erreur: {str(e)}'}), 500
\ No newline at end of file
+        return jsonify({'message': f'Erreur: {str(e)}'}), 500
+
+@mentors_bp.route('/mentorship/sessions/<int:session_id>/no-show', methods=['POST'])
+@token_required
+def mark_session_no_show(current_user, session_id):
+    """Signaler l'absence de l'étudiant (mentor uniquement, après le début)"""
+    try:
+        session = MentorSession.query.get_or_404(session_id)
+        
+        mentor = Mentor.query.get(session.mentor_id)
+        if mentor.user_id != current_user.id:
+            return jsonify({'message': 'Non autorisé'}), 403
+        
+        if session.status not in ['scheduled', 'completed']:
+            return jsonify({'message': 'Cette session ne peut pas être marquée comme manquée'}), 400
+        
+        if session.session_date > datetime.now():
+            return jsonify({'message': "La session n'a pas encore commencé"}), 400
+        
+        session.status = 'no_show'
+        availability_index.refresh_for_session(session)
+        db.session.commit()
+        schedule_cache.invalidate_schedule(session.mentor_id)
+        
+        return jsonify({
+            'message': 'Absence enregistrée',
+            'session': session.to_dict()
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': f'Erreur: {str(e)}'}), 500
@@ -1,9 +1,13 @@
-from flask import Blueprint, request, jsonify
-from sqlalchemy import or_, and_
-from flask_socketio import emit, join_room, leave_room
+from flask import Blueprint, request, jsonify, session
+from flask_socketio import ConnectionRefusedError, emit, join_room, leave_room
 from ..models.user import db, User
 from ..models.message import Message
-from .auth import token_required
+from ..models.notification import Notification
+from ..services import conversations as inbox
+from ..services import presence
+from ..services import realtime
+from ..services.pagination import InvalidCursor, keyset_paginate
+from .auth import authenticate_token, token_required
 from .. import socketio
 from datetime import datetime
 
@@ -31,13 +35,24 @@ def send_message(current_user):
         )
 
         db.session.add(message)
+        db.session.flush()
+        inbox.record_message(message)
+
+        # Sérialisé une fois : événement WebSocket (émis après le commit)
+        # et réponse HTTP
+        data = message.to_dict()
+        if not realtime.dispatch_to_user(recipient.id, 'new_message', data):
+            # Destinataire hors ligne : notification lue à sa prochaine connexion
+            db.session.add(Notification(
+                user_id=recipient.id,
+                type='new_message',
+                title='Nouveau message',
+                message=f"{current_user.first_name} {current_user.last_name} vous a envoyé un message",
+                related_id=current_user.id
+            ))
         db.session.commit()
 
-        # Émettre un événement WebSocket à la salle du destinataire
-        room = f"user_{recipient_id}"
-        socketio.emit('new_message', message.to_dict(), to=room)
-
-        return jsonify({'message': 'Message sent successfully', 'data': message.to_dict()}), 201
+        return jsonify({'message': 'Message sent successfully', 'data': data}), 201
 
     except Exception as e:
         db.session.rollback()
@@ -47,32 +62,31 @@ def send_message(current_user):
 @token_required
 def get_conversations(current_user):
     try:
-        # Get all users the current user has had a conversation with
-        sent_to = db.session.query(Message.recipient_id).filter(Message.sender_id == current_user.id)
-        received_from = db.session.query(Message.sender_id).filter(Message.recipient_id == current_user.id)
-        
-        user_ids = set([item[0] for item in sent_to.all()] + [item[0] for item in received_from.all()])
-        
-        conversations = []
-        for user_id in user_ids:
-            user = User.query.get(user_id)
-            last_message = Message.query.filter(
-                or_(
-                    and_(Message.sender_id == current_user.id, Message.recipient_id == user_id),
-                    and_(Message.sender_id == user_id, Message.recipient_id == current_user.id)
-                )
-            ).order_by(Message.created_at.desc()).first()
-
-            conversations.append({
-                'user': user.to_dict_simple(),
-                'last_message': last_message.to_dict() if last_message else None
-            })
-
-        # Sort conversations by the last message date
-        conversations.sort(key=lambda x: x['last_message']['created_at'] if x.get('last_message') else '1970-01-01T00:00:00', reverse=True)
-
-        return jsonify({'conversations': conversations}), 200
+        per_page = min(max(request.args.get('per_page', 50, type=int), 1), 100)
+
+        # Une seule requête sur la table conversation, la plus récente d'abord
+        page = keyset_paginate(
+            inbox.conversations_query(current_user.id),
+            inbox.CONVERSATION_ORDER,
+            key=inbox.conversation_key,
+            cursor=request.args.get('cursor'),
+            per_page=per_page
+        )
+
+        conversations = [{
+            'user': user.to_dict_simple(),
+            'last_message': last_message.to_dict() if last_message else None,
+            'unread_count': conversation.unread_count(current_user.id)
+        } for conversation, user, last_message in page.items]
 
+        return jsonify({
+            'conversations': conversations,
+            'next_cursor': page.next_cursor,
+            'prev_cursor': page.prev_cursor
+        }), 200
+
+    except InvalidCursor as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Error getting conversations: {str(e)}'}), 500
 
@@ -80,37 +94,84 @@ def get_conversations(current_user):
 @token_required
 def get_conversation(current_user, user_id):
     try:
-        messages = Message.query.filter(
-            or_(
-                and_(Message.sender_id == current_user.id, Message.recipient_id == user_id),
-                and_(Message.sender_id == user_id, Message.recipient_id == current_user.id)
-            )
-        ).order_by(Message.created_at.asc()).all()
+        per_page = min(max(request.args.get('per_page', inbox.HISTORY_PAGE_SIZE, type=int), 1),
+                       inbox.MAX_HISTORY_PAGE_SIZE)
+        before_id = request.args.get('before', type=int)
+        after_id = request.args.get('after', type=int)
+        if before_id is not None and after_id is not None:
+            return jsonify({'message': 'Use either before or after, not both'}), 400
+
+        partner = User.query.get(user_id)
+        if not partner:
+            return jsonify({'message': 'User not found'}), 404
+
+        # Curseur : id d'un message de cette conversation
+        anchor = None
+        anchor_id = before_id if before_id is not None else after_id
+        if anchor_id is not None:
+            anchor = Message.query.get(anchor_id)
+            if anchor is None or inbox.user_pair(anchor.sender_id, anchor.recipient_id) != inbox.user_pair(current_user.id, user_id):
+                return jsonify({'message': 'Invalid cursor'}), 400
 
         # Mark messages as read
-        for message in messages:
-            if message.recipient_id == current_user.id and not message.read_at:
-                message.read_at = datetime.utcnow()
-        db.session.commit()
+        if inbox.mark_conversation_read(current_user.id, user_id, datetime.utcnow()):
+            db.session.commit()
+
+        messages, has_more = inbox.message_history(
+            current_user.id, user_id, per_page,
+            before=anchor if before_id is not None else None,
+            after=anchor if after_id is not None else None
+        )
 
-        return jsonify({'messages': [message.to_dict() for message in messages]}), 200
+        # Participants sérialisés une fois, pas dans chaque message
+        return jsonify({
+            'messages': [message.to_dict(include_users=False) for message in messages],
+            'users': {str(user.id): user.to_dict_simple() for user in {current_user, partner}},
+            'has_more': has_more
+        }), 200
 
     except Exception as e:
+        db.session.rollback()
         return jsonify({'message': f'Error getting conversation: {str(e)}'}), 500
 
 # WebSocket event handlers
+@socketio.on('connect')
+def on_connect(auth=None):
+    # Même jeton que les routes : auth={'token': ...} côté client, ou
+    # ?token=... / en-tête Authorization pour les clients sans auth
+    token = (auth or {}).get('token') or request.args.get('token') or request.headers.get('Authorization')
+    user, error = authenticate_token(token)
+    if error:
+        raise ConnectionRefusedError(error)
+
+    session['user_id'] = user.id
+    join_room(f"user_{user.id}")
+    presence.seen(user.id, request.sid)
+
+@socketio.on('disconnect')
+def on_disconnect():
+    presence.disconnect(request.sid)
+
+@socketio.on('heartbeat')
+def on_heartbeat(data=None):
+    user_id = session.get('user_id')
+    if user_id:
+        presence.seen(user_id, request.sid)
+
+# La salle `user_<id>` est rejointe à la connexion authentifiée : `join` et
+# `leave` ne sont plus honorés que pour l'utilisateur du socket
 @socketio.on('join')
 def on_join(data):
-    user_id = data.get('user_id')
-    if user_id:
+    user_id = session.get('user_id')
+    if user_id and data.get('user_id') == user_id:
         room = f"user_{user_id}"
         join_room(room)
         emit('status', {'msg': f'User {user_id} has joined the room.'}, to=room)
 
 @socketio.on('leave')
 def on_leave(data):
-    user_id = data.get('user_id')
-    if user_id:
+    user_id = session.get('user_id')
+    if user_id and data.get('user_id') == user_id:
         room = f"user_{user_id}"
         leave_room(room)
-        emit('status', {'msg': f'User {user_id} has left the room.'}, to=room)
\ No newline at end of file
+        emit('status', {'msg': f'User {user_id} has left the room.'}, to=room)
@@ -1,6 +1,10 @@
 from flask import Blueprint, request, jsonify
 from ..models.user import db, User
 from ..models.notification import Notification, Opportunity
+from ..services.http_cache import conditional_json
+from ..services import notification_counter
+from ..services import realtime
+from ..services.pagination import InvalidCursor, keyset_paginate, order_clauses, wants_cursor_pagination
 from .auth import token_required
 
 notifications_bp = Blueprint('notifications', __name__)
@@ -18,7 +22,22 @@ def get_notifications(current_user):
         if unread_only:
             query = query.filter(Notification.is_read == False)
         
-        notifications = query.order_by(Notification.created_at.desc()).paginate(
+        order = [(Notification.created_at, True), (Notification.id, True)]
+        unread_count = notification_counter.unread_count(current_user.id)
+        
+        if wants_cursor_pagination(request.args):
+            with_total = request.args.get('with_total', 'false').lower() == 'true'
+            total = query.count() if with_total else None
+            keyset = keyset_paginate(query, order, cursor=request.args.get('cursor'), per_page=per_page)
+            return jsonify({
+                'notifications': [notif.to_dict() for notif in keyset.items],
+                'next_cursor': keyset.next_cursor,
+                'prev_cursor': keyset.prev_cursor,
+                'total': total,
+                'unread_count': unread_count
+            }), 200
+        
+        notifications = query.order_by(*order_clauses(order)).paginate(
             page=page, per_page=per_page, error_out=False
         )
         
@@ -27,9 +46,11 @@ def get_notifications(current_user):
             'total': notifications.total,
             'pages': notifications.pages,
             'current_page': page,
-            'unread_count': Notification.query.filter_by(user_id=current_user.id, is_read=False).count()
+            'unread_count': unread_count
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Erreur lors de la récupération: {str(e)}'}), 500
 
@@ -58,7 +79,9 @@ def mark_notification_read(current_user, notification_id):
 @token_required
 def mark_all_notifications_read(current_user):
     try:
-        Notification.query.filter_by(user_id=current_user.id, is_read=False).update({'is_read': True})
+        marked = Notification.query.filter_by(user_id=current_user.id, is_read=False).update({'is_read': True})
+        # UPDATE en masse : hors du suivi automatique du compteur
+        notification_counter.add_unread_delta(current_user.id, -marked)
         db.session.commit()
         
         return jsonify({'message': 'Toutes les notifications marquées comme lues'}), 200
@@ -86,17 +109,42 @@ def get_opportunities():
         if active_only:
             query = query.filter(Opportunity.is_active == True)
         
-        opportunities = query.order_by(Opportunity.created_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        return jsonify({
-            'opportunities': [opp.to_dict() for opp in opportunities.items],
-            'total': opportunities.total,
-            'pages': opportunities.pages,
-            'current_page': page
-        }), 200
-        
+        order = [(Opportunity.created_at, True), (Opportunity.id, True)]
+        # Les opportunités ne sont jamais modifiées après création : le
+        # nombre, l'id max et la date max suffisent à détecter un changement
+        watermark = query.with_entities(
+            db.func.count(Opportunity.id), db.func.max(Opportunity.id), db.func.max(Opportunity.created_at)
+        ).one()
+        
+        if wants_cursor_pagination(request.args):
+            with_total = request.args.get('with_total', 'false').lower() == 'true'
+            total = query.count() if with_total else None
+            
+            def build_cursor_page():
+                keyset = keyset_paginate(query, order, cursor=request.args.get('cursor'), per_page=per_page)
+                return {
+                    'opportunities': [opp.to_dict() for opp in keyset.items],
+                    'next_cursor': keyset.next_cursor,
+                    'prev_cursor': keyset.prev_cursor,
+                    'total': total
+                }
+            return conditional_json(build_cursor_page, watermark[:2], last_modified=watermark[2], max_age=300)
+        
+        def build_page():
+            opportunities = query.order_by(*order_clauses(order)).paginate(
+                page=page, per_page=per_page, error_out=False
+            )
+            return {
+                'opportunities': [opp.to_dict() for opp in opportunities.items],
+                'total': opportunities.total,
+                'pages': opportunities.pages,
+                'current_page': page
+            }
+        
+        return conditional_json(build_page, watermark[:2], last_modified=watermark[2], max_age=300)
+        
+    except InvalidCursor as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Erreur lors de la récupération: {str(e)}'}), 500
 
@@ -146,6 +194,7 @@ def create_notification(user_id, title, message, notification_type, related_id=N
             related_id=related_id
         )
         db.session.add(notification)
+        realtime.push_notifications([notification])
         db.session.commit()
         return notification
     except Exception as e:
@@ -1,18 +1,49 @@
-from flask import Blueprint, request, jsonify, current_app
-from ..models.user import db, User
-from ..models.question import Question, Answer, QuestionVote
-from .auth import token_required
+from flask import Blueprint, request, jsonify
+from ..models.user import db
+from ..models.question import Question, Answer, QuestionVote, AnswerVote
+from ..services.search import apply_question_search
+from ..services.votes import vote_buffer
+from ..services.hot_ranking import refresh_hot_score
+from ..services.http_cache import conditional_json
+from ..services.pagination import InvalidCursor, keyset_paginate, order_clauses, wants_cursor_pagination
+from .auth import token_required, get_current_user
+from sqlalchemy.orm import joinedload
 import json
-import jwt
 
 questions_bp = Blueprint('questions', __name__)
 
+def serialize_question_list(questions, current_user=None):
+    """Sérialiser une page de questions en un nombre constant de requêtes.
+
+    Les auteurs doivent être chargés d'avance (joinedload) et les votes de
+    l'utilisateur sont récupérés par une seule requête IN (...).
+    """
+    question_ids = [q.id for q in questions]
+    if not question_ids:
+        return []
+
+    user_votes = {}
+    if current_user:
+        votes = QuestionVote.query.filter(
+            QuestionVote.user_id == current_user.id,
+            QuestionVote.question_id.in_(question_ids)
+        ).all()
+        user_votes = {v.question_id: ('up' if v.is_up else 'down') for v in votes}
+
+    questions_list = []
+    for q in questions:
+        qd = q.to_dict()
+        qd['answers'] = q.answers_count
+        qd['user_vote'] = user_votes.get(q.id)
+        questions_list.append(qd)
+    return questions_list
+
 @questions_bp.route('/questions/stats', methods=['GET'])
 def get_question_stats():
     try:
         total_questions = Question.query.count()
-        resolved_questions = Question.query.join(Answer).filter(Answer.is_accepted == True).distinct().count()
-        total_answers = Answer.query.count()
+        resolved_questions = Question.query.filter(Question.has_accepted_answer == True).count()
+        total_answers = db.session.query(db.func.sum(Question.answers_count)).scalar() or 0
         total_votes = db.session.query(db.func.sum(Question.votes)).scalar() or 0
 
         return jsonify({
@@ -33,9 +64,11 @@ def get_questions():
         level = request.args.get('level')
         country = request.args.get('country')
         search = request.args.get('search')
-        sort_by = request.args.get('sort_by', 'newest')
+        # Avec une recherche, tri par pertinence (bm25) par défaut
+        sort_by = request.args.get('sort_by', 'relevance' if search else 'newest')
+        unanswered = request.args.get('unanswered', 'false').lower() == 'true'
 
-        query = Question.query
+        query = Question.query.options(joinedload(Question.author))
         
         if subject:
             query = query.filter(Question.subject == subject)
@@ -43,40 +76,53 @@ def get_questions():
             query = query.filter(Question.level == level)
         if country:
             query = query.filter(Question.country == country)
+        rank = None
         if search:
-            query = query.filter(Question.title.contains(search) | Question.content.contains(search))
+            query, rank = apply_question_search(query, search)
+        if unanswered:
+            query = query.filter(Question.answers_count == 0)
         
-        if sort_by == 'popular':
-            query = query.order_by(Question.votes.desc(), Question.created_at.desc())
+        # Ordre total : la dernière colonne (id) départage les égalités
+        if sort_by == 'relevance' and rank is not None:
+            order = [(rank, False), (Question.created_at, True), (Question.id, True)]
+        elif sort_by == 'popular':
+            order = [(Question.votes, True), (Question.created_at, True), (Question.id, True)]
+        elif sort_by == 'most_answered':
+            order = [(Question.answers_count, True), (Question.created_at, True), (Question.id, True)]
+        elif sort_by == 'hot':
+            order = [(Question.hot_score, True), (Question.created_at, True), (Question.id, True)]
         else:
-            query = query.order_by(Question.created_at.desc())
+            order = [(Question.created_at, True), (Question.id, True)]
+
+        current_user = get_current_user()
 
-        questions_pagination = query.paginate(
+        if wants_cursor_pagination(request.args):
+            with_total = request.args.get('with_total', 'false').lower() == 'true'
+            total = query.order_by(None).count() if with_total else None
+            if order[0][0] is rank:
+                # Le score bm25 n'est pas un attribut de Question : il est
+                # sélectionné avec chaque ligne pour entrer dans le curseur
+                keyset = keyset_paginate(
+                    query.add_columns(rank), order,
+                    key=lambda row: [row[1], row[0].created_at, row[0].id],
+                    cursor=request.args.get('cursor'), per_page=per_page
+                )
+                questions = [question for question, _ in keyset.items]
+            else:
+                keyset = keyset_paginate(query, order, cursor=request.args.get('cursor'), per_page=per_page)
+                questions = keyset.items
+            return jsonify({
+                'questions': serialize_question_list(questions, current_user),
+                'next_cursor': keyset.next_cursor,
+                'prev_cursor': keyset.prev_cursor,
+                'total': total
+            }), 200
+
+        questions_pagination = query.order_by(*order_clauses(order)).paginate(
             page=page, per_page=per_page, error_out=False
         )
 
-        auth_header = request.headers.get('Authorization')
-        current_user = None
-        if auth_header:
-            try:
-                token = auth_header
-                if token.startswith('Bearer '):
-                    token = token[7:]
-                data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-                current_user = User.query.get(data['user_id'])
-            except Exception:
-                current_user = None
-
-        questions_list = []
-        for q in questions_pagination.items:
-            qd = q.to_dict()
-            qd['answers'] = len(q.answers)
-            qd['user_vote'] = None
-            if current_user:
-                existing = QuestionVote.query.filter_by(user_id=current_user.id, question_id=q.id).first()
-                if existing:
-                    qd['user_vote'] = 'up' if existing.is_up else 'down'
-            questions_list.append(qd)
+        questions_list = serialize_question_list(questions_pagination.items, current_user)
         
         return jsonify({
             'questions': questions_list,
@@ -85,6 +131,8 @@ def get_questions():
             'current_page': page
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         return jsonify({'message': f'Erreur lors de la récupération: {str(e)}'}), 500
 
@@ -120,33 +168,66 @@ def create_question(current_user):
         db.session.rollback()
         return jsonify({'message': f'Erreur lors de la création: {str(e)}'}), 500
 
+def _question_detail(question, current_user):
+    answers = Answer.query.options(joinedload(Answer.author)).filter_by(question_id=question.id).order_by(Answer.votes.desc(), Answer.created_at.asc()).all()
+    
+    question_data = question.to_dict()
+    question_data['answers'] = [answer.to_dict() for answer in answers]
+
+    question_data['user_vote'] = None
+    if current_user:
+        existing = QuestionVote.query.filter_by(user_id=current_user.id, question_id=question.id).first()
+        if existing:
+            question_data['user_vote'] = 'up' if existing.is_up else 'down'
+
+        answer_votes = {}
+        if answers:
+            votes = AnswerVote.query.filter(
+                AnswerVote.user_id == current_user.id,
+                AnswerVote.answer_id.in_([a.id for a in answers])
+            ).all()
+            answer_votes = {v.answer_id: ('up' if v.is_up else 'down') for v in votes}
+        for answer_data in question_data['answers']:
+            answer_data['user_vote'] = answer_votes.get(answer_data['id'])
+
+    return question_data
+
+def _user_vote_marks(user_id, question_id, answer_ids):
+    """Votes de l'utilisateur sur la question et ses réponses (pour l'ETag)."""
+    question_vote = db.session.query(QuestionVote.is_up).filter_by(
+        user_id=user_id, question_id=question_id
+    ).scalar()
+    answer_votes = []
+    if answer_ids:
+        answer_votes = db.session.query(AnswerVote.answer_id, AnswerVote.is_up).filter(
+            AnswerVote.user_id == user_id,
+            AnswerVote.answer_id.in_(answer_ids)
+        ).order_by(AnswerVote.answer_id).all()
+    return question_vote, [tuple(vote) for vote in answer_votes]
+
 @questions_bp.route('/questions/<int:question_id>', methods=['GET'])
 def get_question(question_id):
     try:
         question = Question.query.get_or_404(question_id)
-        
-        answers = Answer.query.filter_by(question_id=question_id).order_by(Answer.votes.desc(), Answer.created_at.asc()).all()
-        
-        question_data = question.to_dict()
-        question_data['answers'] = [answer.to_dict() for answer in answers]
-
-        auth_header = request.headers.get('Authorization')
-        question_data['user_vote'] = None
-        if auth_header:
-            try:
-                token = auth_header
-                if token.startswith('Bearer '):
-                    token = token[7:]
-                data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-                current_user = User.query.get(data['user_id'])
-                if current_user:
-                    existing = QuestionVote.query.filter_by(user_id=current_user.id, question_id=question_id).first()
-                    if existing:
-                        question_data['user_vote'] = 'up' if existing.is_up else 'down'
-            except Exception:
-                pass # Ignore if token is invalid, it's an optional authentication
-        
-        return jsonify({'question': question_data}), 200
+        current_user = get_current_user()
+
+        # Filigrane propre à cette question : versions de ses lignes (toute
+        # écriture les incrémente, votes appliqués en SQL compris), deltas
+        # de votes pas encore écrits et, connecté, les votes de l'utilisateur
+        answers = db.session.query(Answer.id, Answer.version).filter(
+            Answer.question_id == question_id
+        ).order_by(Answer.id).all()
+        etag_parts = [
+            question.id, question.version, vote_buffer.pending(Question, question_id),
+            [(answer_id, version, vote_buffer.pending(Answer, answer_id)) for answer_id, version in answers]
+        ]
+        if current_user:
+            etag_parts += [current_user.id, _user_vote_marks(current_user.id, question_id, [a.id for a in answers])]
+
+        return conditional_json(
+            lambda: {'question': _question_detail(question, current_user)},
+            etag_parts, public=current_user is None
+        )
         
     except Exception as e:
         return jsonify({'message': f'Erreur lors de la récupération: {str(e)}'}), 500
@@ -168,6 +249,11 @@ def create_answer(current_user, question_id):
         )
         
         db.session.add(answer)
+        # Incrément atomique en SQL, dans la même transaction que l'INSERT
+        Question.query.filter_by(id=question_id).update(
+            {Question.answers_count: Question.answers_count + 1}, synchronize_session=False
+        )
+        refresh_hot_score(question_id)
         db.session.commit()
         
         return jsonify({
@@ -179,6 +265,24 @@ def create_answer(current_user, question_id):
         db.session.rollback()
         return jsonify({'message': f'Erreur lors de la création: {str(e)}'}), 500
 
+def _toggle_vote(vote_model, target_field, target_id, user_id, vote_type):
+    """Créer, inverser ou retirer le vote de l'utilisateur.
+
+    Retourne (delta à appliquer au compteur, vote de l'utilisateur après coup).
+    """
+    is_up = (vote_type == 'up')
+    existing = vote_model.query.filter_by(user_id=user_id, **{target_field: target_id}).first()
+
+    if existing:
+        if existing.is_up == is_up:
+            db.session.delete(existing)
+            return (-1 if is_up else 1), None
+        existing.is_up = is_up
+        return (2 if is_up else -2), vote_type
+
+    db.session.add(vote_model(user_id=user_id, is_up=is_up, **{target_field: target_id}))
+    return (1 if is_up else -1), vote_type
+
 @questions_bp.route('/questions/<int:question_id>/vote', methods=['POST'])
 @token_required
 def vote_question(current_user, question_id):
@@ -190,31 +294,16 @@ def vote_question(current_user, question_id):
         if vote_type not in ('up', 'down'):
             return jsonify({'message': 'Type de vote invalide'}), 400
 
-        existing = QuestionVote.query.filter_by(user_id=current_user.id, question_id=question_id).first()
-        is_up = (vote_type == 'up')
-
-        if existing:
-            if existing.is_up == is_up:
-                db.session.delete(existing)
-                question.votes -= 1 if is_up else -1
-            else:
-                existing.is_up = is_up
-                question.votes += 2 if is_up else -2
-        else:
-            new_vote = QuestionVote(user_id=current_user.id, question_id=question_id, is_up=is_up)
-            db.session.add(new_vote)
-            question.votes += 1 if is_up else -1
-
+        delta, user_vote = _toggle_vote(QuestionVote, 'question_id', question_id, current_user.id, vote_type)
+        if not vote_buffer.apply(Question, question_id, delta):
+            # Clé chaude : le score sera recalculé au flush du lot
+            refresh_hot_score(question_id)
         db.session.commit()
-
-        user_vote = None
-        existing_after = QuestionVote.query.filter_by(user_id=current_user.id, question_id=question_id).first()
-        if existing_after:
-            user_vote = 'up' if existing_after.is_up else 'down'
+        vote_buffer.maybe_flush()
 
         return jsonify({
             'message': 'Vote enregistré',
-            'votes': question.votes,
+            'votes': (question.votes or 0) + vote_buffer.pending(Question, question_id),
             'user_vote': user_vote
         }), 200
 
@@ -231,18 +320,18 @@ def vote_answer(current_user, answer_id):
         
         vote_type = data.get('type')
         
-        if vote_type == 'up':
-            answer.votes += 1
-        elif vote_type == 'down':
-            answer.votes -= 1
-        else:
+        if vote_type not in ('up', 'down'):
             return jsonify({'message': 'Type de vote invalide'}), 400
         
+        delta, user_vote = _toggle_vote(AnswerVote, 'answer_id', answer_id, current_user.id, vote_type)
+        vote_buffer.apply(Answer, answer_id, delta)
         db.session.commit()
+        vote_buffer.maybe_flush()
         
         return jsonify({
             'message': 'Vote enregistré',
-            'votes': answer.votes
+            'votes': (answer.votes or 0) + vote_buffer.pending(Answer, answer_id),
+            'user_vote': user_vote
         }), 200
         
     except Exception as e:
@@ -262,6 +351,9 @@ def accept_answer(current_user, answer_id):
         Answer.query.filter_by(question_id=question.id).update({'is_accepted': False})
         
         answer.is_accepted = True
+        Question.query.filter_by(id=question.id).update(
+            {Question.has_accepted_answer: True}, synchronize_session=False
+        )
         db.session.commit()
         
         return jsonify({
@@ -1,8 +1,28 @@
 from flask import Blueprint, jsonify, request
 from ..models.user import User, db
+from ..services import presence
+from .auth import token_required
 
 user_bp = Blueprint('user', __name__)
 
+@user_bp.route('/users/presence', methods=['GET'])
+@token_required
+def get_users_presence(current_user):
+    """Présence de plusieurs utilisateurs : ?ids=1,2,3"""
+    try:
+        user_ids = [int(value) for value in request.args.get('ids', '').split(',') if value.strip()]
+    except ValueError:
+        return jsonify({'message': 'ids invalides (entiers séparés par des virgules)'}), 400
+    if len(user_ids) > presence.MAX_PRESENCE_QUERY:
+        return jsonify({'message': f'{presence.MAX_PRESENCE_QUERY} utilisateurs au plus'}), 400
+    if not presence.AUTHORITATIVE:
+        # Registre en mémoire avec plusieurs workers : réponse incomplète
+        return jsonify({'message': 'Présence non partagée entre les workers (PRESENCE_STORE=database requis)'}), 503
+
+    return jsonify({
+        'presence': {str(user_id): state for user_id, state in presence.presence_of(user_ids).items()}
+    })
+
 @user_bp.route('/users/search', methods=['GET'])
 def search_users():
     query = request.args.get('q', '')
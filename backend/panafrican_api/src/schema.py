@@ -0,0 +1,42 @@
+"""Mise à jour idempotente du schéma d'une base existante.
+
+`db.create_all()` crée les tables manquantes mais ne touche pas aux tables
+déjà présentes : les colonnes et index ajoutés aux modèles depuis doivent
+être ajoutés à la main (`ALTER TABLE ... ADD COLUMN`, `CREATE INDEX`). Ce
+module le fait pour toutes les tables déclarées, et peut être relancé sans
+risque.
+"""
+import logging
+
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
+
+from .models.user import db
+from .services.search import ensure_question_fts
+
+
+def upgrade_schema():
+    """Créer les tables manquantes, ajouter les colonnes et index manquants
+    et créer l'index plein texte des questions.
+
+    Retourne la liste des colonnes ajoutées sous la forme 'table.colonne'.
+    """
+    db.create_all()
+
+    engine = db.engine
+    inspector = inspect(engine)
+    added = []
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            existing = {col['name'] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {ddl}'))
+                added.append(f'{table.name}.{column.name}')
+                logging.getLogger(__name__).info('Colonne ajoutée : %s.%s', table.name, column.name)
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+        ensure_question_fts(conn)
+    return added
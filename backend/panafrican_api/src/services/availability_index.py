@@ -0,0 +1,175 @@
+"""Index des intervalles libres de tous les mentors.
+
+Pour répondre à « qui est libre entre T1 et T2 pendant D minutes ? » sans
+recalculer les créneaux de chaque mentor, la table `mentor_free_interval`
+stocke, mentor par mentor, les intervalles libres (disponibilités moins
+sessions réservées, cf. services/slots.py) jusqu'à `HORIZON_DAYS` jours.
+Les intervalles d'un mentor sont fusionnés : deux lignes d'un même mentor ne
+se chevauchent ni ne se touchent.
+
+Mise à jour incrémentale :
+- réservation / annulation : seules les lignes du mentor qui touchent la
+  session sont recalculées (`refresh_free_intervals`) ;
+- nouvelles disponibilités : l'index du mentor est reconstruit ;
+- tâche de fond : suppression des intervalles passés et extension de
+  l'horizon d'un jour chaque jour.
+"""
+import logging
+from datetime import datetime, time
+
+from sqlalchemy import and_, delete, false, func, insert, select
+
+from ..models.user import db
+from ..models.mentor import MentorAvailability, MentorFreeInterval, MentorSession
+from . import slots
+
+HORIZON_DAYS = 90
+MAINTENANCE_INTERVAL = 3600  # secondes
+
+# Fin de la période indexée (en minutes), connue après la première
+# reconstruction complète de ce processus
+_indexed_until = None
+
+
+def horizon_end(now):
+    midnight = slots.to_minutes(datetime.combine(now.date(), time.min))
+    return midnight + HORIZON_DAYS * slots.MINUTES_PER_DAY
+
+
+def refresh_free_intervals(mentor_ids, start, end):
+    """Recalculer l'index de `mentor_ids` (None : tous) sur [start, end).
+
+    Les lignes qui touchent la période sont remplacées ; la période est
+    élargie à leur étendue pour que le résultat reste fusionné. S'exécute
+    dans la transaction courante de la session.
+    """
+    touching = and_(MentorFreeInterval.start_minute <= end, MentorFreeInterval.end_minute >= start)
+    if mentor_ids is not None:
+        touching = and_(touching, MentorFreeInterval.mentor_id.in_(mentor_ids))
+
+    low, high = db.session.execute(
+        select(func.min(MentorFreeInterval.start_minute), func.max(MentorFreeInterval.end_minute)).where(touching)
+    ).one()
+    start = min(start, low) if low is not None else start
+    end = max(end, high) if high is not None else end
+
+    db.session.execute(delete(MentorFreeInterval).where(touching).execution_options(synchronize_session=False))
+    return _insert_free_intervals(mentor_ids, start, end)
+
+
+def rebuild_free_intervals(mentor_ids=None, now=None):
+    """Reconstruire entièrement l'index de `mentor_ids` (None : tous)
+    depuis `now` jusqu'à l'horizon."""
+    now = now or datetime.now()
+    stale = delete(MentorFreeInterval)
+    if mentor_ids is not None:
+        stale = stale.where(MentorFreeInterval.mentor_id.in_(mentor_ids))
+    db.session.execute(stale.execution_options(synchronize_session=False))
+    return _insert_free_intervals(mentor_ids, slots.to_minutes(now), horizon_end(now))
+
+
+def refresh_for_session(session):
+    """Mettre à jour l'index après la réservation ou l'annulation de `session`."""
+    start = slots.to_minutes(session.session_date)
+    refresh_free_intervals([session.mentor_id], start, start + (session.duration_minutes or 0))
+
+
+def _insert_free_intervals(mentor_ids, start, end):
+    availability_query = select(
+        MentorAvailability.mentor_id, MentorAvailability.day_of_week,
+        MentorAvailability.start_time, MentorAvailability.end_time
+    ).where(MentorAvailability.is_active == True)
+    session_query = select(
+        MentorSession.mentor_id, MentorSession.session_date, MentorSession.duration_minutes
+    ).where(
+        MentorSession.session_date >= slots.from_minutes(start - slots.MAX_SESSION_MINUTES),
+        MentorSession.session_date < slots.from_minutes(end),
+        MentorSession.status.in_(slots.BOOKED_STATUSES)
+    )
+    if mentor_ids is not None:
+        availability_query = availability_query.where(MentorAvailability.mentor_id.in_(mentor_ids))
+        session_query = session_query.where(MentorSession.mentor_id.in_(mentor_ids))
+
+    availabilities = {}
+    for row in db.session.execute(availability_query):
+        availabilities.setdefault(row.mentor_id, []).append(row)
+    sessions = {}
+    for row in db.session.execute(session_query):
+        sessions.setdefault(row.mentor_id, []).append(row)
+
+    rows = []
+    for mentor_id, mentor_availabilities in availabilities.items():
+        busy = slots.session_intervals(sessions.get(mentor_id, ()))
+        for free_start, free_end in slots.free_intervals(mentor_availabilities, busy, start, end):
+            rows.append({'mentor_id': mentor_id, 'start_minute': free_start, 'end_minute': free_end})
+    if rows:
+        db.session.execute(insert(MentorFreeInterval), rows)
+    return len(rows)
+
+
+def mentors_free_between(start, end, duration):
+    """Sous-requête des mentors ayant un intervalle libre d'au moins
+    `duration` minutes contenu dans [start, end)."""
+    if end - start < duration:
+        # Les conditions ci-dessous supposent la période assez longue
+        return select(MentorFreeInterval.mentor_id).where(false())
+    return select(MentorFreeInterval.mentor_id).where(
+        MentorFreeInterval.start_minute <= end - duration,
+        MentorFreeInterval.end_minute >= start + duration,
+        MentorFreeInterval.end_minute - MentorFreeInterval.start_minute >= duration
+    )
+
+
+def free_windows(mentor_ids, start, end, duration):
+    """Intervalles libres de chaque mentor dans [start, end), rognés à la
+    période et d'au moins `duration` minutes : {mentor_id: [(début, fin)]}."""
+    windows = {}
+    if not mentor_ids:
+        return windows
+    rows = db.session.execute(
+        select(MentorFreeInterval.mentor_id, MentorFreeInterval.start_minute, MentorFreeInterval.end_minute)
+        .where(
+            MentorFreeInterval.mentor_id.in_(mentor_ids),
+            MentorFreeInterval.start_minute < end,
+            MentorFreeInterval.end_minute > start
+        )
+        .order_by(MentorFreeInterval.mentor_id, MentorFreeInterval.start_minute)
+    )
+    for mentor_id, free_start, free_end in rows:
+        free_start, free_end = max(free_start, start), min(free_end, end)
+        if free_end - free_start >= duration:
+            windows.setdefault(mentor_id, []).append((free_start, free_end))
+    return windows
+
+
+def maintain_free_interval_index(now=None):
+    """Supprimer les intervalles passés et étendre l'horizon de l'index.
+
+    Au premier appel d'un processus, l'index est reconstruit entièrement.
+    """
+    global _indexed_until
+    now = now or datetime.now()
+    target = horizon_end(now)
+    if _indexed_until is None:
+        rebuild_free_intervals(now=now)
+    else:
+        db.session.execute(
+            delete(MentorFreeInterval)
+            .where(MentorFreeInterval.end_minute <= slots.to_minutes(now))
+            .execution_options(synchronize_session=False)
+        )
+        if target > _indexed_until:
+            refresh_free_intervals(None, _indexed_until, target)
+    db.session.commit()
+    _indexed_until = target
+
+
+def run_index_loop(app, sleep):
+    """Entretien périodique de l'index (tâche de fond Socket.IO)."""
+    while True:
+        try:
+            with app.app_context():
+                maintain_free_interval_index()
+        except Exception:
+            logging.getLogger(__name__).exception("Échec de l'entretien de l'index des disponibilités")
+        sleep(MAINTENANCE_INTERVAL)
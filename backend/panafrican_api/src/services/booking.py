@@ -0,0 +1,57 @@
+"""Réservation de sessions sans double réservation.
+
+Deux étudiants qui réservent le même créneau en même temps lisaient chacun
+l'agenda du mentor, n'y voyaient pas de conflit et inséraient tous les
+deux leur session. La réservation est désormais sérialisée par mentor :
+
+1. `lock_mentor_schedule` incrémente `mentor.total_sessions` en premier
+   ordre SQL de la transaction. Sous SQLite, cette écriture prend le verrou
+   d'écriture de la base (les réservations concurrentes attendent le
+   commit, jusqu'au délai `busy_timeout`) ; sous un SGBD à verrous de
+   ligne, elle verrouille la ligne du mentor. Dans les deux cas, les
+   lectures qui suivent voient les sessions validées par les autres.
+2. `find_overlapping_session` cherche un conflit par une requête sur
+   l'index (mentor_id, session_date, status) : une session qui chevauche
+   [début, fin) commence avant `fin` et au plus `MAX_SESSION_MINUTES`
+   minutes avant `début`.
+
+Si la réservation échoue (conflit, erreur), le rollback annule aussi
+l'incrément du compteur.
+"""
+from datetime import timedelta
+
+from sqlalchemy import update
+
+from ..models.user import db
+from ..models.mentor import Mentor, MentorSession
+from . import slots
+
+
+def lock_mentor_schedule(mentor_id, count_session=True):
+    """Sérialiser les réservations de `mentor_id` jusqu'à la fin de la
+    transaction (et compter la session à venir si `count_session`)."""
+    if count_session:
+        values = {'total_sessions': db.func.coalesce(Mentor.total_sessions, 0) + 1}
+    else:
+        # Écriture sans effet : prend le verrou sans changer la version
+        values = {'total_sessions': Mentor.total_sessions, 'version': Mentor.version}
+    db.session.execute(
+        update(Mentor)
+        .where(Mentor.id == mentor_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def find_overlapping_session(mentor_id, start, end):
+    """Première session réservée du mentor qui chevauche [start, end), ou None."""
+    candidates = MentorSession.query.filter(
+        MentorSession.mentor_id == mentor_id,
+        MentorSession.session_date > start - timedelta(minutes=slots.MAX_SESSION_MINUTES),
+        MentorSession.session_date < end,
+        MentorSession.status.in_(slots.BOOKED_STATUSES)
+    ).order_by(MentorSession.session_date).all()
+    for session in candidates:
+        if session.session_date + timedelta(minutes=session.duration_minutes or 0) > start:
+            return session
+    return None
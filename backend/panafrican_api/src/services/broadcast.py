@@ -0,0 +1,110 @@
+"""Diffusion des invalidations de cache entre processus serveur.
+
+Les caches locaux à un processus (identités authentifiées, voir
+`principals.py` ; plannings des mentors, voir `schedule_cache.py`) sont
+invalidés à l'écriture dans le processus qui écrit.
+Avec plusieurs workers (voir run_workers.py), les autres garderaient
+l'ancienne valeur jusqu'à l'expiration de l'entrée : un utilisateur
+désactivé ou supprimé resterait authentifié sur les autres workers.
+
+`publish` applique donc l'invalidation localement puis la publie sur la
+file de messages partagée (`SOCKETIO_MESSAGE_QUEUE`, protocole Redis),
+canal `<SOCKETIO_CHANNEL>-invalidations`. Chaque worker s'y abonne
+(`run_listener`, lancé par main.py) et applique les invalidations venues
+des autres processus. Sans file de messages, tout reste local.
+
+Un message publié pendant une coupure de l'abonnement est perdu : à chaque
+(ré)abonnement, les caches enregistrés sont vidés entièrement.
+"""
+import json
+import logging
+import uuid
+
+RECONNECT_DELAY = 1  # secondes
+
+# sujet -> (invalider(valeur), vider())
+_topics = {}
+_origin = uuid.uuid4().hex
+_client = None
+
+
+def register(topic, invalidate, reset):
+    """Déclarer un cache : `invalidate(valeur)` retire une entrée, `reset()`
+    vide tout le cache."""
+    _topics[topic] = (invalidate, reset)
+
+
+def publish(topic, value):
+    """Invalider `value` dans ce processus et dans tous les autres."""
+    _topics[topic][0](value)
+    publish_to_others(topic, value)
+
+
+def publish_to_others(topic, value):
+    """Invalider `value` dans les autres processus seulement, quand ce
+    processus a déjà mis son propre cache à jour."""
+    client = _get_client()
+    if client is None:
+        return
+    message = json.dumps({'origin': _origin, 'topic': topic, 'value': value})
+    try:
+        client.publish(_channel(), message)
+    except Exception:
+        # Les autres workers retomberont sur l'expiration de leurs entrées
+        logging.getLogger(__name__).exception("Échec de la diffusion de l'invalidation %s", topic)
+
+
+def run_listener(sleep):
+    """Boucle d'abonnement aux invalidations des autres processus (tâche de
+    fond de chaque worker) ; se réabonne après une coupure."""
+    client = _get_client()
+    if client is None:
+        return
+    while True:
+        try:
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(_channel())
+            _reset_all()
+            for message in pubsub.listen():
+                _receive(message['data'])
+        except Exception:
+            logging.getLogger(__name__).exception('Abonnement aux invalidations interrompu')
+        sleep(RECONNECT_DELAY)
+
+
+def _receive(data):
+    try:
+        message = json.loads(data)
+        if message['origin'] == _origin:
+            return
+        handlers = _topics.get(message['topic'])
+        value = message['value']
+    except (ValueError, KeyError, TypeError):
+        logging.getLogger(__name__).warning('Invalidation illisible ignorée : %r', data)
+        return
+    if handlers is not None:
+        handlers[0](value)
+
+
+def _reset_all():
+    for _, reset in _topics.values():
+        reset()
+
+
+def _channel():
+    from .. import SOCKETIO_CHANNEL
+
+    return f'{SOCKETIO_CHANNEL}-invalidations'
+
+
+def _get_client():
+    global _client
+    from .. import SOCKETIO_MESSAGE_QUEUE
+
+    if not SOCKETIO_MESSAGE_QUEUE:
+        return None
+    if _client is None:
+        import redis
+
+        _client = redis.Redis.from_url(SOCKETIO_MESSAGE_QUEUE, socket_connect_timeout=1)
+    return _client
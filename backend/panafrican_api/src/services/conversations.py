@@ -0,0 +1,190 @@
+"""Table `conversation` : la boîte de réception matérialisée.
+
+Lister les conversations d'un utilisateur en relisant tous ses messages
+(un « dernier message » et un utilisateur chargés par interlocuteur, puis
+un tri en Python) coûte plusieurs requêtes par interlocuteur. La table
+`conversation` garde une ligne par paire d'utilisateurs avec le dernier
+message, la date de dernière activité et le nombre de messages non lus de
+chaque côté ; la liste devient une seule requête sur l'index
+(utilisateur, last_activity_at).
+
+La ligne est mise à jour dans la transaction qui écrit le message ou le
+marque comme lu : elle ne peut pas diverger de la table `messages`, sauf
+écriture hors API (`rebuild_conversations` la reconstruit alors).
+
+L'historique d'une conversation se lit par fenêtres de
+`HISTORY_PAGE_SIZE` messages avant ou après un message donné ; chaque sens
+de la conversation est lu sur l'index (sender_id, recipient_id,
+created_at), sans jamais parcourir tout l'historique.
+"""
+from sqlalchemy import and_, case, delete, func, insert, select, tuple_, union_all, update
+from sqlalchemy.exc import IntegrityError
+
+from ..models.user import db, User
+from ..models.message import Conversation, Message
+from .pagination import order_clauses
+
+HISTORY_PAGE_SIZE = 50
+MAX_HISTORY_PAGE_SIZE = 200
+
+
+def user_pair(user_id, other_id):
+    """(plus petit id, plus grand id) : clé de la conversation."""
+    return (user_id, other_id) if user_id <= other_id else (other_id, user_id)
+
+
+def _unread_column(user_id, other_id):
+    low, _ = user_pair(user_id, other_id)
+    return 'unread_low' if user_id == low else 'unread_high'
+
+
+def _conversation_filter(low, high):
+    return and_(Conversation.user_low_id == low, Conversation.user_high_id == high)
+
+
+def record_message(message):
+    """Reporter `message` (déjà flushé) sur la conversation de ses deux
+    utilisateurs, en créant celle-ci au premier message."""
+    low, high = user_pair(message.sender_id, message.recipient_id)
+    unread = _unread_column(message.recipient_id, message.sender_id)
+    stmt = (
+        update(Conversation)
+        .where(_conversation_filter(low, high))
+        .values(**{
+            'last_message_id': message.id,
+            'last_activity_at': message.created_at,
+            unread: getattr(Conversation, unread) + 1
+        })
+        .execution_options(synchronize_session=False)
+    )
+    if db.session.execute(stmt).rowcount:
+        return
+
+    try:
+        with db.session.begin_nested():
+            db.session.add(Conversation(
+                user_low_id=low,
+                user_high_id=high,
+                last_message_id=message.id,
+                last_activity_at=message.created_at,
+                **{unread: 1}
+            ))
+    except IntegrityError:
+        # Premier message envoyé en même temps par l'autre utilisateur
+        db.session.execute(stmt)
+
+
+def reset_unread(reader_id, partner_id):
+    """Remettre à zéro les non-lus de `reader_id` dans sa conversation
+    avec `partner_id` (ses messages reçus viennent d'être marqués lus)."""
+    low, high = user_pair(reader_id, partner_id)
+    unread = _unread_column(reader_id, partner_id)
+    db.session.execute(
+        update(Conversation)
+        .where(_conversation_filter(low, high), getattr(Conversation, unread) != 0)
+        .values(**{unread: 0})
+        .execution_options(synchronize_session=False)
+    )
+
+
+def mark_conversation_read(reader_id, partner_id, now):
+    """Marquer lus, en un seul UPDATE, les messages reçus de `partner_id` ;
+    retourne le nombre de messages marqués."""
+    marked = db.session.execute(
+        update(Message)
+        .where(
+            Message.recipient_id == reader_id,
+            Message.sender_id == partner_id,
+            Message.read_at.is_(None)
+        )
+        .values(read_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if marked:
+        reset_unread(reader_id, partner_id)
+    return marked
+
+
+def message_history(user_id, partner_id, limit=HISTORY_PAGE_SIZE, before=None, after=None):
+    """Fenêtre de `limit` messages entre les deux utilisateurs, en ordre
+    chronologique : les plus récents avant le message `before` (ou les
+    derniers de la conversation), ou les plus anciens après `after`.
+
+    Retourne (messages, has_more), has_more indiquant s'il reste des
+    messages au-delà de la fenêtre dans le sens de lecture.
+    """
+    forward = after is not None
+    order = [(Message.created_at, not forward), (Message.id, not forward)]
+    position = tuple_(Message.created_at, Message.id)
+
+    def one_side(sender_id, recipient_id):
+        # Un sens de la conversation : parcours de l'index borné par limit
+        query = select(Message.id).where(Message.sender_id == sender_id, Message.recipient_id == recipient_id)
+        if forward:
+            query = query.where(position > tuple_(after.created_at, after.id))
+        elif before is not None:
+            query = query.where(position < tuple_(before.created_at, before.id))
+        query = query.order_by(*order_clauses(order)).limit(limit + 1).subquery()
+        return select(query.c.id)
+
+    messages = (
+        Message.query
+        .filter(Message.id.in_(union_all(one_side(user_id, partner_id), one_side(partner_id, user_id))))
+        .order_by(*order_clauses(order))
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    if not forward:
+        messages.reverse()
+    return messages, has_more
+
+
+def conversations_query(user_id):
+    """Requête (Conversation, interlocuteur, dernier message) des
+    conversations de `user_id`, à trier par `CONVERSATION_ORDER`."""
+    partner_id = case(
+        (Conversation.user_low_id == user_id, Conversation.user_high_id),
+        else_=Conversation.user_low_id
+    )
+    return (
+        db.session.query(Conversation, User, Message)
+        .join(User, User.id == partner_id)
+        .outerjoin(Message, Message.id == Conversation.last_message_id)
+        .filter((Conversation.user_low_id == user_id) | (Conversation.user_high_id == user_id))
+    )
+
+
+CONVERSATION_ORDER = [(Conversation.last_activity_at, True), (Conversation.id, True)]
+
+
+def conversation_key(row):
+    conversation = row[0]
+    return [conversation.last_activity_at, conversation.id]
+
+
+def rebuild_conversations():
+    """Reconstruire toute la table depuis `messages` ; retourne le nombre
+    de conversations."""
+    low = case((Message.sender_id <= Message.recipient_id, Message.sender_id), else_=Message.recipient_id)
+    high = case((Message.sender_id <= Message.recipient_id, Message.recipient_id), else_=Message.sender_id)
+    unread_low = func.sum(case(
+        (and_(Message.recipient_id == low, Message.read_at.is_(None)), 1),
+        else_=0
+    ))
+    # Pour un message à soi-même (low == high), le non-lu compte côté low
+    unread_high = func.sum(case(
+        (and_(Message.recipient_id == high, Message.sender_id != high, Message.read_at.is_(None)), 1),
+        else_=0
+    ))
+    db.session.execute(delete(Conversation))
+    db.session.execute(
+        insert(Conversation).from_select(
+            ['user_low_id', 'user_high_id', 'last_message_id', 'last_activity_at', 'unread_low', 'unread_high'],
+            select(low, high, func.max(Message.id), func.max(Message.created_at), unread_low, unread_high)
+            .group_by(low, high)
+        )
+    )
+    db.session.commit()
+    return db.session.query(func.count(Conversation.id)).scalar()
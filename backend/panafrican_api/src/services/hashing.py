@@ -0,0 +1,96 @@
+"""Hachage des mots de passe hors du hub eventlet.
+
+`generate_password_hash` / `check_password_hash` (scrypt, PBKDF2) coûtent
+des dizaines de millisecondes de CPU. Exécutés directement dans un
+greenlet, ils bloquent toutes les autres requêtes et connexions Socket.IO
+du processus. Ici ils passent par un pool borné de threads natifs
+(hashlib relâche le GIL pendant le calcul) avec une file d'attente limitée :
+au-delà, `HashingPoolBusy` est levée et la route répond 503 immédiatement.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import greenlet
+from werkzeug.security import generate_password_hash, check_password_hash
+
+try:
+    from eventlet import tpool
+    from eventlet.semaphore import Semaphore as GreenSemaphore
+except ImportError:  # eventlet absent : seul le pool de threads est utilisé
+    tpool = None
+    GreenSemaphore = None
+
+HASHING_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 4))
+HASHING_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 64))
+
+
+class HashingPoolBusy(Exception):
+    """Trop de hachages en attente : la requête doit être rejetée (503)."""
+
+
+class HashingPool:
+    """Pool borné de threads natifs pour les fonctions de hachage."""
+
+    def __init__(self, max_workers=HASHING_WORKERS, max_pending=HASHING_MAX_PENDING):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.rejected = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = None
+        self._green_slots = GreenSemaphore(max_workers) if GreenSemaphore else None
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HashingPoolBusy()
+            self._pending += 1
+        try:
+            if tpool is not None and _in_green_thread():
+                # Sous eventlet : le greenlet attend sans bloquer le hub
+                with self._green_slots:
+                    return tpool.execute(fn, *args)
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self):
+        return {
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'pending': self._pending,
+            'rejected': self.rejected
+        }
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix='password-hash'
+                    )
+        return self._executor
+
+
+def _in_green_thread():
+    # Les requêtes servies par eventlet tournent dans des greenlets enfants du
+    # hub ; le greenlet principal d'un thread n'a pas de parent.
+    return greenlet.getcurrent().parent is not None
+
+
+hashing_pool = HashingPool()
+
+
+def hash_password(password):
+    return hashing_pool.run(generate_password_hash, password)
+
+
+def verify_password(password_hash, password):
+    return hashing_pool.run(check_password_hash, password_hash, password)
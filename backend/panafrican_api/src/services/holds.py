@@ -0,0 +1,198 @@
+"""Blocage temporaire de créneaux pendant la réservation.
+
+Entre l'affichage des créneaux et la réservation, un étudiant peut bloquer
+un créneau pour `HOLD_TTL_MINUTES` minutes : les autres ne le voient plus
+dans `available-slots` et ne peuvent plus le réserver. La réservation
+convertit le blocage en `MentorSession`.
+
+Deux stockages, choisis par la variable d'environnement `SLOT_HOLD_STORE` :
+- `memory` (défaut) : en mémoire du processus, suffisant avec un seul
+  processus serveur ;
+- `database` : table `slot_hold`, partagée entre plusieurs processus.
+
+Les blocages expirés sont ignorés à la lecture et purgés à chaque nouveau
+blocage, sans parcourir tous les blocages : par un tas trié par date
+d'expiration en mémoire, par un DELETE sur l'index `expires_at` en base.
+
+La libération d'un blocage (`release_hold`) suit la transaction en cours :
+si la réservation qui le convertit échoue au commit, le blocage reste en
+place et le créneau n'est pas offert aux autres.
+"""
+import heapq
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..models.user import db
+from ..models.mentor import SlotHold
+from . import slots
+from .booking import find_overlapping_session, lock_mentor_schedule
+
+HOLD_TTL_MINUTES = 10
+MAX_HOLD_TTL_MINUTES = 30
+SLOT_HOLD_STORE = os.environ.get('SLOT_HOLD_STORE', 'memory')
+
+_PENDING_KEY = 'released_slot_holds'
+
+
+class MemoryHoldStore:
+    """Blocages en mémoire : {id: SlotHold} (objets transitoires, jamais
+    ajoutés à la session), index par mentor et tas des expirations."""
+
+    def __init__(self):
+        self._holds = {}
+        self._by_mentor = {}
+        self._expiries = []
+        self._lock = threading.Lock()
+
+    def add(self, hold):
+        with self._lock:
+            self._holds[hold.id] = hold
+            self._by_mentor.setdefault(hold.mentor_id, set()).add(hold.id)
+            heapq.heappush(self._expiries, (hold.expires_at, hold.id))
+
+    def get(self, hold_id, now):
+        hold = self._holds.get(hold_id)
+        if hold is None or hold.expires_at <= now:
+            return None
+        return hold
+
+    def remove(self, hold_id):
+        with self._lock:
+            self._discard(hold_id)
+
+    def release(self, hold_id):
+        # Retiré au commit de la transaction en cours (tout de suite hors
+        # transaction) ; un rollback conserve le blocage
+        session = db.session()
+        if not session.in_transaction():
+            self.remove(hold_id)
+            return
+        session.info.setdefault(_PENDING_KEY, set()).add(hold_id)
+
+    def overlapping(self, mentor_id, start, end, now):
+        with self._lock:
+            ids = list(self._by_mentor.get(mentor_id, ()))
+        holds = [self._holds.get(hold_id) for hold_id in ids]
+        return [hold for hold in holds
+                if hold is not None and hold.expires_at > now and hold.start_at < end and hold.end_at > start]
+
+    def reap(self, now):
+        reaped = 0
+        with self._lock:
+            while self._expiries and self._expiries[0][0] <= now:
+                expires_at, hold_id = heapq.heappop(self._expiries)
+                hold = self._holds.get(hold_id)
+                if hold is not None and hold.expires_at == expires_at:
+                    self._discard(hold_id)
+                    reaped += 1
+        return reaped
+
+    def _discard(self, hold_id):
+        hold = self._holds.pop(hold_id, None)
+        if hold is not None:
+            mentor_holds = self._by_mentor.get(hold.mentor_id)
+            mentor_holds.discard(hold_id)
+            if not mentor_holds:
+                del self._by_mentor[hold.mentor_id]
+
+
+class DatabaseHoldStore:
+    """Blocages dans la table `slot_hold`, dans la transaction de la session."""
+
+    def add(self, hold):
+        db.session.add(hold)
+
+    def get(self, hold_id, now):
+        hold = db.session.get(SlotHold, hold_id)
+        if hold is None or hold.expires_at <= now:
+            return None
+        return hold
+
+    def remove(self, hold_id):
+        SlotHold.query.filter_by(id=hold_id).delete(synchronize_session=False)
+
+    def release(self, hold_id):
+        # DELETE dans la transaction : annulé par un rollback
+        self.remove(hold_id)
+
+    def overlapping(self, mentor_id, start, end, now):
+        # Même borne que pour les sessions : la requête reste sur l'index
+        return SlotHold.query.filter(
+            SlotHold.mentor_id == mentor_id,
+            SlotHold.start_at > start - timedelta(minutes=slots.MAX_SESSION_MINUTES),
+            SlotHold.start_at < end,
+            SlotHold.end_at > start,
+            SlotHold.expires_at > now
+        ).all()
+
+    def reap(self, now):
+        return SlotHold.query.filter(SlotHold.expires_at <= now).delete(synchronize_session=False)
+
+
+_store = DatabaseHoldStore() if SLOT_HOLD_STORE == 'database' else MemoryHoldStore()
+
+
+def held_intervals(mentor_id, start, end, exclude_user_id=None):
+    """Intervalles (en minutes) bloqués par d'autres utilisateurs sur [start, end)."""
+    now = datetime.utcnow()
+    return [
+        (slots.to_minutes(hold.start_at), slots.to_minutes(hold.end_at))
+        for hold in _store.overlapping(mentor_id, start, end, now)
+        if hold.user_id != exclude_user_id
+    ]
+
+
+def is_held_by_other(mentor_id, start, end, user_id):
+    return bool(held_intervals(mentor_id, start, end, exclude_user_id=user_id))
+
+
+def place_hold(mentor_id, user_id, start, end, ttl_minutes=HOLD_TTL_MINUTES):
+    """Bloquer [start, end) pour `user_id` ; None si le créneau est pris.
+
+    Sérialisé avec les réservations du mentor ; valide la transaction.
+    """
+    lock_mentor_schedule(mentor_id, count_session=False)
+    # Purge au fil des blocages (filtrés par `expires_at` à la lecture)
+    _store.reap(datetime.utcnow())
+    if find_overlapping_session(mentor_id, start, end) or is_held_by_other(mentor_id, start, end, user_id):
+        db.session.rollback()
+        return None
+
+    hold = SlotHold(
+        id=uuid.uuid4().hex,
+        mentor_id=mentor_id,
+        user_id=user_id,
+        start_at=start,
+        end_at=end,
+        expires_at=datetime.utcnow() + timedelta(minutes=ttl_minutes)
+    )
+    _store.add(hold)
+    db.session.commit()
+    return hold
+
+
+def get_hold(hold_id):
+    """Blocage actif `hold_id`, ou None s'il n'existe pas ou a expiré."""
+    return _store.get(hold_id, datetime.utcnow())
+
+
+def release_hold(hold_id):
+    """Libérer `hold_id` avec la transaction en cours."""
+    _store.release(hold_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _release_after_commit(session):
+    for hold_id in session.info.pop(_PENDING_KEY, ()):
+        _store.remove(hold_id)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _keep_after_rollback(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,118 @@
+"""Classement « hot » des questions (score décroissant avec l'âge).
+
+score = (votes + ANSWER_WEIGHT * réponses) / (âge en heures + 2) ** GRAVITY
+
+Le score est stocké dans `question.hot_score` (indexé) pour que le tri
+`sort_by=hot` soit un simple parcours d'index. Il est recalculé :
+- pour une question donnée, à chaque vote ou nouvelle réponse ;
+- périodiquement (`rescore_hot_questions`), uniquement pour les questions
+  encore dans la fenêtre de décroissance. Au-delà, le score est remis à 0
+  une fois pour toutes.
+
+Le calcul est exposé à SQLite sous forme de fonction SQL `hot_score(...)`
+afin que ces mises à jour restent de simples UPDATE.
+"""
+import logging
+import math
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, func, or_, update
+from sqlalchemy.engine import Engine
+
+from ..models.user import db
+from ..models.question import Question
+from .votes import vote_buffer
+
+GRAVITY = 1.8
+ANSWER_WEIGHT = 2
+DECAY_WINDOW = timedelta(days=7)
+RESCORE_INTERVAL = 600  # secondes
+
+
+def compute_hot_score(votes, answers_count, created_at, now):
+    """Score d'une question ; `created_at` en datetime ou chaîne ISO, `now` en timestamp UTC."""
+    if created_at is None:
+        return 0.0
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
+    age_hours = max(0.0, (now - _utc_timestamp(created_at)) / 3600.0)
+    points = (votes or 0) + ANSWER_WEIGHT * (answers_count or 0)
+    return points / math.pow(age_hours + 2, GRAVITY)
+
+
+@event.listens_for(Engine, 'connect')
+def _register_sqlite_function(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_function('hot_score', 4, compute_hot_score, deterministic=True)
+
+
+def _score_values(now):
+    # `version` est fixé explicitement : le score n'est pas renvoyé par l'API,
+    # le recalculer ne doit pas invalider les ETag
+    return {
+        'hot_score': func.hot_score(Question.votes, Question.answers_count, Question.created_at, now),
+        'version': Question.version
+    }
+
+
+def refresh_hot_score(question_id):
+    """Recalculer le score d'une question dans la transaction courante."""
+    db.session.execute(
+        update(Question)
+        .where(Question.id == question_id)
+        .values(**_score_values(time.time()))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _refresh_after_flush(conn, question_ids):
+    # Votes « chauds » appliqués en lot par le VoteBuffer
+    conn.execute(
+        update(Question)
+        .where(Question.id.in_(question_ids))
+        .values(**_score_values(time.time()))
+    )
+
+
+vote_buffer.flush_hooks[Question.__tablename__] = _refresh_after_flush
+
+
+def rescore_hot_questions():
+    """Recalculer les scores de la fenêtre de décroissance et éteindre les autres.
+
+    Retourne (questions recalculées, questions sorties de la fenêtre).
+    """
+    now = time.time()
+    cutoff = datetime.utcnow() - DECAY_WINDOW
+    rescored = db.session.execute(
+        update(Question)
+        .where(Question.created_at >= cutoff)
+        .values(**_score_values(now))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    expired = db.session.execute(
+        update(Question)
+        .where(Question.created_at < cutoff, or_(Question.hot_score > 0, Question.hot_score < 0))
+        .values(hot_score=0, version=Question.version)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return rescored, expired
+
+
+def run_rescore_loop(app, sleep):
+    """Boucle de recalcul périodique (tâche de fond Socket.IO)."""
+    while True:
+        sleep(RESCORE_INTERVAL)
+        try:
+            with app.app_context():
+                rescore_hot_questions()
+        except Exception:
+            logging.getLogger(__name__).exception('Échec du recalcul des scores hot')
+
+
+def _utc_timestamp(value):
+    # Les dates du modèle sont des datetime UTC naïfs (datetime.utcnow)
+    return (value - datetime(1970, 1, 1)).total_seconds()
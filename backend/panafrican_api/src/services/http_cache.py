@@ -0,0 +1,56 @@
+"""Requêtes HTTP conditionnelles (ETag / Last-Modified / 304).
+
+Les routes calculent d'abord un « filigrane » bon marché de ce qu'elles
+renverraient (versions de lignes, nombre et id max, date de dernière
+modification). Si le client possède déjà cette version (`If-None-Match` ou
+`If-Modified-Since`), on répond 304 sans construire ni sérialiser le JSON.
+"""
+import hashlib
+from datetime import timezone
+
+from flask import current_app, jsonify, request
+
+
+def make_etag(*parts):
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def conditional_json(build, etag_parts, last_modified=None, max_age=0, public=True):
+    """Renvoyer `build()` en JSON, ou un 304 si le client est à jour.
+
+    `build` n'est appelée que si la réponse complète est nécessaire.
+    `last_modified` est une date UTC naïve (comme les colonnes du modèle).
+    Une réponse non publique varie selon l'en-tête Authorization.
+    """
+    etag = make_etag(*etag_parts)
+    if last_modified is not None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+
+    if _client_is_current(etag, last_modified):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(build())
+
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    if public:
+        response.cache_control.public = True
+    else:
+        response.cache_control.private = True
+        response.vary.add('Authorization')
+    if max_age:
+        response.cache_control.max_age = max_age
+    else:
+        # Toujours revalider (réponse 304 peu coûteuse)
+        response.cache_control.no_cache = True
+    return response
+
+
+def _client_is_current(etag, last_modified):
+    # If-None-Match est prioritaire sur If-Modified-Since (RFC 9110)
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified <= request.if_modified_since
+    return False
@@ -0,0 +1,129 @@
+"""Recherche de mentors par spécialité.
+
+`Mentor.specialties` est une chaîne JSON (ou une liste séparée par des
+virgules) : la filtrer par sous-chaîne (`LIKE '%Math%'`) parcourt tous les
+mentors et confond « Math » avec « Mathématiques appliquées ». La table
+`mentor_specialty` contient une ligne par (mentor, slug) où le slug est la
+spécialité normalisée (minuscules, sans accents, mots séparés par des
+tirets). Elle est synchronisée automatiquement à chaque flush d'un mentor
+dont `specialties` a changé, quelle que soit la route à l'origine.
+"""
+import json
+import re
+import unicodedata
+
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.orm import Session
+
+from ..models.user import db
+from ..models.mentor import Mentor, MentorSpecialty
+
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+
+# Les slugs ne contiennent que [a-z0-9-] : tout slug commençant par un
+# préfixe donné est compris entre `prefixe` et `prefixe~`
+_PREFIX_UPPER_BOUND = '~'
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def slugify_specialty(label):
+    text = unicodedata.normalize('NFKD', str(label)).encode('ascii', 'ignore').decode('ascii')
+    return _NON_ALNUM_RE.sub('-', text.lower()).strip('-')
+
+
+def parse_specialties(raw):
+    """Liste des spécialités d'un mentor depuis la colonne `specialties`."""
+    if not raw:
+        return []
+    try:
+        value = json.loads(raw)
+    except (TypeError, ValueError):
+        value = raw.split(',')
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, list):
+        value = [value]
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+def specialty_slugs(raw):
+    slugs = []
+    for label in parse_specialties(raw):
+        slug = slugify_specialty(label)
+        if slug and slug not in slugs:
+            slugs.append(slug)
+    return slugs
+
+
+def filter_by_specialties(query, specialties, match_all=False, prefix=None):
+    """Restreindre une requête sur `Mentor` aux spécialités demandées.
+
+    `specialties` : libellés recherchés exactement (après normalisation) ;
+    tous doivent être présents si `match_all`, au moins un sinon.
+    `prefix` : au moins une spécialité commençant par ce préfixe.
+    """
+    slugs = []
+    for label in specialties:
+        slug = slugify_specialty(label)
+        if slug and slug not in slugs:
+            slugs.append(slug)
+
+    if slugs:
+        matching = select(MentorSpecialty.mentor_id).where(MentorSpecialty.specialty_slug.in_(slugs))
+        if match_all and len(slugs) > 1:
+            matching = matching.group_by(MentorSpecialty.mentor_id).having(
+                func.count(MentorSpecialty.specialty_slug) == len(slugs)
+            )
+        query = query.filter(Mentor.id.in_(matching))
+
+    prefix_slug = slugify_specialty(prefix) if prefix else ''
+    if prefix_slug:
+        matching = select(MentorSpecialty.mentor_id).where(
+            MentorSpecialty.specialty_slug >= prefix_slug,
+            MentorSpecialty.specialty_slug < prefix_slug + _PREFIX_UPPER_BOUND
+        )
+        query = query.filter(Mentor.id.in_(matching))
+
+    return query
+
+
+def rebuild_mentor_specialties(batch_size=BACKFILL_BATCH_SIZE):
+    """Reconstruire entièrement `mentor_specialty` depuis les blobs JSON.
+
+    Retourne le nombre de lignes insérées.
+    """
+    db.session.execute(MentorSpecialty.__table__.delete())
+    inserted = 0
+    batch = []
+    rows = db.session.execute(select(Mentor.id, Mentor.specialties)).all()
+    for mentor_id, raw in rows:
+        for slug in specialty_slugs(raw):
+            batch.append({'mentor_id': mentor_id, 'specialty_slug': slug})
+        if len(batch) >= batch_size:
+            db.session.execute(insert(MentorSpecialty), batch)
+            inserted += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(MentorSpecialty), batch)
+        inserted += len(batch)
+    db.session.commit()
+    return inserted
+
+
+@event.listens_for(Session, 'before_flush')
+def _sync_specialty_index(session, flush_context, instances):
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Mentor):
+            continue
+        if obj not in session.new and not db.inspect(obj).attrs.specialties.history.has_changes():
+            continue
+
+        wanted = specialty_slugs(obj.specialties)
+        current = {row.specialty_slug: row for row in obj.specialty_index}
+        for slug, row in current.items():
+            if slug not in wanted:
+                obj.specialty_index.remove(row)
+        for slug in wanted:
+            if slug not in current:
+                obj.specialty_index.append(MentorSpecialty(specialty_slug=slug))
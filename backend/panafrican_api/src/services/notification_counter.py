@@ -0,0 +1,115 @@
+"""Compteur des notifications non lues, par utilisateur (table
+`notification_counter`).
+
+`get_notifications` renvoie `unread_count` à chaque appel : c'est une
+lecture par clé primaire au lieu d'un `COUNT(*)` sur la table des
+notifications. La valeur est en base, donc la même pour tous les workers :
+aucun cache de processus à invalider.
+
+Le compteur est incrémenté dans la transaction qui modifie les
+notifications, puis publié au commit :
+- création, lecture ou suppression d'une `Notification` via l'ORM : un
+  écouteur `after_flush` calcule la variation de chaque utilisateur
+  concerné (+1 par non-lue créée, -1 par non-lue lue ou supprimée),
+  quelle que soit la route (réservations, messages, rappels...) ;
+- mises à jour en masse (`mark-all-read`) : la route appelle
+  `add_unread_delta` avec le nombre de lignes modifiées.
+Chaque variation est un seul `INSERT ... ON CONFLICT DO UPDATE ...
+RETURNING` sur la ligne de l'utilisateur, sans recompter ses
+notifications. Au commit, la dernière valeur lue part dans la salle
+`user_<id>` (événement `unread_count`) ; un rollback annule l'incrément
+avec le reste de la transaction.
+
+`repair_unread_counts` recalcule la table depuis les notifications
+(écriture hors API, ou base antérieure au compteur).
+"""
+from sqlalchemy import delete, event, func, select
+from sqlalchemy.orm import Session, attributes
+
+from ..models.user import db
+from ..models.notification import Notification, NotificationCounter
+from . import presence, realtime
+from .upsert import upsert
+
+_PENDING_KEY = 'pending_unread_counts'
+
+
+def unread_count(user_id):
+    """Nombre de notifications non lues de `user_id`."""
+    count = db.session.query(NotificationCounter.unread_count).filter(
+        NotificationCounter.user_id == user_id
+    ).scalar()
+    return count or 0
+
+
+def add_unread_delta(user_id, delta, session=None):
+    """Ajouter `delta` au compteur de `user_id` dans la transaction en
+    cours ; la nouvelle valeur sera publiée au commit."""
+    if not delta:
+        return
+    session = session or db.session()
+    connection = session.connection()
+    stmt = upsert(
+        connection, NotificationCounter, {'user_id': user_id, 'unread_count': delta},
+        set_={'unread_count': NotificationCounter.unread_count + delta}
+    ).returning(NotificationCounter.unread_count)
+    session.info.setdefault(_PENDING_KEY, {})[user_id] = connection.execute(stmt).scalar_one()
+
+
+def repair_unread_counts(user_ids=None):
+    """Recalculer les compteurs (de `user_ids`, ou de tous les
+    utilisateurs) depuis la table des notifications ; retourne le nombre
+    d'utilisateurs ayant des non-lues."""
+    unread = (
+        select(Notification.user_id, func.count(Notification.id))
+        .where(Notification.is_read == False)
+        .group_by(Notification.user_id)
+    )
+    clear = delete(NotificationCounter)
+    if user_ids is not None:
+        unread = unread.where(Notification.user_id.in_(user_ids))
+        clear = clear.where(NotificationCounter.user_id.in_(user_ids))
+    db.session.execute(clear)
+    inserted = db.session.execute(
+        NotificationCounter.__table__.insert().from_select(['user_id', 'unread_count'], unread)
+    ).rowcount
+    db.session.commit()
+    return inserted
+
+
+def _unread_delta(notification, state):
+    if state == 'dirty':
+        added, _, deleted = attributes.get_history(notification, 'is_read')
+        if not added or not deleted or bool(added[0]) == bool(deleted[0]):
+            return 0
+        return -1 if added[0] else 1
+    if notification.is_read:
+        return 0
+    return 1 if state == 'new' else -1
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_flushed_notifications(session, flush_context):
+    deltas = {}
+    for state, objects in (('new', session.new), ('dirty', session.dirty), ('deleted', session.deleted)):
+        for obj in objects:
+            if isinstance(obj, Notification):
+                deltas[obj.user_id] = deltas.get(obj.user_id, 0) + _unread_delta(obj, state)
+    for user_id, delta in deltas.items():
+        add_unread_delta(user_id, delta, session)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_after_commit(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    for user_id, count in pending.items():
+        if presence.is_reachable(user_id):
+            realtime.queue_event(f"user_{user_id}", 'unread_count', {'unread_count': count})
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _drop_after_rollback(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,133 @@
+"""Pagination par curseur (keyset) pour les listes triées.
+
+La pagination par pages (`.paginate()`) repose sur OFFSET et sur un
+`COUNT(*)` complet : les pages profondes coûtent de plus en plus cher. En
+mode curseur, chaque page reprend juste après la clé de tri du dernier
+élément vu (`WHERE (created_at, id) < (?, ?)`), ce qui reste un simple
+parcours d'index quelle que soit la profondeur.
+
+Les curseurs sont opaques pour les clients : JSON encodé en base64url,
+contenant les valeurs de la clé de tri, le sens de lecture et la position
+de l'élément dans le classement.
+"""
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_, tuple_
+
+
+class InvalidCursor(ValueError):
+    """Curseur illisible ou incompatible avec le tri demandé."""
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor, prev_cursor, first_position):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        # Position (1 = premier) du premier élément dans le classement complet
+        self.first_position = first_position
+
+
+def wants_cursor_pagination(args):
+    """Le client a-t-il demandé le mode curseur (`?pagination=cursor`) ?"""
+    return args.get('pagination') == 'cursor' or bool(args.get('cursor'))
+
+
+def encode_cursor(values, direction, position):
+    payload = {
+        'v': [_encode_value(value) for value in values],
+        'd': direction,
+        'p': position
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, size):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        values = [_decode_value(value) for value in payload['v']]
+        direction = payload['d']
+        position = int(payload['p'])
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursor('Curseur invalide')
+    if len(values) != size or direction not in ('next', 'prev'):
+        raise InvalidCursor('Curseur invalide')
+    return values, direction, position
+
+
+def order_clauses(order):
+    """`order` : liste de (colonne, descendant) -> clauses ORDER BY."""
+    return [column.desc() if descending else column.asc() for column, descending in order]
+
+
+def keyset_paginate(query, order, key=None, cursor=None, per_page=20):
+    """Lire une page de `query` après (ou avant) `cursor`.
+
+    `order` est la liste (colonne, descendant) définissant un ordre total
+    (terminer par une clé unique, typiquement l'id) et `key(row)` renvoie
+    les valeurs de ces colonnes pour une ligne du résultat ; par défaut, les
+    attributs de même nom sur l'objet ORM.
+    """
+    if key is None:
+        key = lambda row: [getattr(row, column.key) for column, _ in order]
+    position = 0
+    direction = 'next'
+    if cursor:
+        values, direction, position = decode_cursor(cursor, len(order))
+        query = query.filter(_seek_condition(order, values, forward=(direction == 'next')))
+
+    if direction == 'next':
+        query = query.order_by(*order_clauses(order))
+    else:
+        query = query.order_by(*order_clauses([(column, not desc) for column, desc in order]))
+
+    rows = query.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if direction == 'next':
+        first_position = position + 1
+        has_next, has_prev = has_more, cursor is not None
+    else:
+        rows.reverse()
+        first_position = position - len(rows)
+        has_next, has_prev = True, has_more
+
+    next_cursor = prev_cursor = None
+    if rows and has_next:
+        next_cursor = encode_cursor(key(rows[-1]), 'next', first_position + len(rows) - 1)
+    if rows and has_prev:
+        prev_cursor = encode_cursor(key(rows[0]), 'prev', first_position)
+    return KeysetPage(rows, next_cursor, prev_cursor, first_position)
+
+
+def _seek_condition(order, values, forward):
+    directions = {descending for _, descending in order}
+    if len(directions) == 1:
+        # Même sens partout : comparaison de tuples, utilisable par un index
+        descending = directions.pop() == forward
+        columns = tuple_(*[column for column, _ in order])
+        return columns < tuple_(*values) if descending else columns > tuple_(*values)
+
+    clauses = []
+    for i, (column, descending) in enumerate(order):
+        equal = [order[j][0] == values[j] for j in range(i)]
+        after = column < values[i] if descending == forward else column > values[i]
+        clauses.append(and_(*equal, after))
+    return or_(*clauses)
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        return datetime.fromisoformat(value['dt'])
+    return value
@@ -0,0 +1,213 @@
+"""Présence en ligne des utilisateurs connectés en Socket.IO.
+
+Le registre associe chaque utilisateur à ses sockets (un par onglet ou
+appareil) et à l'heure du dernier signe de vie de chacun : connexion,
+événement `heartbeat` envoyé par le client toutes les
+`HEARTBEAT_INTERVAL` secondes. Un socket silencieux depuis plus de
+`PRESENCE_TTL` secondes est considéré perdu (déconnexion jamais reçue,
+processus client tué) ; les entrées expirées sont purgées au fil des
+connexions par un tas trié par date, sans parcourir le registre.
+
+Les émissions vers un utilisateur hors ligne sont évitées : l'appelant se
+rabat sur une `Notification` persistée, lue à la prochaine connexion.
+
+Deux stockages, choisis par la variable d'environnement `PRESENCE_STORE` :
+- `memory` (défaut avec un seul processus) : registre du processus ;
+- `database` (défaut avec une file de messages `SOCKETIO_MESSAGE_QUEUE`) :
+  tables `socket_presence` et `user_presence`, partagées par tous les
+  workers. Un worker arrêté sans déconnecter ses sockets les laisse
+  expirer au bout de `PRESENCE_TTL` secondes ; les lignes expirées sont
+  purgées au fil des signes de vie par un DELETE sur l'index `seen_at`.
+Un registre en mémoire avec plusieurs workers ne voit que les sockets de
+son processus : les émissions ne sont alors jamais évitées
+(`is_reachable`) et `/users/presence` refuse de répondre.
+"""
+import heapq
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select
+
+from ..models.user import db, SocketPresence, UserPresence
+from .upsert import upsert
+
+PRESENCE_TTL = 90  # secondes
+HEARTBEAT_INTERVAL = 30  # secondes, côté client
+MAX_PRESENCE_QUERY = 200
+
+PRESENCE_STORE = os.environ.get('PRESENCE_STORE') or (
+    'database' if os.environ.get('SOCKETIO_MESSAGE_QUEUE') else 'memory'
+)
+
+# Plusieurs workers : la présence d'un seul processus n'est pas complète
+AUTHORITATIVE = PRESENCE_STORE == 'database' or not os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+
+
+class PresenceRegistry:
+    """{user_id: {sid: dernier signe de vie}}, index inverse sid -> user_id
+    et tas des signes de vie pour l'expiration."""
+
+    def __init__(self, ttl=PRESENCE_TTL):
+        self.ttl = ttl
+        self._sockets = {}
+        self._owners = {}
+        self._last_seen = {}
+        self._expiries = []
+        self._lock = threading.Lock()
+
+    def seen(self, user_id, sid, now=None):
+        """Enregistrer un signe de vie du socket `sid` de `user_id`."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._expire(now)
+            self._owners[sid] = user_id
+            self._sockets.setdefault(user_id, {})[sid] = now
+            self._last_seen[user_id] = now
+            heapq.heappush(self._expiries, (now, sid))
+
+    def disconnect(self, sid, now=None):
+        """Retirer `sid` ; retourne l'utilisateur concerné, ou None."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._expire(now)
+            user_id = self._owners.get(sid)
+            if user_id is not None:
+                self._discard(sid)
+                self._last_seen[user_id] = now
+            return user_id
+
+    def user_for(self, sid):
+        return self._owners.get(sid)
+
+    def is_online(self, user_id, now=None):
+        now = time.time() if now is None else now
+        sockets = self._sockets.get(user_id)
+        if not sockets:
+            return False
+        return any(seen_at > now - self.ttl for seen_at in list(sockets.values()))
+
+    def last_seen(self, user_id):
+        return self._last_seen.get(user_id)
+
+    def presence_of(self, user_ids, now):
+        return {user_id: (self.is_online(user_id, now), self.last_seen(user_id)) for user_id in user_ids}
+
+    def _expire(self, now):
+        # Une entrée du tas est périmée si le socket a donné signe de vie depuis
+        while self._expiries and self._expiries[0][0] <= now - self.ttl:
+            seen_at, sid = heapq.heappop(self._expiries)
+            user_id = self._owners.get(sid)
+            if user_id is not None and self._sockets[user_id].get(sid) == seen_at:
+                self._discard(sid)
+
+    def _discard(self, sid):
+        user_id = self._owners.pop(sid)
+        sockets = self._sockets[user_id]
+        sockets.pop(sid, None)
+        if not sockets:
+            del self._sockets[user_id]
+
+
+class DatabasePresenceStore:
+    """Sockets et derniers signes de vie en base, sur des connexions
+    propres : la présence est écrite depuis les événements Socket.IO et lue
+    jusque dans les écouteurs `after_commit`, hors de toute transaction de
+    la session."""
+
+    def __init__(self, ttl=PRESENCE_TTL):
+        self.ttl = ttl
+
+    def seen(self, user_id, sid, now=None):
+        seen_at = _utc(now)
+        with db.engine.begin() as conn:
+            conn.execute(delete(SocketPresence).where(SocketPresence.seen_at <= seen_at - timedelta(seconds=self.ttl)))
+            conn.execute(upsert(conn, SocketPresence, {'sid': sid, 'user_id': user_id, 'seen_at': seen_at},
+                                set_={'user_id': user_id, 'seen_at': seen_at}))
+            self._touch(conn, user_id, seen_at)
+
+    def disconnect(self, sid, now=None):
+        with db.engine.begin() as conn:
+            user_id = conn.execute(
+                delete(SocketPresence).where(SocketPresence.sid == sid).returning(SocketPresence.user_id)
+            ).scalar()
+            if user_id is not None:
+                self._touch(conn, user_id, _utc(now))
+            return user_id
+
+    def user_for(self, sid):
+        with db.engine.connect() as conn:
+            return conn.execute(select(SocketPresence.user_id).where(SocketPresence.sid == sid)).scalar()
+
+    def is_online(self, user_id, now=None):
+        return user_id in self._online([user_id], now)
+
+    def last_seen(self, user_id):
+        return self._last_seen([user_id]).get(user_id)
+
+    def presence_of(self, user_ids, now):
+        online = self._online(user_ids, now)
+        last_seen = self._last_seen(user_ids)
+        return {user_id: (user_id in online, last_seen.get(user_id)) for user_id in user_ids}
+
+    def _online(self, user_ids, now):
+        cutoff = _utc(now) - timedelta(seconds=self.ttl)
+        with db.engine.connect() as conn:
+            return set(conn.execute(
+                select(SocketPresence.user_id).distinct()
+                .where(SocketPresence.user_id.in_(user_ids), SocketPresence.seen_at > cutoff)
+            ).scalars())
+
+    def _last_seen(self, user_ids):
+        with db.engine.connect() as conn:
+            rows = conn.execute(
+                select(UserPresence.user_id, UserPresence.last_seen_at).where(UserPresence.user_id.in_(user_ids))
+            )
+            return {user_id: (seen_at - _EPOCH).total_seconds() for user_id, seen_at in rows}
+
+    def _touch(self, conn, user_id, seen_at):
+        conn.execute(upsert(conn, UserPresence, {'user_id': user_id, 'last_seen_at': seen_at},
+                            set_={'last_seen_at': seen_at}))
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _utc(now):
+    return datetime.utcfromtimestamp(time.time() if now is None else now)
+
+
+_registry = DatabasePresenceStore() if PRESENCE_STORE == 'database' else PresenceRegistry()
+
+
+def seen(user_id, sid):
+    _registry.seen(user_id, sid)
+
+
+def disconnect(sid):
+    return _registry.disconnect(sid)
+
+
+def user_for(sid):
+    return _registry.user_for(sid)
+
+
+def is_online(user_id):
+    return _registry.is_online(user_id)
+
+
+def is_reachable(user_id):
+    """Un événement émis maintenant peut-il atteindre l'utilisateur ?"""
+    return not AUTHORITATIVE or _registry.is_online(user_id)
+
+
+def presence_of(user_ids):
+    """{user_id: {'online': bool, 'last_seen': ISO ou None}}."""
+    return {
+        user_id: {
+            'online': online,
+            'last_seen': datetime.utcfromtimestamp(last_seen).isoformat() if last_seen else None
+        }
+        for user_id, (online, last_seen) in _registry.presence_of(user_ids, time.time()).items()
+    }
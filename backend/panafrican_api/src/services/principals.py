@@ -0,0 +1,113 @@
+"""Résolution des identités (jeton JWT -> utilisateur) avec cache.
+
+Les jetons décodés et les utilisateurs authentifiés sont gardés dans des
+caches TTL/LRU bornés pour éviter un `jwt.decode` et un aller-retour SQLite
+à chaque requête authentifiée. Les utilisateurs sont mis en cache sous
+forme de valeurs de colonnes, puis rattachés à la session courante sans
+requête (`merge(load=False)`).
+
+Toute écriture sur une ligne `users` (UPDATE ou DELETE via l'ORM) invalide
+l'entrée correspondante, au flush puis à nouveau au commit. L'invalidation
+du commit est diffusée aux autres workers (voir `broadcast.py`) : un
+utilisateur désactivé, supprimé ou dont le rôle change n'est plus servi
+depuis leur cache.
+"""
+import time
+
+import jwt
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from ..models.user import db, User
+from . import broadcast
+from .cache import TTLCache
+
+TOKEN_CACHE_SIZE = 10000
+TOKEN_CACHE_TTL = 300  # secondes
+PRINCIPAL_CACHE_SIZE = 10000
+PRINCIPAL_CACHE_TTL = 60  # secondes
+
+_token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL)
+_principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+
+
+def decode_token(token, secret):
+    """Décoder un jeton JWT HS256, en réutilisant un décodage précédent.
+
+    Lève les mêmes exceptions que `jwt.decode`. Une entrée du cache ne survit
+    jamais à l'expiration (`exp`) du jeton.
+    """
+    key = (secret, token)
+    payload = _token_cache.get(key)
+    now = time.time()
+    if payload is not None:
+        if 'exp' in payload and payload['exp'] <= now:
+            _token_cache.pop(key)
+            raise jwt.ExpiredSignatureError('Signature has expired')
+        return payload
+
+    payload = jwt.decode(token, secret, algorithms=['HS256'])
+    ttl = TOKEN_CACHE_TTL
+    if 'exp' in payload:
+        ttl = min(ttl, payload['exp'] - now)
+    _token_cache.set(key, payload, ttl=ttl)
+    return payload
+
+
+def load_principal(user_id):
+    """Retourner l'utilisateur `user_id` rattaché à la session, ou None."""
+    if user_id is None:
+        return None
+
+    values = _principal_cache.get(user_id)
+    if values is None:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        _principal_cache.set(user_id, _snapshot(user))
+        return user
+
+    user = User(**values)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+def invalidate_principal(user_id):
+    _principal_cache.pop(user_id)
+
+
+broadcast.register('principal', invalidate_principal, _principal_cache.clear)
+
+
+def principal_cache_stats():
+    return {
+        'tokens': _token_cache.stats(),
+        'principals': _principal_cache.stats()
+    }
+
+
+def _snapshot(user):
+    return {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_on_write(mapper, connection, target):
+    invalidate_principal(target.id)
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault('written_principals', set()).add(target.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    # Une requête concurrente a pu remettre l'ancienne ligne en cache entre
+    # le flush et le commit : on invalide une seconde fois, dans tous les
+    # processus.
+    for user_id in session.info.pop('written_principals', ()):
+        broadcast.publish('principal', user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_after_rollback(session):
+    session.info.pop('written_principals', None)
@@ -0,0 +1,34 @@
+"""Reconstruction des compteurs dénormalisés de `Question`.
+
+`answers_count` et `has_accepted_answer` sont maintenus en ligne par les
+routes ; cette fonction les recalcule depuis la table `answer` (remplissage
+initial après migration, ou réparation après une écriture hors API).
+"""
+from sqlalchemy import exists, func, select, update
+
+from ..models.user import db
+from ..models.question import Question, Answer
+
+
+def rebuild_question_counters():
+    """Recalculer les compteurs de toutes les questions en un seul UPDATE.
+
+    Retourne le nombre de questions mises à jour.
+    """
+    answers_count = (
+        select(func.count(Answer.id))
+        .where(Answer.question_id == Question.id)
+        .scalar_subquery()
+    )
+    has_accepted = exists().where(
+        Answer.question_id == Question.id,
+        Answer.is_accepted == True
+    )
+    result = db.session.execute(
+        update(Question).values(
+            answers_count=answers_count,
+            has_accepted_answer=has_accepted
+        ).execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount
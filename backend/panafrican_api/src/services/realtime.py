@@ -0,0 +1,120 @@
+"""Émission des événements Socket.IO après le commit de la transaction.
+
+Une route qui émettait directement (`socketio.emit`) pouvait annoncer un
+message ou une réservation finalement annulés par un rollback. Les routes
+enregistrent désormais leurs événements pendant la transaction
+(`dispatch`, `dispatch_to_user`) avec une charge déjà sérialisée ; ils
+partent après un commit réussi et sont oubliés en cas de rollback.
+
+Les événements d'une même salle arrivés dans une fenêtre de
+`SOCKETIO_COALESCE_MS` millisecondes (50 par défaut) partent en une seule
+trame : l'événement tel quel s'il est seul, sinon un événement `batch`
+contenant la liste `[{'event': ..., 'data': ...}]`. À 0, les événements
+partent dès le commit, une trame par salle et par commit.
+"""
+import os
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..models.user import db
+from . import presence
+
+COALESCE_WINDOW = float(os.environ.get('SOCKETIO_COALESCE_MS', '50')) / 1000
+BATCH_EVENT = 'batch'
+
+_PENDING_KEY = 'pending_socketio_events'
+
+# salle -> [(événement, charge)] en attente d'émission
+_outbox = {}
+_flush_scheduled = False
+_lock = threading.Lock()
+
+
+def dispatch(room, event_name, payload):
+    """Émettre `event_name` dans `room` après le commit en cours (ou tout
+    de suite hors transaction)."""
+    session = db.session()
+    if not session.in_transaction():
+        queue_event(room, event_name, payload)
+        return
+    session.info.setdefault(_PENDING_KEY, []).append((room, event_name, payload))
+
+
+def queue_event(room, event_name, payload):
+    """Mettre un événement dans la file d'émission sans attendre de commit
+    (hors transaction, ou depuis un écouteur `after_commit`)."""
+    _enqueue([(room, event_name, payload)])
+
+
+def dispatch_to_user(user_id, event_name, payload):
+    """`dispatch` vers la salle `user_<id>` si l'utilisateur est joignable ;
+    retourne False sinon (l'appelant garde la voie différée)."""
+    if not presence.is_reachable(user_id):
+        return False
+    dispatch(f"user_{user_id}", event_name, payload)
+    return True
+
+
+def push_notifications(notifications):
+    """Pousser en temps réel des `Notification` ajoutées à la transaction."""
+    db.session.flush()
+    for notification in notifications:
+        dispatch_to_user(notification.user_id, 'notification', notification.to_dict())
+
+
+@event.listens_for(Session, 'after_commit')
+def _send_after_commit(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        _enqueue(pending)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _drop_after_rollback(session, transaction):
+    # Fin de la transaction principale sans commit (rollback, close) ; le
+    # rollback d'un savepoint ne concerne pas les événements déjà enregistrés
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+
+
+def _enqueue(events):
+    global _flush_scheduled
+    with _lock:
+        for room, event_name, payload in events:
+            _outbox.setdefault(room, []).append((event_name, payload))
+        schedule = COALESCE_WINDOW > 0 and not _flush_scheduled
+        if schedule:
+            _flush_scheduled = True
+
+    if COALESCE_WINDOW <= 0:
+        flush()
+    elif schedule:
+        from .. import socketio
+
+        socketio.start_background_task(_flush_later, socketio.sleep)
+
+
+def _flush_later(sleep):
+    sleep(COALESCE_WINDOW)
+    flush()
+
+
+def flush():
+    """Émettre tous les événements en attente, une trame par salle."""
+    global _outbox, _flush_scheduled
+    with _lock:
+        outbox, _outbox = _outbox, {}
+        _flush_scheduled = False
+    if not outbox:
+        return
+
+    from .. import socketio
+
+    for room, events in outbox.items():
+        if len(events) == 1:
+            event_name, payload = events[0]
+            socketio.emit(event_name, payload, to=room)
+        else:
+            socketio.emit(BATCH_EVENT, [{'event': event_name, 'data': payload} for event_name, payload in events], to=room)
@@ -0,0 +1,183 @@
+"""Rappels de session et clôture des sessions passées.
+
+Le planificateur tourne en tâche de fond dans le serveur :
+- toutes les `REFRESH_INTERVAL` secondes, une requête sur l'index
+  (status, session_date) charge les sessions à venir dont un rappel tombe
+  avant le prochain rafraîchissement, et place ces rappels dans un tas trié
+  par heure d'envoi ;
+- entre deux rafraîchissements, il dort jusqu'au prochain rappel du tas et
+  envoie par lot tous les rappels échus : une `Notification` par
+  participant et, s'il est en ligne, un événement Socket.IO
+  `notification` dans la salle `user_<id>` ;
+- chaque rappel envoyé est enregistré dans `session_reminder` (unique par
+  session et décalage), dans la même transaction que les notifications :
+  un redémarrage ne renvoie jamais un rappel déjà envoyé ;
+- les sessions encore `scheduled` une fois terminées depuis
+  `COMPLETION_GRACE` passent à `completed` (une absence signalée par le
+  mentor les a déjà passées à `no_show`).
+
+Les décalages (en minutes avant le début) se règlent par la variable
+d'environnement `SESSION_REMINDER_OFFSETS`, par défaut « 1440,15 ».
+"""
+import heapq
+import logging
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+
+from ..models.user import db
+from ..models.mentor import Mentor, MentorSession, SessionReminder
+from ..models.notification import Notification
+from .realtime import push_notifications
+
+REMINDER_OFFSETS = [int(value) for value in os.environ.get('SESSION_REMINDER_OFFSETS', '1440,15').split(',') if value.strip()]
+REFRESH_INTERVAL = 300  # secondes
+MAX_SLEEP = 60  # secondes
+COMPLETION_GRACE = timedelta(hours=1)
+MAX_LATENESS = timedelta(minutes=15)
+
+
+def _format_delay(minutes):
+    hours, minutes = divmod(max(0, minutes), 60)
+    if not hours:
+        return f"{minutes} min"
+    return f"{hours} h {minutes:02d}" if minutes else f"{hours} h"
+
+
+class ReminderScheduler:
+    """Tas des rappels à envoyer avant le prochain rafraîchissement."""
+
+    def __init__(self, offsets=None, refresh_interval=REFRESH_INTERVAL):
+        self.offsets = sorted(offsets or REMINDER_OFFSETS)
+        self.refresh_interval = timedelta(seconds=refresh_interval)
+        self._heap = []
+        self._queued = set()
+        self._next_refresh = None
+
+    def refresh(self, now):
+        """Charger les rappels qui tombent avant le prochain rafraîchissement."""
+        if not self.offsets:
+            return
+        lookahead = now + self.refresh_interval
+        sessions = db.session.query(MentorSession.id, MentorSession.session_date).filter(
+            MentorSession.status == 'scheduled',
+            MentorSession.session_date > now,
+            MentorSession.session_date <= lookahead + timedelta(minutes=self.offsets[-1])
+        ).all()
+        for session_id, session_date in sessions:
+            for offset in self.offsets:
+                fire_at = session_date - timedelta(minutes=offset)
+                # Rappel trop en retard (session réservée après l'heure du
+                # rappel, longue interruption) : le suivant prendra le relais
+                if fire_at > lookahead or fire_at < now - MAX_LATENESS:
+                    continue
+                key = (session_id, offset)
+                if key not in self._queued:
+                    self._queued.add(key)
+                    heapq.heappush(self._heap, (fire_at, session_id, offset))
+
+    def pop_due(self, now):
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, session_id, offset = heapq.heappop(self._heap)
+            self._queued.discard((session_id, offset))
+            due.append((session_id, offset))
+        return due
+
+    def send(self, due, now):
+        """Envoyer un lot de rappels échus ; retourne les notifications créées."""
+        session_ids = {session_id for session_id, _ in due}
+        sessions = {
+            session.id: session
+            for session in MentorSession.query.options(
+                joinedload(MentorSession.mentor).joinedload(Mentor.user),
+                joinedload(MentorSession.student)
+            ).filter(MentorSession.id.in_(session_ids), MentorSession.status == 'scheduled')
+        }
+        already_sent = set(
+            db.session.query(SessionReminder.session_id, SessionReminder.offset_minutes)
+            .filter(SessionReminder.session_id.in_(session_ids)).all()
+        )
+
+        notifications = []
+        for session_id, offset in due:
+            session = sessions.get(session_id)
+            if session is None or (session_id, offset) in already_sent:
+                continue
+            db.session.add(SessionReminder(session_id=session_id, offset_minutes=offset))
+            when = session.session_date.strftime('%d/%m/%Y à %H:%M')
+            delay = _format_delay(round((session.session_date - now).total_seconds() / 60))
+            for user_id, other in ((session.student_id, session.mentor.user), (session.mentor.user_id, session.student)):
+                notification = Notification(
+                    user_id=user_id,
+                    type='session_reminder',
+                    title='Rappel de session',
+                    message=f"Votre session « {session.subject} » avec {other.first_name} {other.last_name} commence dans {delay} (le {when}).",
+                    related_id=session_id
+                )
+                db.session.add(notification)
+                notifications.append(notification)
+        push_notifications(notifications)
+
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Un autre processus a envoyé ces rappels entre-temps
+            db.session.rollback()
+            return []
+        return notifications
+
+    def complete_past_sessions(self, now):
+        """Passer à `completed` les sessions terminées restées `scheduled`."""
+        cutoff = now - COMPLETION_GRACE
+        candidates = db.session.query(
+            MentorSession.id, MentorSession.session_date, MentorSession.duration_minutes
+        ).filter(
+            MentorSession.status == 'scheduled',
+            MentorSession.session_date < cutoff
+        ).all()
+        ended = [session_id for session_id, session_date, duration in candidates
+                 if session_date + timedelta(minutes=duration or 0) <= cutoff]
+        if ended:
+            db.session.execute(
+                update(MentorSession)
+                .where(MentorSession.id.in_(ended), MentorSession.status == 'scheduled')
+                .values(status='completed', updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+        db.session.commit()
+        return len(ended)
+
+    def tick(self, now):
+        """Une itération ; retourne le nombre de secondes à dormir ensuite."""
+        if self._next_refresh is None or now >= self._next_refresh:
+            self.refresh(now)
+            self.complete_past_sessions(now)
+            self._next_refresh = now + self.refresh_interval
+
+        due = self.pop_due(now)
+        if due:
+            self.send(due, now)
+
+        wake_at = self._next_refresh
+        if self._heap and self._heap[0][0] < wake_at:
+            wake_at = self._heap[0][0]
+        return min(MAX_SLEEP, max(1, (wake_at - now).total_seconds()))
+
+    def run(self, app, sleep):
+        """Boucle du planificateur (tâche de fond Socket.IO)."""
+        while True:
+            delay = MAX_SLEEP
+            try:
+                with app.app_context():
+                    delay = self.tick(datetime.now())
+            except Exception:
+                logging.getLogger(__name__).exception('Échec du planificateur de rappels')
+            sleep(delay)
+
+
+def run_reminder_loop(app, sleep):
+    ReminderScheduler().run(app, sleep)
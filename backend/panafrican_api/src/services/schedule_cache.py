@@ -0,0 +1,145 @@
+"""Cache par mentor des disponibilités et des intervalles réservés.
+
+Le planning hebdomadaire d'un mentor change rarement alors que sa page est
+consultée très souvent : `get_mentor_availabilities` et
+`get_available_slots` lisent ce cache au lieu de relire
+`MentorAvailability` et `MentorSession` à chaque appel.
+
+Les routes qui modifient le planning le tiennent à jour après leur commit :
+- `set_mentor_availabilities` et `cancel_session` invalident l'entrée ;
+- `book_session` y ajoute l'intervalle réservé.
+
+Un compteur de génération par mentor empêche un chargement commencé avant
+une modification d'écraser l'entrée à jour ; il n'existe que le temps des
+chargements en cours, `_generations` reste donc borné par le nombre de
+requêtes simultanées.
+
+Le cache est local au processus : les invalidations sont diffusées aux
+autres workers par `broadcast` (sujet `schedule`). Un message perdu laisse
+au plus une entrée périmée `SCHEDULE_CACHE_TTL` secondes (la réservation
+revérifie toujours en base).
+"""
+import threading
+from datetime import datetime
+
+from ..models.user import db
+from ..models.mentor import Mentor, MentorAvailability, MentorSession
+from . import slots
+from . import broadcast
+from .cache import TTLCache
+
+SCHEDULE_CACHE_SIZE = 2048
+SCHEDULE_CACHE_TTL = 60  # secondes
+# Période de sessions chargée par défaut, au-delà de maintenant
+SCHEDULE_DAYS = 90
+
+_cache = TTLCache(maxsize=SCHEDULE_CACHE_SIZE, ttl=SCHEDULE_CACHE_TTL)
+# mentor -> [génération, chargements en cours], seulement pendant un chargement
+_generations = {}
+_lock = threading.Lock()
+
+
+class MentorSchedule:
+    """Planning d'un mentor : disponibilités actives (sérialisées et sous
+    forme de fenêtres) et intervalles réservés jusqu'à `busy_until`."""
+
+    __slots__ = ('availabilities', 'windows', 'busy', 'busy_until', 'watermark')
+
+    def __init__(self, availabilities, windows, busy, busy_until, watermark):
+        self.availabilities = availabilities
+        self.windows = windows
+        self.busy = busy
+        self.busy_until = busy_until
+        # (nombre, id max, date de création max) des disponibilités
+        self.watermark = watermark
+
+
+def get_schedule(mentor_id, until):
+    """Planning du mentor avec les réservations connues jusqu'à `until`
+    (en minutes), ou None si le mentor n'existe pas."""
+    schedule = _cache.get(mentor_id)
+    if schedule is not None and schedule.busy_until >= until:
+        return schedule
+
+    with _lock:
+        loading = _generations.setdefault(mentor_id, [0, 0])
+        loading[1] += 1
+        generation = loading[0]
+    schedule = None
+    try:
+        now = datetime.now()
+        schedule = _load_schedule(mentor_id, now, max(until, slots.to_minutes(now) + SCHEDULE_DAYS * slots.MINUTES_PER_DAY))
+    finally:
+        with _lock:
+            if schedule is not None and loading[0] == generation:
+                _cache.set(mentor_id, schedule)
+            loading[1] -= 1
+            if not loading[1]:
+                del _generations[mentor_id]
+    return schedule
+
+
+def invalidate_schedule(mentor_id):
+    """Retirer le planning du mentor du cache de tous les processus."""
+    broadcast.publish('schedule', mentor_id)
+
+
+def _drop_schedule(mentor_id):
+    with _lock:
+        _next_generation(mentor_id)
+        _cache.pop(mentor_id)
+
+
+def _next_generation(mentor_id):
+    # Les chargements en cours pour ce mentor ne seront pas mis en cache
+    loading = _generations.get(mentor_id)
+    if loading is not None:
+        loading[0] += 1
+
+
+broadcast.register('schedule', _drop_schedule, _cache.clear)
+
+
+def add_booking(mentor_id, start, end):
+    """Ajouter [start, end) (en minutes) aux réservations en cache ; les
+    autres processus, eux, relisent le planning."""
+    with _lock:
+        _next_generation(mentor_id)
+        schedule = _cache.pop(mentor_id)
+        if schedule is not None:
+            _cache.set(mentor_id, MentorSchedule(
+                schedule.availabilities, schedule.windows,
+                slots.merge_intervals(schedule.busy + [(start, end)]),
+                schedule.busy_until, schedule.watermark
+            ))
+    broadcast.publish_to_others('schedule', mentor_id)
+
+
+def schedule_cache_stats():
+    return _cache.stats()
+
+
+def _load_schedule(mentor_id, now, until):
+    if not db.session.query(Mentor.query.filter_by(id=mentor_id).exists()).scalar():
+        return None
+
+    availabilities = MentorAvailability.query.filter_by(mentor_id=mentor_id, is_active=True).all()
+    sessions = MentorSession.query.filter(
+        MentorSession.mentor_id == mentor_id,
+        MentorSession.session_date >= slots.from_minutes(slots.to_minutes(now) - slots.MAX_SESSION_MINUTES),
+        MentorSession.session_date < slots.from_minutes(until),
+        MentorSession.status.in_(slots.BOOKED_STATUSES)
+    ).all()
+
+    watermark = (
+        len(availabilities),
+        max((av.id for av in availabilities), default=None),
+        max((av.created_at for av in availabilities), default=None)
+    )
+    return MentorSchedule(
+        [av.to_dict() for av in availabilities],
+        [slots.AvailabilityWindow(av.day_of_week, av.start_time, av.end_time) for av in availabilities],
+        slots.session_intervals(sessions),
+        until,
+        watermark
+    )
@@ -0,0 +1,114 @@
+"""Recherche plein texte des questions (SQLite FTS5).
+
+`question_fts` est une table FTS5 à contenu externe indexant `title` et
+`content` de la table `question`. Des triggers SQLite la tiennent à jour à
+chaque INSERT / UPDATE / DELETE, y compris pour les écritures faites hors
+de l'ORM. Le tokenizer `unicode61 remove_diacritics 2` ignore la casse et
+les accents : « équation » et « equation » donnent les mêmes résultats.
+"""
+import re
+
+from sqlalchemy import column, false, func, inspect, literal_column, select, table, text
+
+from ..models.user import db
+from ..models.question import Question
+
+QUESTION_FTS_TABLE = 'question_fts'
+
+# Pondérations bm25 : un mot du titre compte plus qu'un mot du contenu
+TITLE_WEIGHT = 10.0
+CONTENT_WEIGHT = 1.0
+
+_FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {QUESTION_FTS_TABLE} USING fts5(
+        title, content,
+        content='question', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS question_fts_ai AFTER INSERT ON question BEGIN
+        INSERT INTO {QUESTION_FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS question_fts_ad AFTER DELETE ON question BEGIN
+        INSERT INTO {QUESTION_FTS_TABLE}({QUESTION_FTS_TABLE}, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS question_fts_au AFTER UPDATE OF title, content ON question BEGIN
+        INSERT INTO {QUESTION_FTS_TABLE}({QUESTION_FTS_TABLE}, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO {QUESTION_FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+]
+
+_question_fts = table(QUESTION_FTS_TABLE, column('rowid'))
+_fts_available = {}
+
+_TOKEN_RE = re.compile(r'\w+\*?', re.UNICODE)
+
+
+def ensure_question_fts(conn):
+    """Créer la table FTS et ses triggers s'ils n'existent pas (idempotent).
+
+    Si la table vient d'être créée, elle est remplie depuis `question`.
+    Retourne True dans ce cas.
+    """
+    created = not inspect(conn).has_table(QUESTION_FTS_TABLE)
+    for statement in _FTS_DDL:
+        conn.execute(text(statement))
+    if created:
+        conn.execute(text(f"INSERT INTO {QUESTION_FTS_TABLE}({QUESTION_FTS_TABLE}) VALUES ('rebuild')"))
+    _fts_available.pop(str(conn.engine.url), None)
+    return created
+
+
+def question_fts_available():
+    url = str(db.engine.url)
+    if url not in _fts_available:
+        _fts_available[url] = inspect(db.engine).has_table(QUESTION_FTS_TABLE)
+    return _fts_available[url]
+
+
+def build_match_expression(search):
+    """Transformer la saisie utilisateur en expression MATCH FTS5 sûre.
+
+    Chaque mot est cité (pas de syntaxe FTS injectable) et tous doivent être
+    présents ; un mot terminé par `*` est une recherche par préfixe.
+    Retourne None si la saisie ne contient aucun mot.
+    """
+    terms = []
+    for token in _TOKEN_RE.findall(search):
+        prefix = token.endswith('*')
+        word = token.rstrip('*')
+        if word:
+            terms.append('"%s"%s' % (word, '*' if prefix else ''))
+    return ' '.join(terms) or None
+
+
+def apply_question_search(query, search):
+    """Restreindre `query` aux questions correspondant à `search`.
+
+    Retourne (query, rank) où `rank` est la colonne bm25 à utiliser dans un
+    ORDER BY (plus petit = plus pertinent), ou None si le tri par pertinence
+    n'est pas disponible (base non migrée : repli sur LIKE ; saisie sans
+    aucun mot : résultat vide).
+    """
+    if not question_fts_available():
+        return query.filter(Question.title.contains(search) | Question.content.contains(search)), None
+
+    expression = build_match_expression(search)
+    if expression is None:
+        # Aucun terme cherchable (ponctuation, guillemets seuls) : aucun résultat
+        return query.filter(false()), None
+
+    fts = literal_column(QUESTION_FTS_TABLE)
+    matches = (
+        select(
+            _question_fts.c.rowid.label('question_id'),
+            func.bm25(fts, TITLE_WEIGHT, CONTENT_WEIGHT).label('rank')
+        )
+        .select_from(_question_fts)
+        .where(fts.op('MATCH')(expression))
+        .subquery()
+    )
+    query = query.join(matches, matches.c.question_id == Question.id)
+    return query, matches.c.rank
@@ -0,0 +1,136 @@
+"""Calcul des créneaux libres d'un mentor par arithmétique d'intervalles.
+
+Toutes les dates sont converties en minutes entières depuis l'époque
+(datetime naïfs, comme `MentorSession.session_date`). Un intervalle est un
+couple (début, fin) semi-ouvert. Le calcul se fait en trois étapes :
+
+1. les disponibilités hebdomadaires sont déroulées sur la période demandée
+   puis fusionnées (chevauchements et contiguïtés) ;
+2. les sessions réservées, fusionnées elles aussi, en sont soustraites ;
+3. les créneaux de `duration` minutes sont émis dans chaque intervalle
+   libre, sur une grille de `step` minutes comptée depuis minuit.
+
+Les étapes 1 et 2 coûtent un temps constant par intervalle, quelle que soit
+la longueur de la période ou la granularité.
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+_EPOCH = datetime(1970, 1, 1)
+MINUTES_PER_DAY = 24 * 60
+
+# Durée maximale d'une session : borne la recherche des sessions commencées
+# avant la période mais qui la chevauchent encore
+MAX_SESSION_MINUTES = MINUTES_PER_DAY
+
+# Statuts de session qui occupent le créneau du mentor
+BOOKED_STATUSES = ('scheduled', 'completed')
+
+# Disponibilité hebdomadaire détachée de la session (cache, calculs)
+AvailabilityWindow = namedtuple('AvailabilityWindow', 'day_of_week start_time end_time')
+
+DAY_NAMES = ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi', 'Dimanche']
+
+
+def to_minutes(value):
+    return int((value - _EPOCH).total_seconds() // 60)
+
+
+def from_minutes(minutes):
+    return _EPOCH + timedelta(minutes=minutes)
+
+
+def merge_intervals(intervals):
+    """Trier et fusionner des intervalles qui se chevauchent ou se touchent."""
+    merged = []
+    for start, end in sorted(intervals):
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def subtract_intervals(free, busy):
+    """Retirer `busy` de `free` (deux listes triées et fusionnées)."""
+    result = []
+    j = 0
+    for start, end in free:
+        while j < len(busy) and busy[j][1] <= start:
+            j += 1
+        k = j
+        cursor = start
+        while k < len(busy) and busy[k][0] < end:
+            if busy[k][0] > cursor:
+                result.append((cursor, busy[k][0]))
+            cursor = max(cursor, busy[k][1])
+            k += 1
+        if cursor < end:
+            result.append((cursor, end))
+    return result
+
+
+def clip_intervals(intervals, start, end):
+    return [(max(s, start), min(e, end)) for s, e in intervals if s < end and e > start]
+
+
+def weekly_windows(availabilities, start, end):
+    """Dérouler des disponibilités hebdomadaires sur [start, end) (en minutes).
+
+    `availabilities` : objets ou tuples exposant day_of_week, start_time et
+    end_time (datetime.time). Retourne des intervalles triés et fusionnés.
+    """
+    by_day = {}
+    for av in availabilities:
+        begin = av.start_time.hour * 60 + av.start_time.minute
+        finish = av.end_time.hour * 60 + av.end_time.minute
+        if finish > begin:
+            by_day.setdefault(av.day_of_week, []).append((begin, finish))
+
+    windows = []
+    first_day = start // MINUTES_PER_DAY
+    last_day = (end - 1) // MINUTES_PER_DAY
+    for day in range(first_day, last_day + 1):
+        # Le 1er janvier 1970 était un jeudi (weekday() == 3)
+        for begin, finish in by_day.get((day + 3) % 7, ()):
+            midnight = day * MINUTES_PER_DAY
+            windows.append((midnight + begin, midnight + finish))
+    return clip_intervals(merge_intervals(windows), start, end)
+
+
+def session_intervals(sessions):
+    """Intervalles occupés par des sessions (session_date, duration_minutes)."""
+    return merge_intervals(
+        (to_minutes(s.session_date), to_minutes(s.session_date) + (s.duration_minutes or 0))
+        for s in sessions
+    )
+
+
+def free_intervals(availabilities, busy, start, end):
+    """Intervalles libres sur [start, end) : disponibilités moins `busy`."""
+    return subtract_intervals(weekly_windows(availabilities, start, end), merge_intervals(busy))
+
+
+def slot_starts(free, duration, step):
+    """Débuts des créneaux de `duration` minutes contenus dans `free`."""
+    for start, end in free:
+        # Premier point de la grille (multiples de `step` depuis minuit) >= start
+        midnight = start - start % MINUTES_PER_DAY
+        current = midnight + -(-(start - midnight) // step) * step
+        while current + duration <= end:
+            yield current
+            current += step
+
+
+def format_slot(minutes):
+    slot = from_minutes(minutes)
+    return {
+        'datetime': slot.isoformat(),
+        'date': slot.strftime('%Y-%m-%d'),
+        'time': slot.strftime('%H:%M'),
+        'day_name': DAY_NAMES[slot.weekday()],
+        'available': True
+    }
@@ -0,0 +1,16 @@
+"""`INSERT ... ON CONFLICT DO UPDATE` pour SQLite et PostgreSQL.
+
+Les deux dialectes proposent la même construction ; elle écrit ou met à
+jour une ligne en une seule requête atomique, sans la course d'un UPDATE
+suivi d'un INSERT entre deux processus.
+"""
+from sqlalchemy.dialects import postgresql, sqlite
+
+_INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+
+def upsert(connection, model, values, set_):
+    """Instruction insérant `values` dans `model`, ou appliquant `set_` à
+    la ligne de même clé primaire si elle existe déjà."""
+    stmt = _INSERTS[connection.dialect.name](model).values(**values)
+    return stmt.on_conflict_do_update(index_elements=list(model.__table__.primary_key.columns), set_=set_)
@@ -0,0 +1,183 @@
+"""Application des votes aux compteurs `votes` des questions et réponses.
+
+Les compteurs sont modifiés par des deltas SQL atomiques
+(`UPDATE ... SET votes = votes + ?`) : deux votants simultanés ne peuvent
+plus s'écraser mutuellement.
+
+Quand une clé devient « chaude » (beaucoup de votes en peu de temps sur la
+même question), les deltas ne sont plus écrits un par un : ils sont cumulés
+en mémoire et appliqués en un seul UPDATE toutes les `FLUSH_INTERVAL`
+secondes. Les lectures ajoutent les deltas en attente (`pending`) pour que
+chaque votant voie immédiatement son vote.
+
+Un delta chaud n'entre dans le tampon partagé qu'au commit de la
+transaction qui a écrit le vote (écouteur `after_commit`) : si elle échoue
+(vote concurrent du même utilisateur, contrainte d'unicité...), le delta
+est oublié avec elle et le compteur ne dérive pas.
+"""
+import logging
+import threading
+import time
+
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from ..models.user import db
+
+FLUSH_INTERVAL = 0.25  # secondes
+HOT_KEY_WINDOW = 1.0  # secondes
+HOT_KEY_THRESHOLD = 5  # votes par fenêtre au-delà desquels la clé est chaude
+
+_PENDING_KEY = 'pending_vote_deltas'
+
+
+class VoteBuffer:
+    """Deltas de votes en attente, regroupés par (modèle, id)."""
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL, hot_window=HOT_KEY_WINDOW,
+                 hot_threshold=HOT_KEY_THRESHOLD):
+        self.flush_interval = flush_interval
+        self.hot_window = hot_window
+        self.hot_threshold = hot_threshold
+        self._pending = {}
+        self._rates = {}
+        self._models = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._app = None
+        self._flusher_started = False
+        # table -> fonction(connexion, ids) appelée après chaque flush
+        self.flush_hooks = {}
+
+    def apply(self, model, object_id, delta):
+        """Appliquer `delta` au compteur `votes` de `model` n° `object_id`.
+
+        Une clé froide est mise à jour dans la transaction courante de la
+        session ; une clé chaude est mise en attente pour le prochain flush,
+        une fois cette transaction validée. Retourne True si le delta a été
+        mis en attente.
+        """
+        if not delta:
+            return False
+        key = (model.__tablename__, object_id)
+        now = time.monotonic()
+        with self._lock:
+            window_start, count = self._rates.get(key, (now, 0))
+            if now - window_start > self.hot_window:
+                window_start, count = now, 0
+            self._rates[key] = (window_start, count + 1)
+            hot = count + 1 >= self.hot_threshold or key in self._pending
+            if hot:
+                self._models[model.__tablename__] = model
+
+        if hot:
+            session = db.session()
+            if session.in_transaction():
+                session.info.setdefault(_PENDING_KEY, []).append((self, key, delta))
+            else:
+                self._add_pending([(key, delta)])
+            self._ensure_flusher()
+        else:
+            db.session.execute(
+                update(model)
+                .where(model.id == object_id)
+                .values(votes=model.votes + delta)
+                .execution_options(synchronize_session=False)
+            )
+        return hot
+
+    def _add_pending(self, deltas):
+        with self._lock:
+            for key, delta in deltas:
+                self._pending[key] = self._pending.get(key, 0) + delta
+
+    def pending(self, model, object_id):
+        """Delta pas encore écrit en base pour cet objet (0 si aucun)."""
+        return self._pending.get((model.__tablename__, object_id), 0)
+
+    def maybe_flush(self):
+        """Écrire les deltas en attente si l'intervalle est écoulé.
+
+        À appeler hors de toute transaction d'écriture de la session (après
+        le commit) : le flush utilise sa propre connexion.
+        """
+        if self._pending and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+            expired = [key for key, (start, _) in self._rates.items()
+                       if self._last_flush - start > self.hot_window]
+            for key in expired:
+                del self._rates[key]
+        if not batch:
+            return 0
+
+        try:
+            with db.engine.begin() as conn:
+                flushed = {}
+                for (table, object_id), delta in batch.items():
+                    if not delta:
+                        continue
+                    model = self._models[table]
+                    conn.execute(
+                        update(model)
+                        .where(model.id == object_id)
+                        .values(votes=model.votes + delta)
+                    )
+                    flushed.setdefault(table, []).append(object_id)
+                for table, object_ids in flushed.items():
+                    if table in self.flush_hooks:
+                        self.flush_hooks[table](conn, object_ids)
+        except Exception:
+            # Remettre les deltas en attente pour le prochain essai
+            self._add_pending(batch.items())
+            raise
+        return len(batch)
+
+    def _ensure_flusher(self):
+        if self._flusher_started:
+            return
+        from flask import current_app
+        from .. import socketio
+
+        self._app = current_app._get_current_object()
+        self._flusher_started = True
+        socketio.start_background_task(self._flush_loop)
+
+    def _flush_loop(self):
+        from .. import socketio
+
+        while True:
+            socketio.sleep(self.flush_interval)
+            if not self._pending:
+                continue
+            try:
+                with self._app.app_context():
+                    self.flush()
+            except Exception:
+                logging.getLogger(__name__).exception('Échec du flush des votes')
+
+
+@event.listens_for(Session, 'after_commit')
+def _buffer_after_commit(session):
+    staged = session.info.pop(_PENDING_KEY, None)
+    if not staged:
+        return
+    by_buffer = {}
+    for buffer, key, delta in staged:
+        by_buffer.setdefault(buffer, []).append((key, delta))
+    for buffer, deltas in by_buffer.items():
+        buffer._add_pending(deltas)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _drop_after_rollback(session, transaction):
+    # Fin de la transaction principale sans commit (rollback, close)
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+
+
+vote_buffer = VoteBuffer()
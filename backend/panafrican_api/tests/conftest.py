@@ -0,0 +1,117 @@
+"""Fixtures communes : application Flask sur une base SQLite temporaire.
+
+La base est partagée par tous les tests de la session : chaque test crée
+ses propres utilisateurs (noms uniques) et filtre ses lectures sur ses
+propres données.
+"""
+import datetime
+import itertools
+import os
+from contextlib import contextmanager
+
+import jwt
+import pytest
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
+
+PASSWORD = 'password'
+
+_names = itertools.count(1)
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    db_path = tmp_path_factory.mktemp('database') / 'test.db'
+    previous = os.environ.get('DATABASE_URL')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+
+    from src import create_app
+    from src.schema import upgrade_schema
+
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        upgrade_schema()
+    yield app
+
+    if previous is None:
+        os.environ.pop('DATABASE_URL', None)
+    else:
+        os.environ['DATABASE_URL'] = previous
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture(scope='session')
+def password_hash():
+    # Calculé une fois : le hachage coûte des dizaines de millisecondes
+    return generate_password_hash(PASSWORD)
+
+
+@pytest.fixture
+def make_user(app, password_hash):
+    """Créer un utilisateur ; retourne (id, en-têtes d'authentification)."""
+    from src.models.user import db, User
+
+    def make_user(**fields):
+        name = f"user{next(_names)}"
+        values = dict(username=name, email=f'{name}@example.org', password_hash=password_hash,
+                      first_name=name.capitalize(), last_name='Test', country='SN')
+        values.update(fields)
+        with app.app_context():
+            user = User(**values)
+            db.session.add(user)
+            db.session.commit()
+            user_id = user.id
+        return user_id, auth_headers(app, user_id)
+
+    return make_user
+
+
+@pytest.fixture
+def make_mentor(client, make_user):
+    """Créer un utilisateur mentor ; retourne (id du mentor, id utilisateur, en-têtes)."""
+    def make_mentor(specialties=('Mathématiques',)):
+        user_id, headers = make_user(role='mentor')
+        response = client.post('/api/mentors/become', headers=headers, json={
+            'specialties': list(specialties), 'experience_years': 3,
+            'education_level': 'Master', 'institution': 'Université de Dakar'
+        })
+        assert response.status_code == 201, response.json
+        return response.json['mentor']['id'], user_id, headers
+
+    return make_mentor
+
+
+def auth_headers(app, user_id):
+    token = jwt.encode({
+        'user_id': user_id,
+        'exp': datetime.datetime.utcnow() + datetime.timedelta(days=1)
+    }, app.config['SECRET_KEY'], algorithm='HS256')
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def count_queries(app):
+    """`with count_queries() as queries:` -> liste des requêtes SQL exécutées."""
+    from src.models.user import db
+
+    @contextmanager
+    def count_queries():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+
+    return count_queries
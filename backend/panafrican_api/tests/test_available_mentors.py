@@ -0,0 +1,103 @@
+"""Recherche des mentors libres (GET /api/mentors/available) et index des
+intervalles libres (services/availability_index.py)."""
+import itertools
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models.user import db
+from src.models.mentor import MentorFreeInterval
+from src.services import availability_index, slots
+
+_specialties = itertools.count(1)
+
+
+@pytest.fixture
+def mentor(client, make_mentor):
+    """Mentor disponible tous les jours de 9h à 12h, seul de sa spécialité ;
+    retourne (id, spécialité, en-têtes, jour de test à minuit)."""
+    specialty = f'Spécialité {next(_specialties)}'
+    mentor_id, _, headers = make_mentor(specialties=(specialty,))
+    response = client.post('/api/mentors/availabilities', headers=headers, json={'availabilities': [
+        {'day_of_week': day, 'start_time': '09:00', 'end_time': '12:00'} for day in range(7)
+    ]})
+    assert response.status_code == 200
+    day = (datetime.now() + timedelta(days=3)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return mentor_id, specialty, headers, day
+
+
+def at(day, hour, minute=0):
+    return day + timedelta(hours=hour, minutes=minute)
+
+
+def search(client, specialty, start, end, duration):
+    return client.get('/api/mentors/available', query_string={
+        'specialty': specialty, 'start': start.isoformat(), 'end': end.isoformat(), 'duration': duration
+    })
+
+
+def found(client, specialty, start, end, duration):
+    response = search(client, specialty, start, end, duration)
+    assert response.status_code == 200, response.json
+    return {
+        mentor['id']: [(window['start'], window['end']) for window in mentor['free_intervals']]
+        for mentor in response.json['mentors']
+    }
+
+
+def indexed(app, mentor_id, day):
+    with app.app_context():
+        rows = MentorFreeInterval.query.filter(
+            MentorFreeInterval.mentor_id == mentor_id,
+            MentorFreeInterval.start_minute >= slots.to_minutes(day),
+            MentorFreeInterval.end_minute <= slots.to_minutes(day + timedelta(days=1))
+        ).order_by(MentorFreeInterval.start_minute).all()
+        return [(slots.from_minutes(row.start_minute), slots.from_minutes(row.end_minute)) for row in rows]
+
+
+def test_search_returns_free_windows_within_the_period(client, mentor):
+    mentor_id, specialty, _, day = mentor
+    assert found(client, specialty, at(day, 10), at(day, 13), 60) == {
+        mentor_id: [(at(day, 10).isoformat(), at(day, 12).isoformat())]
+    }
+    assert found(client, specialty, at(day, 13), at(day, 18), 60) == {}
+
+
+def test_period_shorter_than_duration_is_rejected(client, mentor):
+    _, specialty, _, day = mentor
+    assert search(client, specialty, at(day, 10), at(day, 10, 30), 60).status_code == 400
+
+
+def test_index_never_matches_a_period_shorter_than_duration(app, mentor):
+    mentor_id, _, _, day = mentor
+    start, end = slots.to_minutes(at(day, 9, 30)), slots.to_minutes(at(day, 10))
+    with app.app_context():
+        matched = db.session.execute(availability_index.mentors_free_between(start, end, 60)).scalars().all()
+    assert mentor_id not in matched
+
+
+def test_booking_and_cancelling_refresh_the_index(app, client, make_user, mentor):
+    mentor_id, specialty, _, day = mentor
+    _, student = make_user()
+    assert indexed(app, mentor_id, day) == [(at(day, 9), at(day, 12))]
+
+    response = client.post(f'/api/mentors/{mentor_id}/book', headers=student, json={
+        'session_date': at(day, 10).isoformat(), 'subject': 'Algèbre', 'duration_minutes': 60
+    })
+    assert response.status_code == 201, response.json
+    assert indexed(app, mentor_id, day) == [(at(day, 9), at(day, 10)), (at(day, 11), at(day, 12))]
+    assert found(client, specialty, at(day, 9), at(day, 12), 90) == {}
+    assert mentor_id in found(client, specialty, at(day, 9), at(day, 12), 60)
+
+    session_id = response.json['session']['id']
+    assert client.post(f'/api/mentorship/sessions/{session_id}/cancel', headers=student).status_code == 200
+    # Les deux intervalles sont de nouveau fusionnés
+    assert indexed(app, mentor_id, day) == [(at(day, 9), at(day, 12))]
+
+
+def test_refresh_keeps_intervals_merged(app, mentor):
+    mentor_id, _, _, day = mentor
+    with app.app_context():
+        availability_index.refresh_free_intervals([mentor_id], slots.to_minutes(at(day, 10)), slots.to_minutes(at(day, 11)))
+        db.session.commit()
+    assert indexed(app, mentor_id, day) == [(at(day, 9), at(day, 12))]
@@ -0,0 +1,84 @@
+"""Réservations simultanées d'un même créneau : une seule doit aboutir."""
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models.user import db
+from src.models.mentor import MentorSession
+
+THREADS = 200
+
+
+def next_slot(days=3, hour=10):
+    return (datetime.now() + timedelta(days=days)).replace(hour=hour, minute=0, second=0, microsecond=0)
+
+
+def book_concurrently(app, mentor_id, requests_by_thread):
+    """Lancer toutes les réservations en même temps ; retourne les statuts."""
+    barrier = threading.Barrier(len(requests_by_thread))
+    statuses = [None] * len(requests_by_thread)
+
+    def book(index, headers, payload):
+        client = app.test_client()
+        barrier.wait()
+        statuses[index] = client.post(f'/api/mentors/{mentor_id}/book', headers=headers, json=payload).status_code
+
+    threads = [threading.Thread(target=book, args=(i, headers, payload))
+               for i, (headers, payload) in enumerate(requests_by_thread)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return statuses
+
+
+@pytest.fixture
+def students(make_user):
+    return [make_user()[1] for _ in range(THREADS)]
+
+
+def test_contested_slot_is_booked_exactly_once(app, make_mentor, students):
+    mentor_id, _, _ = make_mentor()
+    slot = next_slot()
+    payload = {'session_date': slot.isoformat(), 'subject': 'Algèbre', 'duration_minutes': 60}
+
+    statuses = book_concurrently(app, mentor_id, [(headers, payload) for headers in students])
+
+    assert statuses.count(201) == 1
+    assert statuses.count(409) == THREADS - 1
+    with app.app_context():
+        assert MentorSession.query.filter_by(mentor_id=mentor_id, session_date=slot).count() == 1
+
+
+def test_overlapping_slots_are_booked_exactly_once(app, make_mentor, students):
+    mentor_id, _, _ = make_mentor()
+    slot = next_slot()
+    # Débuts décalés de 10 minutes, tous en chevauchement avec les autres
+    requests_by_thread = [
+        (headers, {'session_date': (slot + timedelta(minutes=10 * (i % 6))).isoformat(),
+                   'subject': 'Algèbre', 'duration_minutes': 60})
+        for i, headers in enumerate(students)
+    ]
+
+    statuses = book_concurrently(app, mentor_id, requests_by_thread)
+
+    assert statuses.count(201) == 1
+    assert statuses.count(409) == THREADS - 1
+    with app.app_context():
+        assert MentorSession.query.filter_by(mentor_id=mentor_id).count() == 1
+
+
+def test_distinct_slots_are_all_booked(app, make_mentor, students):
+    mentor_id, _, _ = make_mentor()
+    requests_by_thread = [
+        (headers, {'session_date': next_slot(days=2 + i // 8, hour=9 + i % 8).isoformat(),
+                   'subject': 'Algèbre', 'duration_minutes': 60})
+        for i, headers in enumerate(students)
+    ]
+
+    statuses = book_concurrently(app, mentor_id, requests_by_thread)
+
+    assert statuses == [201] * THREADS
+    with app.app_context():
+        assert db.session.query(MentorSession).filter_by(mentor_id=mentor_id).count() == THREADS
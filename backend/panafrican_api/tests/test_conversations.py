@@ -0,0 +1,121 @@
+"""Table `conversation` : non-lus de chaque côté, messages à soi-même,
+création concurrente et reconstruction depuis l'historique."""
+from sqlalchemy import delete, event, or_
+
+from src.models.user import db
+from src.models.message import Conversation
+from src.services import conversations as inbox
+
+
+def send(client, sender, recipient_id, content='Bonjour'):
+    response = client.post('/api/messages', headers=sender, json={'recipient_id': recipient_id, 'content': content})
+    assert response.status_code == 201, response.json
+    return response.json['data']
+
+
+def inbox_of(client, headers):
+    """{id de l'interlocuteur: (non-lus, id du dernier message)}."""
+    response = client.get('/api/messages/conversations', headers=headers)
+    assert response.status_code == 200
+    return {
+        item['user']['id']: (item['unread_count'], item['last_message']['id'])
+        for item in response.json['conversations']
+    }
+
+
+def conversation_rows(app, user_ids):
+    with app.app_context():
+        rows = Conversation.query.filter(or_(
+            Conversation.user_low_id.in_(user_ids), Conversation.user_high_id.in_(user_ids)
+        )).all()
+        return sorted(
+            (row.user_low_id, row.user_high_id, row.last_message_id, row.last_activity_at, row.unread_low, row.unread_high)
+            for row in rows
+        )
+
+
+def test_unread_counts_are_kept_per_side(client, make_user):
+    alice_id, alice = make_user()
+    bob_id, bob = make_user()
+    send(client, alice, bob_id)
+    send(client, alice, bob_id)
+    last = send(client, bob, alice_id)
+
+    assert inbox_of(client, alice) == {bob_id: (1, last['id'])}
+    assert inbox_of(client, bob) == {alice_id: (2, last['id'])}
+
+    client.get(f'/api/messages/conversation/{alice_id}', headers=bob)
+    assert inbox_of(client, bob) == {alice_id: (0, last['id'])}
+    assert inbox_of(client, alice) == {bob_id: (1, last['id'])}
+
+
+def test_message_to_oneself(client, make_user):
+    user_id, headers = make_user()
+    message = send(client, headers, user_id)
+
+    assert inbox_of(client, headers) == {user_id: (1, message['id'])}
+    client.get(f'/api/messages/conversation/{user_id}', headers=headers)
+    assert inbox_of(client, headers) == {user_id: (0, message['id'])}
+
+
+def test_first_messages_sent_concurrently(app, client, make_user):
+    alice_id, alice = make_user()
+    bob_id, bob = make_user()
+    low, high = inbox.user_pair(alice_id, bob_id)
+    concurrent_inserts = []
+
+    def concurrent_first_message(conn, cursor, statement, parameters, context, executemany):
+        # Entre l'UPDATE sans effet et l'INSERT, l'autre utilisateur crée la ligne
+        if statement.startswith('UPDATE conversation') and cursor.rowcount == 0 and not concurrent_inserts:
+            concurrent_inserts.append(statement)
+            cursor.connection.execute(
+                'INSERT INTO conversation (user_low_id, user_high_id, last_activity_at, unread_low, unread_high) '
+                "VALUES (?, ?, '2000-01-01 00:00:00', ?, ?)",
+                (low, high, int(low == alice_id), int(high == alice_id))
+            )
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'after_cursor_execute', concurrent_first_message)
+    try:
+        message = send(client, alice, bob_id)
+    finally:
+        event.remove(engine, 'after_cursor_execute', concurrent_first_message)
+
+    assert concurrent_inserts
+    assert inbox_of(client, alice) == {bob_id: (1, message['id'])}
+    assert inbox_of(client, bob) == {alice_id: (1, message['id'])}
+
+
+def test_upgrade_db_backfill_matches_the_message_history(app, client, make_user):
+    users = [make_user() for _ in range(3)]
+    (a_id, a), (b_id, b), (c_id, c) = users
+    send(client, a, b_id)
+    send(client, b, a_id)
+    send(client, a, c_id)
+    send(client, c, c_id)
+    client.get(f'/api/messages/conversation/{a_id}', headers=b)
+    send(client, a, b_id)
+    user_ids = [user_id for user_id, _ in users]
+    expected = conversation_rows(app, user_ids)
+    assert len(expected) == 3
+
+    with app.app_context():
+        db.session.execute(delete(Conversation))
+        db.session.commit()
+    result = app.test_cli_runner().invoke(args=['upgrade-db'])
+    assert result.exit_code == 0, result.output
+    assert 'Table des conversations construite' in result.output
+
+    assert conversation_rows(app, user_ids) == expected
+
+
+def test_rebuild_is_idempotent(app, client, make_user):
+    (a_id, a), (b_id, b) = make_user(), make_user()
+    send(client, a, b_id)
+    send(client, b, a_id)
+    expected = conversation_rows(app, [a_id, b_id])
+
+    with app.app_context():
+        inbox.rebuild_conversations()
+    assert conversation_rows(app, [a_id, b_id]) == expected
@@ -0,0 +1,78 @@
+"""ETag et 304 de GET /api/questions/<id>."""
+import pytest
+
+
+def create_question(client, headers):
+    response = client.post('/api/questions', headers=headers, json={
+        'title': 'Loi de Newton', 'content': 'Pourquoi F = ma ?', 'subject': 'Physique', 'level': 'Lycée'
+    })
+    assert response.status_code == 201
+    return response.json['question']['id']
+
+
+@pytest.fixture
+def question(client, make_user):
+    _, author = make_user()
+    question_id = create_question(client, author)
+    response = client.post(f'/api/questions/{question_id}/answers', headers=author, json={'content': 'Réponse'})
+    return question_id, response.json['answer']['id']
+
+
+def etag_of(client, question_id, headers=None):
+    response = client.get(f'/api/questions/{question_id}', headers=headers)
+    assert response.status_code == 200
+    return response.headers['ETag']
+
+
+def test_unchanged_question_answers_304(client, question):
+    question_id, _ = question
+    etag = etag_of(client, question_id)
+    response = client.get(f'/api/questions/{question_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+
+def test_votes_on_other_questions_keep_the_etag(client, make_user, question):
+    question_id, _ = question
+    _, author = make_user()
+    other_id = create_question(client, author)
+    etag = etag_of(client, question_id)
+
+    # Assez de votes pour que l'autre question devienne une clé chaude
+    for _ in range(8):
+        client.post(f'/api/questions/{other_id}/vote', headers=make_user()[1], json={'type': 'up'})
+
+    response = client.get(f'/api/questions/{question_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+
+@pytest.mark.parametrize('target', ['question', 'answer'])
+def test_votes_on_the_question_change_the_etag(client, make_user, question, target):
+    question_id, answer_id = question
+    _, voter = make_user()
+    etag = etag_of(client, question_id)
+    voter_etag = etag_of(client, question_id, voter)
+
+    url = f'/api/questions/{question_id}/vote' if target == 'question' else f'/api/answers/{answer_id}/vote'
+    client.post(url, headers=voter, json={'type': 'up'})
+
+    assert etag_of(client, question_id) != etag
+    assert etag_of(client, question_id, voter) != voter_etag
+
+
+def test_buffered_votes_change_the_etag(client, make_user, question):
+    question_id, _ = question
+    voters = [make_user()[1] for _ in range(8)]
+    etags = set()
+    # Au-delà du seuil, la clé devient chaude : les deltas restent en mémoire
+    for voter in voters:
+        client.post(f'/api/questions/{question_id}/vote', headers=voter, json={'type': 'up'})
+        etags.add(etag_of(client, question_id))
+    assert len(etags) == len(voters)
+
+
+def test_new_answer_changes_the_etag(client, make_user, question):
+    question_id, _ = question
+    _, author = make_user()
+    etag = etag_of(client, question_id)
+    client.post(f'/api/questions/{question_id}/answers', headers=author, json={'content': 'Autre réponse'})
+    assert etag_of(client, question_id) != etag
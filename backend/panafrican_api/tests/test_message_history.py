@@ -0,0 +1,78 @@
+"""Historique d'une conversation (GET /api/messages/conversation/<id>) :
+fenêtres before/after, has_more et marquage des messages lus."""
+import pytest
+
+from src.models.message import Message
+
+
+@pytest.fixture
+def conversation(client, make_user):
+    """Sept messages alternés entre deux utilisateurs ; retourne
+    (id et en-têtes de chacun, ids des messages dans l'ordre d'envoi)."""
+    alice_id, alice = make_user()
+    bob_id, bob = make_user()
+    message_ids = []
+    for n in range(7):
+        sender, recipient_id = (alice, bob_id) if n % 2 == 0 else (bob, alice_id)
+        response = client.post('/api/messages', headers=sender, json={'recipient_id': recipient_id, 'content': f'm{n}'})
+        assert response.status_code == 201
+        message_ids.append(response.json['data']['id'])
+    return (alice_id, alice), (bob_id, bob), message_ids
+
+
+def history(client, headers, partner_id, **params):
+    response = client.get(f'/api/messages/conversation/{partner_id}', headers=headers,
+                          query_string=dict(per_page=3, **params))
+    assert response.status_code == 200, response.json
+    return [message['id'] for message in response.json['messages']], response.json['has_more']
+
+
+def test_pages_backwards_with_before(client, conversation):
+    (alice_id, alice), (bob_id, _), ids = conversation
+
+    assert history(client, alice, bob_id) == (ids[4:7], True)
+    assert history(client, alice, bob_id, before=ids[4]) == (ids[1:4], True)
+    assert history(client, alice, bob_id, before=ids[1]) == (ids[0:1], False)
+
+
+def test_pages_forwards_with_after(client, conversation):
+    (alice_id, alice), (bob_id, _), ids = conversation
+
+    assert history(client, alice, bob_id, after=ids[0]) == (ids[1:4], True)
+    assert history(client, alice, bob_id, after=ids[3]) == (ids[4:7], False)
+    assert history(client, alice, bob_id, after=ids[6]) == ([], False)
+
+
+def test_both_users_see_the_same_history(client, conversation):
+    (alice_id, alice), (bob_id, bob), ids = conversation
+    assert history(client, bob, alice_id, before=ids[3]) == history(client, alice, bob_id, before=ids[3])
+
+
+def test_invalid_cursors_are_rejected(client, make_user, conversation):
+    (_, alice), (bob_id, _), ids = conversation
+    carol_id, _ = make_user()
+
+    url = f'/api/messages/conversation/{bob_id}'
+    assert client.get(url, headers=alice, query_string={'before': ids[3], 'after': ids[1]}).status_code == 400
+    # Message d'une autre conversation
+    other_url = f'/api/messages/conversation/{carol_id}'
+    assert client.get(other_url, headers=alice, query_string={'before': ids[3]}).status_code == 400
+
+
+def test_reading_marks_received_messages_in_one_update(app, client, count_queries, conversation):
+    (alice_id, _), (bob_id, bob), ids = conversation
+
+    with count_queries() as queries:
+        history(client, bob, alice_id)
+    updates = [query for query in queries if query.startswith('UPDATE messages')]
+    assert len(updates) == 1
+
+    with app.app_context():
+        read = {message.id: message.read_at is not None for message in Message.query.filter(Message.id.in_(ids))}
+    # Reçus par Bob (envoyés par Alice) : lus, même hors de la page affichée
+    assert read == {message_id: n % 2 == 0 for n, message_id in enumerate(ids)}
+
+    # Plus rien à marquer : la conversation n'est pas réécrite
+    with count_queries() as queries:
+        history(client, bob, alice_id)
+    assert [query for query in queries if query.startswith('UPDATE')] == updates
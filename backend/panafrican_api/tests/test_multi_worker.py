@@ -0,0 +1,109 @@
+"""Événements Socket.IO entre deux workers reliés par la file de messages.
+
+Lance socketio_queue_server.py et deux workers `python -m src.main` sur la
+base des tests (comme run_workers.py) ; un message envoyé par l'API d'un
+worker doit atteindre le destinataire connecté en WebSocket à l'autre.
+"""
+import os
+import queue
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+socketio_client = pytest.importorskip('socketio')
+requests = pytest.importorskip('requests')
+pytest.importorskip('websocket')
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+TIMEOUT = 10
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(url):
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Worker injoignable : {url}')
+
+
+@pytest.fixture(scope='module')
+def workers(app):
+    """Deux workers sur la base des tests ; retourne leurs URL."""
+    queue_port = free_port()
+    processes = [subprocess.Popen(
+        [sys.executable, 'socketio_queue_server.py', '--port', str(queue_port)],
+        cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )]
+    urls = []
+    try:
+        for _ in range(2):
+            port = free_port()
+            env = dict(os.environ, PORT=str(port), FLASK_DEBUG='0', BACKGROUND_JOBS='0',
+                       SOCKETIO_MESSAGE_QUEUE=f'redis://127.0.0.1:{queue_port}/0',
+                       SLOT_HOLD_STORE='database')
+            processes.append(subprocess.Popen([sys.executable, '-m', 'src.main'], cwd=BASE_DIR, env=env,
+                                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+            urls.append(f'http://127.0.0.1:{port}')
+        for url in urls:
+            wait_ready(f'{url}/api/questions/stats')
+        yield urls
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+
+def connect(url, headers):
+    """Client WebSocket authentifié ; retourne (client, file des événements reçus)."""
+    received = queue.Queue()
+    client = socketio_client.Client()
+    client.on('*', lambda event_name, data: received.put((event_name, data)))
+    client.connect(url, auth={'token': headers['Authorization'].split()[1]},
+                   transports=['websocket'], wait_timeout=TIMEOUT)
+    return client, received
+
+
+def wait_for_message(received, content):
+    deadline = time.monotonic() + TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            event_name, data = received.get(timeout=max(deadline - time.monotonic(), 0.01))
+        except queue.Empty:
+            break
+        # Événement seul, ou regroupé dans un `batch` (realtime.py)
+        events = data if event_name == 'batch' else [{'event': event_name, 'data': data}]
+        for item in events:
+            if item['event'] == 'new_message' and item['data']['content'] == content:
+                return item['data']
+    pytest.fail(f'Message non reçu : {content}')
+
+
+@pytest.mark.parametrize('sender_worker, recipient_worker', [(0, 1), (1, 0)], ids=['A->B', 'B->A'])
+def test_message_reaches_recipient_on_other_worker(workers, make_user, sender_worker, recipient_worker):
+    sender_id, sender = make_user()
+    recipient_id, recipient = make_user()
+    client, received = connect(workers[recipient_worker], recipient)
+    try:
+        content = f'Bonjour de {sender_id}'
+        response = requests.post(f'{workers[sender_worker]}/api/messages', headers=sender,
+                                 json={'recipient_id': recipient_id, 'content': content}, timeout=TIMEOUT)
+        assert response.status_code == 201, response.text
+
+        message = wait_for_message(received, content)
+        assert message['sender_id'] == sender_id
+        assert message['recipient_id'] == recipient_id
+    finally:
+        client.disconnect()
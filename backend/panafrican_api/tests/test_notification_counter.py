@@ -0,0 +1,105 @@
+"""Compteur des notifications non lues (table notification_counter)."""
+import pytest
+from sqlalchemy import text
+
+from src.models.user import db
+from src.models.notification import Notification, NotificationCounter
+from src.routes.notifications import create_notification
+from src.services import notification_counter
+
+
+@pytest.fixture
+def pushed(monkeypatch):
+    """Événements `unread_count` publiés au commit : [(salle, valeur)]."""
+    events = []
+    monkeypatch.setattr(notification_counter.presence, 'is_reachable', lambda user_id: True)
+    monkeypatch.setattr(notification_counter.realtime, 'queue_event',
+                        lambda room, event_name, payload: events.append((room, payload['unread_count'])))
+    return events
+
+
+def notify(app, user_id, count=1):
+    with app.app_context():
+        for _ in range(count):
+            create_notification(user_id, 'Titre', 'Message', 'answer')
+
+
+def unread_of(client, headers):
+    response = client.get('/api/notifications?pagination=cursor', headers=headers)
+    assert response.status_code == 200
+    return response.json['unread_count']
+
+
+def stored_count(app, user_id):
+    with app.app_context():
+        return notification_counter.unread_count(user_id)
+
+
+def test_counter_follows_notification_changes(app, client, make_user, pushed):
+    user_id, headers = make_user()
+    assert unread_of(client, headers) == 0
+
+    notify(app, user_id, 3)
+    assert unread_of(client, headers) == 3
+
+    with app.app_context():
+        first, second, _ = Notification.query.filter_by(user_id=user_id).order_by(Notification.id).all()
+        first_id = first.id
+        db.session.delete(second)
+        db.session.commit()
+    assert unread_of(client, headers) == 2
+
+    assert client.post(f'/api/notifications/{first_id}/read', headers=headers).status_code == 200
+    # Relire une notification déjà lue ne décrémente pas une seconde fois
+    assert client.post(f'/api/notifications/{first_id}/read', headers=headers).status_code == 200
+    assert unread_of(client, headers) == 1
+
+    notify(app, user_id, 2)
+    assert client.post('/api/notifications/mark-all-read', headers=headers).status_code == 200
+    assert unread_of(client, headers) == 0
+
+    room = f'user_{user_id}'
+    assert [count for event_room, count in pushed if event_room == room] == [1, 2, 3, 2, 1, 2, 3, 0]
+
+
+def test_rollback_keeps_the_counter(app, make_user, pushed):
+    user_id, _ = make_user()
+    notify(app, user_id)
+
+    with app.app_context():
+        db.session.add(Notification(user_id=user_id, title='Titre', message='Message', type='answer'))
+        db.session.flush()
+        assert db.session.get(NotificationCounter, user_id).unread_count == 2
+        db.session.rollback()
+
+    assert stored_count(app, user_id) == 1
+    assert [count for _, count in pushed] == [1]
+
+
+def test_writes_and_reads_do_not_recount(app, client, make_user, count_queries):
+    user_id, headers = make_user()
+    with count_queries() as queries:
+        notify(app, user_id)
+        unread_of(client, headers)
+    assert not [query for query in queries if 'count(' in query.lower()]
+
+
+def test_counter_is_shared_by_every_process(app, client, make_user):
+    user_id, headers = make_user()
+    notify(app, user_id)
+    assert unread_of(client, headers) == 1
+
+    # Écriture d'un autre worker : visible tout de suite, sans cache local
+    with app.app_context(), db.engine.begin() as conn:
+        conn.execute(text('UPDATE notification_counter SET unread_count = 5 WHERE user_id = :id'), {'id': user_id})
+    assert unread_of(client, headers) == 5
+
+
+def test_repair_recounts_from_notifications(app, make_user):
+    user_id, _ = make_user()
+    notify(app, user_id, 2)
+    with app.app_context():
+        db.session.get(NotificationCounter, user_id).unread_count = 7
+        db.session.commit()
+        assert notification_counter.repair_unread_counts([user_id]) == 1
+    assert stored_count(app, user_id) == 2
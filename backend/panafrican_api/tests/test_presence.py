@@ -0,0 +1,140 @@
+"""Présence en ligne : connexion Socket.IO authentifiée, expiration des
+sockets silencieux et repli sur une notification pour les hors-ligne."""
+import uuid
+
+import pytest
+
+from src import socketio
+from src.models.user import db, SocketPresence
+from src.models.notification import Notification
+from src.services import presence, realtime
+from src.services.presence import DatabasePresenceStore, PresenceRegistry
+
+STORES = {'memory': PresenceRegistry, 'database': DatabasePresenceStore}
+
+
+@pytest.fixture(params=list(STORES))
+def store(request, app, monkeypatch):
+    """Stockage de présence utilisé par l'application pendant le test."""
+    store = STORES[request.param]()
+    monkeypatch.setattr(presence, '_registry', store)
+    with app.app_context():
+        yield store
+
+
+def connect(app, headers=None, token=None):
+    if headers is not None:
+        token = headers['Authorization'].split()[1]
+    return socketio.test_client(app, auth={'token': token} if token else None)
+
+
+def presence_of(client, headers, user_id):
+    response = client.get(f'/api/users/presence?ids={user_id}', headers=headers)
+    assert response.status_code == 200
+    return response.json['presence'][str(user_id)]
+
+
+def new_messages(socket_client):
+    realtime.flush()
+    received = []
+    for packet in socket_client.get_received():
+        if packet['name'] == 'batch':
+            received += [item['data'] for item in packet['args'][0] if item['event'] == 'new_message']
+        elif packet['name'] == 'new_message':
+            received.append(packet['args'][0])
+    return received
+
+
+def send(client, sender, recipient_id, content):
+    response = client.post('/api/messages', headers=sender, json={'recipient_id': recipient_id, 'content': content})
+    assert response.status_code == 201
+    return response.json['data']
+
+
+def deferred_notifications(app, recipient_id):
+    with app.app_context():
+        return Notification.query.filter_by(user_id=recipient_id, type='new_message').count()
+
+
+@pytest.mark.parametrize('token', [None, 'pas-un-jeton'], ids=['no-token', 'bad-token'])
+def test_connect_requires_a_valid_token(app, token):
+    assert not connect(app, token=token).is_connected()
+
+
+def test_connect_and_disconnect_update_presence(app, client, make_user, store):
+    user_id, headers = make_user()
+    _, viewer = make_user()
+    assert presence_of(client, viewer, user_id) == {'online': False, 'last_seen': None}
+
+    socket_client = connect(app, headers)
+    assert socket_client.is_connected()
+    assert presence_of(client, viewer, user_id)['online'] is True
+
+    socket_client.disconnect()
+    state = presence_of(client, viewer, user_id)
+    assert state['online'] is False
+    assert state['last_seen'] is not None
+
+
+def test_silent_sockets_expire(make_user, store):
+    user_id, _ = make_user()
+    sid = uuid.uuid4().hex
+    store.seen(user_id, sid, now=1000)
+
+    assert store.is_online(user_id, now=1000 + store.ttl - 1)
+    assert not store.is_online(user_id, now=1000 + store.ttl + 1)
+
+    # Un nouveau signe de vie remet le socket en ligne
+    store.seen(user_id, sid, now=2000)
+    assert store.is_online(user_id, now=2000 + store.ttl - 1)
+    assert store.last_seen(user_id) == 2000
+
+
+def test_database_store_purges_expired_sockets(app, make_user):
+    store = DatabasePresenceStore()
+    user_id, _ = make_user()
+    lost_sid = uuid.uuid4().hex
+    with app.app_context():
+        store.seen(user_id, lost_sid, now=1000)
+        store.seen(user_id, uuid.uuid4().hex, now=1000 + store.ttl + 1)
+        assert db.session.get(SocketPresence, lost_sid) is None
+
+
+def test_offline_recipient_gets_a_notification(app, client, make_user, store):
+    _, sender = make_user()
+    recipient_id, recipient = make_user()
+
+    send(client, sender, recipient_id, 'Hors ligne')
+    assert deferred_notifications(app, recipient_id) == 1
+
+    socket_client = connect(app, recipient)
+    socket_client.get_received()
+    message = send(client, sender, recipient_id, 'En ligne')
+    assert [received['id'] for received in new_messages(socket_client)] == [message['id']]
+    assert deferred_notifications(app, recipient_id) == 1
+    socket_client.disconnect()
+
+
+def test_socket_on_another_worker_counts_as_reachable(app, client, make_user, monkeypatch):
+    monkeypatch.setattr(presence, '_registry', DatabasePresenceStore())
+    _, sender = make_user()
+    recipient_id, _ = make_user()
+    other_worker_sid = uuid.uuid4().hex
+
+    with app.app_context():
+        # Écrit par un autre processus qui partage la base
+        DatabasePresenceStore().seen(recipient_id, other_worker_sid)
+    send(client, sender, recipient_id, 'Vers un autre worker')
+    assert deferred_notifications(app, recipient_id) == 0
+
+    with app.app_context():
+        DatabasePresenceStore().disconnect(other_worker_sid)
+    send(client, sender, recipient_id, 'Déconnecté')
+    assert deferred_notifications(app, recipient_id) == 1
+
+
+def test_presence_endpoint_refuses_a_partial_registry(client, make_user, monkeypatch):
+    monkeypatch.setattr(presence, 'AUTHORITATIVE', False)
+    user_id, headers = make_user()
+    response = client.get(f'/api/users/presence?ids={user_id}', headers=headers)
+    assert response.status_code == 503
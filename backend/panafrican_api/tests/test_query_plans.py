@@ -0,0 +1,94 @@
+"""Plans d'exécution (EXPLAIN QUERY PLAN) des requêtes des routes de lecture.
+
+Chaque route est appelée pour de vrai ; ses requêtes SQL sont capturées
+puis expliquées avec leurs paramètres. Le test échoue si une requête
+parcourt une table entière (`SCAN <table>` sans index) ou si l'index
+attendu n'est plus utilisé.
+"""
+import re
+
+import pytest
+from sqlalchemy import event
+
+from src.models.user import db
+
+BARE_SCAN = re.compile(r'^SCAN (\w+)$')
+
+ROUTES = [
+    ('/api/questions', None, ['ix_question_created_at']),
+    ('/api/questions?subject=Mathématiques', None, ['ix_question_subject_created_at']),
+    ('/api/questions?level=Lycée', None, ['ix_question_level_created_at']),
+    ('/api/questions?country=SN', None, ['ix_question_country_created_at']),
+    ('/api/questions?sort_by=popular', None, ['ix_question_votes_created_at']),
+    ('/api/questions?sort_by=most_answered', None, ['ix_question_answers_count_created_at']),
+    ('/api/questions?sort_by=hot', None, ['ix_question_hot_score_created_at']),
+    ('/api/questions?subject=Mathématiques&pagination=cursor', None, ['ix_question_subject_created_at']),
+    ('/api/notifications', 'student', ['ix_notification_user_id_created_at']),
+    ('/api/notifications?unread_only=true', 'student', ['ix_notification_user_id_is_read_created_at']),
+    ('/api/messages/conversation/{mentor_user_id}', 'student', ['ix_messages_sender_id_recipient_id_created_at']),
+    ('/api/messages/conversations', 'student',
+     ['ix_conversation_user_low_id_last_activity_at', 'ix_conversation_user_high_id_last_activity_at']),
+    ('/api/mentors/{mentor_id}/available-slots?days=7', None,
+     ['ix_mentor_availability_mentor_id_is_active', 'ix_mentor_session_mentor_id_session_date_status']),
+    ('/api/mentorship/sessions?role=mentor', 'mentor', ['ix_mentor_session_mentor_id_session_date_status']),
+    ('/api/mentorship/sessions?role=student', 'student', ['ix_mentor_session_student_id_session_date']),
+    ('/api/mentorship/requests?role=mentor', 'mentor', ['ix_mentorship_request_mentor_id_created_at']),
+    ('/api/mentors?specialty=Mathématiques', None,
+     ['ix_mentor_is_available_rating', 'ix_mentor_specialty_slug_mentor_id']),
+    ('/api/leaderboard', None, ['ix_user_points_total_points']),
+    ('/api/leaderboard?category=contribution', None, ['ix_user_points_contribution_points']),
+    ('/api/leaderboard?category=mentorship', None, ['ix_user_points_mentorship_points']),
+    ('/api/leaderboard?category=learning', None, ['ix_user_points_learning_points']),
+    ('/api/opportunities', None, ['ix_opportunity_is_active_created_at']),
+]
+
+
+@pytest.fixture
+def parties(make_user, make_mentor):
+    mentor_id, mentor_user_id, mentor_headers = make_mentor()
+    _, student_headers = make_user()
+    return {
+        'ids': {'mentor_id': mentor_id, 'mentor_user_id': mentor_user_id},
+        'headers': {'mentor': mentor_headers, 'student': student_headers, None: None}
+    }
+
+
+def explain_route(app, client, url, headers):
+    """Appeler `url` et retourner [(requête, [lignes du plan])] de ses SELECT."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(url, headers=headers)
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    assert response.status_code == 200, response.json
+
+    plans = []
+    with app.app_context(), db.engine.connect() as conn:
+        for statement, parameters in statements:
+            if not statement.lstrip().upper().startswith('SELECT'):
+                continue
+            rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+            plans.append((statement, [row[3] for row in rows]))
+    return plans
+
+
+@pytest.mark.parametrize('url, role, indexes', ROUTES, ids=[route[0] for route in ROUTES])
+def test_route_queries_use_indexes(app, client, parties, url, role, indexes):
+    plans = explain_route(app, client, url.format(**parties['ids']), parties['headers'][role])
+    tables = set(db.metadata.tables)
+
+    for statement, details in plans:
+        for detail in details:
+            scan = BARE_SCAN.match(detail)
+            assert not (scan and scan.group(1) in tables), f'{detail} dans :\n{statement}'
+
+    used = ' '.join(detail for _, details in plans for detail in details)
+    for index in indexes:
+        assert re.search(rf'USING (COVERING )?INDEX {index}\b', used), f'{index} non utilisé : {used}'
@@ -0,0 +1,69 @@
+"""GET /api/questions : nombre de requêtes SQL indépendant de la taille de page."""
+import uuid
+
+
+def create_questions(client, headers, subject, count):
+    ids = []
+    for i in range(count):
+        response = client.post('/api/questions', headers=headers, json={
+            'title': f'Question {i}', 'content': 'Comment résoudre cette équation ?',
+            'subject': subject, 'level': 'Lycée'
+        })
+        assert response.status_code == 201
+        ids.append(response.json['question']['id'])
+    return ids
+
+
+def queries_for_page(client, count_queries, url, headers=None):
+    client.get(url, headers=headers)  # utilisateur mis en cache
+    with count_queries() as queries:
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    return response, len(queries)
+
+
+def test_question_page_runs_constant_number_of_queries(client, make_user, count_queries):
+    _, author = make_user()
+    _, voter = make_user()
+    subject = f'sujet-{uuid.uuid4().hex}'
+    url = f'/api/questions?subject={subject}&per_page=50'
+
+    question_ids = create_questions(client, author, subject, 2)
+    client.post(f'/api/questions/{question_ids[0]}/answers', headers=author, json={'content': 'Réponse'})
+    client.post(f'/api/questions/{question_ids[0]}/vote', headers=voter, json={'type': 'up'})
+    small, small_anonymous = queries_for_page(client, count_queries, url)
+    _, small_authenticated = queries_for_page(client, count_queries, url, voter)
+
+    question_ids += create_questions(client, author, subject, 40)
+    for question_id in question_ids[-10:]:
+        client.post(f'/api/questions/{question_id}/answers', headers=author, json={'content': 'Réponse'})
+        client.post(f'/api/questions/{question_id}/vote', headers=voter, json={'type': 'down'})
+    large, large_anonymous = queries_for_page(client, count_queries, url)
+    large_page, large_authenticated = queries_for_page(client, count_queries, url, voter)
+
+    assert len(small.json['questions']) == 2
+    assert len(large.json['questions']) == 42
+    # COUNT + page (auteurs en jointure), plus les votes de l'utilisateur
+    assert small_anonymous == large_anonymous <= 2
+    assert small_authenticated == large_authenticated <= 3
+
+    by_id = {q['id']: q for q in large_page.json['questions']}
+    assert by_id[question_ids[0]]['answers'] == 1
+    assert by_id[question_ids[0]]['user_vote'] == 'up'
+    assert by_id[question_ids[-1]]['user_vote'] == 'down'
+    assert by_id[question_ids[1]]['user_vote'] is None
+    assert by_id[question_ids[1]]['author']['id'] is not None
+
+
+def test_question_cursor_page_runs_constant_number_of_queries(client, make_user, count_queries):
+    _, headers = make_user()
+    subject = f'sujet-{uuid.uuid4().hex}'
+    url = f'/api/questions?subject={subject}&per_page=50&pagination=cursor'
+
+    create_questions(client, headers, subject, 3)
+    _, small = queries_for_page(client, count_queries, url, headers)
+    create_questions(client, headers, subject, 30)
+    response, large = queries_for_page(client, count_queries, url, headers)
+
+    assert len(response.json['questions']) == 33
+    assert small == large <= 2
@@ -0,0 +1,63 @@
+"""Recherche plein texte des questions (`?search=`)."""
+import uuid
+
+import pytest
+
+
+@pytest.fixture
+def searchable_question(client, make_user):
+    _, headers = make_user()
+    word = f'mot{uuid.uuid4().hex[:12]}'
+    response = client.post('/api/questions', headers=headers, json={
+        'title': f'Intégrales et {word}', 'content': 'Comment calculer cette intégrale ?',
+        'subject': 'Mathématiques', 'level': 'Université'
+    })
+    assert response.status_code == 201
+    return word, response.json['question']['id']
+
+
+def test_search_matches_words_regardless_of_accents(client, searchable_question):
+    word, question_id = searchable_question
+    response = client.get(f'/api/questions?search={word} integrales')
+    assert response.status_code == 200
+    assert [q['id'] for q in response.json['questions']] == [question_id]
+
+
+@pytest.mark.parametrize('search', ['"', '?!', '" * "', '***'])
+def test_search_without_any_word_returns_nothing(client, searchable_question, search):
+    response = client.get('/api/questions', query_string={'search': search})
+    assert response.status_code == 200
+    assert response.json['questions'] == []
+    assert response.json['total'] == 0
+
+
+def test_search_pages_by_relevance_with_a_cursor(client, make_user):
+    _, headers = make_user()
+    word = f'mot{uuid.uuid4().hex[:12]}'
+    for i in range(23):
+        # Pertinences variées (mot répété dans le titre) et ex aequo
+        client.post('/api/questions', headers=headers, json={
+            'title': ' '.join([word] * (i % 4 + 1)), 'content': f'Question {i}',
+            'subject': 'Physique', 'level': 'Lycée'
+        })
+    expected = [q['id'] for q in client.get(f'/api/questions?search={word}&per_page=50').json['questions']]
+
+    seen, cursor, pages = [], None, []
+    while True:
+        params = {'search': word, 'pagination': 'cursor', 'per_page': 10}
+        if cursor:
+            params['cursor'] = cursor
+        response = client.get('/api/questions', query_string=params)
+        assert response.status_code == 200
+        pages.append(response.json)
+        seen += [q['id'] for q in response.json['questions']]
+        cursor = response.json['next_cursor']
+        if not cursor:
+            break
+
+    assert len(expected) == 23
+    assert seen == expected
+    previous = client.get('/api/questions', query_string={
+        'search': word, 'pagination': 'cursor', 'per_page': 10, 'cursor': pages[-1]['prev_cursor']
+    })
+    assert [q['id'] for q in previous.json['questions']] == expected[10:20]
@@ -0,0 +1,84 @@
+"""Émission des événements Socket.IO après commit (services/realtime.py)."""
+import pytest
+
+from src import socketio
+from src.models.user import db, User
+from src.services import realtime
+
+
+@pytest.fixture
+def emitted(app, monkeypatch):
+    """Trames émises : [(événement, charge, salle)] ; le vidage différé est
+    déclenché à la main par `realtime.flush()`."""
+    frames = []
+    monkeypatch.setattr(socketio, 'emit', lambda event_name, payload, to=None: frames.append((event_name, payload, to)))
+    monkeypatch.setattr(socketio, 'start_background_task', lambda *args: None)
+    monkeypatch.setattr(realtime, 'COALESCE_WINDOW', 0.05)
+    realtime.flush()
+    frames.clear()
+    with app.app_context():
+        yield frames
+    realtime.flush()
+
+
+def begin():
+    # Ouvrir la transaction de la session, comme une route
+    db.session.query(User.id).first()
+
+
+def test_events_wait_for_the_commit(emitted):
+    begin()
+    realtime.dispatch('room_commit', 'ping', {'n': 1})
+    realtime.flush()
+    assert emitted == []
+
+    db.session.commit()
+    realtime.flush()
+    assert emitted == [('ping', {'n': 1}, 'room_commit')]
+
+
+def test_rollback_drops_the_events(emitted):
+    begin()
+    realtime.dispatch('room_rollback', 'ping', {'n': 1})
+    db.session.rollback()
+
+    # La transaction suivante ne les émet pas non plus
+    begin()
+    db.session.commit()
+    realtime.flush()
+    assert emitted == []
+
+
+def test_savepoint_rollback_keeps_earlier_events(emitted):
+    begin()
+    realtime.dispatch('room_savepoint', 'ping', {'n': 1})
+    savepoint = db.session.begin_nested()
+    savepoint.rollback()
+    db.session.commit()
+
+    realtime.flush()
+    assert emitted == [('ping', {'n': 1}, 'room_savepoint')]
+
+
+def test_events_to_the_same_room_are_coalesced(emitted):
+    for n in range(3):
+        begin()
+        realtime.dispatch('room_batch', 'ping', {'n': n})
+        db.session.commit()
+    realtime.dispatch('room_single', 'pong', {'n': 0})
+
+    realtime.flush()
+    assert sorted(emitted, key=lambda frame: frame[2]) == [
+        ('batch', [{'event': 'ping', 'data': {'n': n}} for n in range(3)], 'room_batch'),
+        ('pong', {'n': 0}, 'room_single'),
+    ]
+
+
+def test_without_window_each_commit_emits_at_once(emitted, monkeypatch):
+    monkeypatch.setattr(realtime, 'COALESCE_WINDOW', 0)
+    for n in range(2):
+        begin()
+        realtime.dispatch('room_direct', 'ping', {'n': n})
+        db.session.commit()
+        assert emitted[-1] == ('ping', {'n': n}, 'room_direct')
+    assert len(emitted) == 2
@@ -0,0 +1,108 @@
+"""Planificateur des rappels de session (services/reminders.py), piloté par
+une horloge fixe : `tick(now)`.
+
+Les sessions sont datées de 2001, à une date propre à chaque test : aucune
+session des autres tests (réservées à partir d'aujourd'hui) ne tombe dans
+les fenêtres du planificateur.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models.user import db
+from src.models.mentor import MentorSession, SessionReminder
+from src.models.notification import Notification
+from src.services.reminders import ReminderScheduler
+
+OFFSETS = [1440, 15]
+
+
+@pytest.fixture
+def make_session(app, make_user, make_mentor):
+    """Créer une session `scheduled` ; retourne son id."""
+    mentor_id, _, _ = make_mentor()
+    student_id, _ = make_user()
+
+    def make_session(session_date, duration_minutes=60, status='scheduled'):
+        with app.app_context():
+            session = MentorSession(mentor_id=mentor_id, student_id=student_id, session_date=session_date,
+                                    duration_minutes=duration_minutes, subject='Physique', status=status)
+            db.session.add(session)
+            db.session.commit()
+            return session.id
+
+    return make_session
+
+
+def tick(app, scheduler, now):
+    with app.app_context():
+        scheduler.tick(now)
+
+
+def sent(app, session_id):
+    """(décalages enregistrés, nombre de notifications de rappel)."""
+    with app.app_context():
+        offsets = sorted(row.offset_minutes for row in SessionReminder.query.filter_by(session_id=session_id))
+        notifications = Notification.query.filter_by(related_id=session_id, type='session_reminder').count()
+        return offsets, notifications
+
+
+def status_of(app, session_id):
+    with app.app_context():
+        return db.session.get(MentorSession, session_id).status
+
+
+def test_reminders_are_sent_once_across_schedulers(app, make_session):
+    start = datetime(2001, 3, 10, 10, 0)
+    session_id = make_session(start)
+
+    first = ReminderScheduler(offsets=OFFSETS)
+    tick(app, first, start - timedelta(minutes=1440))
+    assert sent(app, session_id) == ([1440], 2)
+
+    # Redémarrage, ou second processus : le rappel n'est pas renvoyé
+    second = ReminderScheduler(offsets=OFFSETS)
+    tick(app, second, start - timedelta(minutes=1440))
+    tick(app, first, start - timedelta(minutes=1430))
+    assert sent(app, session_id) == ([1440], 2)
+
+    for scheduler in (first, second):
+        tick(app, scheduler, start - timedelta(minutes=15))
+    assert sent(app, session_id) == ([15, 1440], 4)
+
+
+def test_late_reminders_are_dropped(app, make_session):
+    start = datetime(2001, 2, 10, 10, 0)
+    # Réservée une heure avant le début : le rappel de la veille est passé
+    session_id = make_session(start)
+
+    scheduler = ReminderScheduler(offsets=OFFSETS)
+    tick(app, scheduler, start - timedelta(minutes=60))
+    assert sent(app, session_id) == ([], 0)
+
+    tick(app, scheduler, start - timedelta(minutes=15))
+    assert sent(app, session_id) == ([15], 2)
+
+
+def test_reminder_within_lateness_is_still_sent(app, make_session):
+    start = datetime(2001, 2, 20, 10, 0)
+    session_id = make_session(start)
+
+    # Interruption de dix minutes après l'heure du rappel
+    tick(app, ReminderScheduler(offsets=OFFSETS), start - timedelta(minutes=5))
+    assert sent(app, session_id) == ([15], 2)
+
+
+def test_past_sessions_are_completed(app, make_session):
+    start = datetime(2001, 1, 10, 10, 0)
+    session_id = make_session(start, duration_minutes=90)
+    no_show_id = make_session(start, status='no_show')
+
+    # Fin à 11h30, clôture une heure plus tard
+    tick(app, ReminderScheduler(offsets=OFFSETS), start + timedelta(minutes=149))
+    assert status_of(app, session_id) == 'scheduled'
+
+    tick(app, ReminderScheduler(offsets=OFFSETS), start + timedelta(minutes=150))
+    assert status_of(app, session_id) == 'completed'
+    assert status_of(app, no_show_id) == 'no_show'
+    assert sent(app, session_id) == ([], 0)
@@ -0,0 +1,91 @@
+"""Cache des plannings de mentors (services/schedule_cache.py) : diffusion
+des invalidations aux autres workers et compteurs de génération bornés."""
+import json
+from datetime import datetime
+
+import pytest
+
+from src.services import broadcast, schedule_cache, slots
+
+
+class FakeQueue:
+    def __init__(self):
+        self.messages = []
+
+    def publish(self, channel, message):
+        self.messages.append(json.loads(message))
+
+    def published(self, topic):
+        return [message['value'] for message in self.messages if message['topic'] == topic]
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    queue = FakeQueue()
+    monkeypatch.setattr(broadcast, '_get_client', lambda: queue)
+    return queue
+
+
+def load(app, mentor_id):
+    with app.app_context():
+        return schedule_cache.get_schedule(mentor_id, 0)
+
+
+def from_other_worker(mentor_id):
+    broadcast._receive(json.dumps({'origin': 'other-worker', 'topic': 'schedule', 'value': mentor_id}))
+
+
+def test_invalidation_is_published_to_other_workers(app, make_mentor, queue):
+    mentor_id, _, _ = make_mentor()
+    load(app, mentor_id)
+
+    schedule_cache.invalidate_schedule(mentor_id)
+    assert schedule_cache._cache.get(mentor_id) is None
+    assert queue.published('schedule') == [mentor_id]
+
+
+def test_booking_keeps_the_local_entry_and_invalidates_the_others(app, make_mentor, queue):
+    mentor_id, _, _ = make_mentor()
+    load(app, mentor_id)
+    start = slots.to_minutes(datetime.now()) + 60
+
+    schedule_cache.add_booking(mentor_id, start, start + 60)
+    assert (start, start + 60) in schedule_cache._cache.get(mentor_id).busy
+    assert queue.published('schedule') == [mentor_id]
+
+
+def test_invalidation_from_another_worker_drops_the_entry(app, make_mentor):
+    mentor_id, _, _ = make_mentor()
+    load(app, mentor_id)
+    assert schedule_cache._cache.get(mentor_id) is not None
+
+    from_other_worker(mentor_id)
+    assert schedule_cache._cache.get(mentor_id) is None
+
+
+def test_load_overtaken_by_an_invalidation_is_not_cached(app, make_mentor, monkeypatch):
+    mentor_id, _, _ = make_mentor()
+    schedule_cache.invalidate_schedule(mentor_id)
+    load_schedule = schedule_cache._load_schedule
+
+    def invalidated_while_loading(*args):
+        schedule = load_schedule(*args)
+        from_other_worker(mentor_id)
+        return schedule
+
+    monkeypatch.setattr(schedule_cache, '_load_schedule', invalidated_while_loading)
+    assert load(app, mentor_id) is not None
+    assert schedule_cache._cache.get(mentor_id) is None
+
+
+def test_generations_only_exist_during_loads(app, make_mentor):
+    mentor_ids = [make_mentor()[0] for _ in range(3)]
+    for mentor_id in mentor_ids:
+        load(app, mentor_id)
+        schedule_cache.invalidate_schedule(mentor_id)
+        schedule_cache.add_booking(mentor_id, 0, 60)
+    # Mentor inexistant : rien n'est conservé non plus
+    assert load(app, max(mentor_ids) + 1000) is None
+
+    assert not set(mentor_ids) & schedule_cache._generations.keys()
+    assert max(mentor_ids) + 1000 not in schedule_cache._generations
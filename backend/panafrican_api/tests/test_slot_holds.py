@@ -0,0 +1,68 @@
+"""Blocages de créneaux convertis en session à la réservation."""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.models.mentor import MentorSession
+from src.services import holds
+
+
+@pytest.fixture
+def held_slot(client, make_user, make_mentor):
+    mentor_id, _, _ = make_mentor()
+    _, student = make_user()
+    slot = (datetime.now() + timedelta(days=4)).replace(hour=15, minute=0, second=0, microsecond=0)
+    response = client.post(f'/api/mentors/{mentor_id}/holds', headers=student,
+                           json={'session_date': slot.isoformat(), 'duration_minutes': 60})
+    assert response.status_code == 201
+    return mentor_id, student, slot, response.json['hold']['id']
+
+
+@pytest.fixture
+def failing_commit():
+    """Faire échouer le prochain commit qui crée une session."""
+    def fail(session):
+        if any(isinstance(obj, MentorSession) for obj in session.identity_map.values()):
+            raise RuntimeError('échec simulé du commit')
+
+    event.listen(Session, 'before_commit', fail)
+    yield
+    event.remove(Session, 'before_commit', fail)
+
+
+def book(client, mentor_id, headers, payload):
+    return client.post(f'/api/mentors/{mentor_id}/book', headers=headers,
+                       json=dict({'subject': 'Géométrie'}, **payload))
+
+
+def test_failed_booking_keeps_the_hold(app, client, make_user, held_slot, failing_commit):
+    mentor_id, student, slot, hold_id = held_slot
+
+    assert book(client, mentor_id, student, {'hold_id': hold_id}).status_code == 500
+
+    with app.app_context():
+        assert holds.get_hold(hold_id) is not None
+    _, other = make_user()
+    assert book(client, mentor_id, other, {'session_date': slot.isoformat()}).status_code == 409
+
+
+def test_successful_booking_releases_the_hold(app, client, held_slot):
+    mentor_id, student, _, hold_id = held_slot
+
+    response = book(client, mentor_id, student, {'hold_id': hold_id})
+
+    assert response.status_code == 201
+    with app.app_context():
+        assert holds.get_hold(hold_id) is None
+    assert book(client, mentor_id, student, {'hold_id': hold_id}).status_code == 410
+
+
+def test_released_hold_frees_the_slot(app, client, make_user, held_slot):
+    mentor_id, student, slot, hold_id = held_slot
+
+    assert client.delete(f'/api/mentors/holds/{hold_id}', headers=student).status_code == 200
+
+    _, other = make_user()
+    assert book(client, mentor_id, other, {'session_date': slot.isoformat()}).status_code == 201
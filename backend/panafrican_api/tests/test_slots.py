@@ -0,0 +1,152 @@
+"""Propriétés du calcul des créneaux (services/slots.py) sur des agendas aléatoires.
+
+Les résultats sont comparés à une référence minute par minute et, sur des
+données alignées sur la grille de 30 minutes, à l'algorithme d'origine de
+`get_available_slots` (pas de 30 minutes, créneaux réservés indexés par
+leur heure de début).
+"""
+import random
+from datetime import datetime, time
+
+import pytest
+
+from src.services import slots
+from src.services.slots import AvailabilityWindow
+
+DAY = slots.MINUTES_PER_DAY
+MONDAY = slots.to_minutes(datetime(2025, 1, 6))
+TRIALS = 300
+
+
+def random_schedule(rng, aligned):
+    unit = 30 if aligned else 1
+    availabilities = []
+    for _ in range(rng.randint(0, 8)):
+        begin = rng.randrange(0, (DAY - 1) // unit) * unit
+        finish = rng.randint(begin // unit + 1, (DAY - 1) // unit) * unit
+        availabilities.append(AvailabilityWindow(
+            rng.randrange(7), time(begin // 60, begin % 60), time(finish // 60, finish % 60)
+        ))
+
+    days = rng.randint(1, 14)
+    start = MONDAY + rng.randrange(7) * DAY + (0 if aligned else rng.randrange(DAY))
+    end = start + days * DAY
+    busy = []
+    for _ in range(rng.randint(0, 20)):
+        begin = rng.randrange(start - DAY, end) // unit * unit
+        busy.append((begin, begin + rng.randint(1, 240 // unit) * unit))
+    return availabilities, busy, start, end
+
+
+def reference_slots(availabilities, busy, start, end, duration, step):
+    """Créneaux calculés minute par minute."""
+    week = [bytearray(DAY) for _ in range(7)]
+    for av in availabilities:
+        begin = av.start_time.hour * 60 + av.start_time.minute
+        finish = av.end_time.hour * 60 + av.end_time.minute
+        week[av.day_of_week][begin:finish] = b'\x01' * (finish - begin)
+
+    free = bytearray(end - start)
+    for minute in range(start, end):
+        free[minute - start] = week[(minute // DAY + 3) % 7][minute % DAY]
+    for begin, finish in busy:
+        begin, finish = max(begin, start), min(finish, end)
+        if begin < finish:
+            free[begin - start:finish - start] = bytes(finish - begin)
+
+    prefix = [0]
+    for value in free:
+        prefix.append(prefix[-1] + value)
+    return [
+        minute for minute in range(start, end - duration + 1)
+        if minute % DAY % step == 0 and prefix[minute - start + duration] - prefix[minute - start] == duration
+    ]
+
+
+def legacy_slots(availabilities, busy, start, end, duration):
+    """Algorithme d'origine, transposé en minutes (pas fixe de 30 minutes)."""
+    booked = set()
+    for begin, finish in busy:
+        current = begin
+        while current < finish:
+            booked.add(current)
+            current += 30
+
+    result = []
+    for day in range(start // DAY, end // DAY):
+        for av in availabilities:
+            if av.day_of_week != (day + 3) % 7:
+                continue
+            current = day * DAY + av.start_time.hour * 60 + av.start_time.minute
+            finish = day * DAY + av.end_time.hour * 60 + av.end_time.minute
+            while current + duration <= finish:
+                if current not in booked:
+                    result.append(current)
+                current += 30
+    return result
+
+
+def compute(availabilities, busy, start, end, duration, step):
+    free = slots.free_intervals(availabilities, busy, start, end)
+    return free, list(slots.slot_starts(free, duration, step))
+
+
+def assert_merged(intervals, start=None, end=None):
+    for begin, finish in intervals:
+        assert begin < finish
+        if start is not None:
+            assert start <= begin and finish <= end
+    for (_, previous_end), (begin, _) in zip(intervals, intervals[1:]):
+        # Triés, disjoints et non contigus
+        assert previous_end < begin
+
+
+@pytest.mark.parametrize('aligned', [True, False], ids=['aligned', 'unaligned'])
+def test_slots_match_minute_by_minute_reference(aligned):
+    rng = random.Random(12 if aligned else 34)
+    for _ in range(TRIALS):
+        availabilities, busy, start, end = random_schedule(rng, aligned)
+        duration = rng.choice([15, 30, 45, 60, 90]) if aligned else rng.randint(1, 180)
+        step = rng.choice([10, 15, 30, 60]) if aligned else rng.randint(1, 90)
+
+        free, starts = compute(availabilities, busy, start, end, duration, step)
+
+        assert_merged(free, start, end)
+        assert starts == sorted(set(starts))
+        for slot in starts:
+            assert slot % DAY % step == 0
+            assert not any(begin < slot + duration and slot < finish for begin, finish in busy)
+            assert any(begin <= slot and slot + duration <= finish for begin, finish in free)
+        assert starts == reference_slots(availabilities, busy, start, end, duration, step)
+
+
+def test_slots_match_legacy_algorithm_on_aligned_schedules():
+    rng = random.Random(56)
+    for _ in range(TRIALS):
+        availabilities, busy, start, end = random_schedule(rng, aligned=True)
+        _, starts = compute(availabilities, busy, start, end, 30, 30)
+        assert starts == sorted(set(legacy_slots(availabilities, busy, start, end, 30)))
+
+
+def test_unaligned_booking_blocks_every_overlapping_slot():
+    availabilities = [AvailabilityWindow(0, time(9, 0), time(12, 0))]
+    # Session de 10h10 à 10h40 : l'ancien calcul proposait encore 10h30
+    busy = [(MONDAY + 10 * 60 + 10, MONDAY + 10 * 60 + 40)]
+    _, starts = compute(availabilities, busy, MONDAY, MONDAY + DAY, 30, 30)
+    assert [(slot - MONDAY) / 60 for slot in starts] == [9, 9.5, 11, 11.5]
+
+
+def test_merge_and_subtract_intervals_properties():
+    rng = random.Random(78)
+    for _ in range(TRIALS):
+        intervals = [(a, a + rng.randint(0, 50)) for a in (rng.randrange(1000) for _ in range(rng.randint(0, 30)))]
+        busy = [(a, a + rng.randint(1, 50)) for a in (rng.randrange(1000) for _ in range(rng.randint(0, 30)))]
+        merged = slots.merge_intervals(intervals)
+        assert_merged(merged)
+        covered = {m for begin, finish in intervals for m in range(begin, finish)}
+        assert {m for begin, finish in merged for m in range(begin, finish)} == covered
+
+        remaining = slots.subtract_intervals(merged, slots.merge_intervals(busy))
+        assert_merged(remaining)
+        blocked = {m for begin, finish in busy for m in range(begin, finish)}
+        assert {m for begin, finish in remaining for m in range(begin, finish)} == covered - blocked
@@ -0,0 +1,61 @@
+"""Tampon des votes chauds (services/votes.py) et transactions annulées."""
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.models.user import db
+from src.models.question import Question, QuestionVote
+from src.services.votes import VoteBuffer, vote_buffer
+
+
+@pytest.fixture
+def question_id(client, make_user):
+    _, author = make_user()
+    response = client.post('/api/questions', headers=author, json={
+        'title': 'Intégrales', 'content': 'Comment intégrer par parties ?', 'subject': 'Mathématiques', 'level': 'Lycée'
+    })
+    assert response.status_code == 201
+    return response.json['question']['id']
+
+
+@pytest.fixture
+def failing_vote_commit():
+    """Faire échouer les commits qui écrivent un vote."""
+    def fail(session):
+        if any(isinstance(obj, QuestionVote) for obj in session.new):
+            raise RuntimeError('échec simulé du commit')
+
+    event.listen(Session, 'before_commit', fail)
+    yield
+    event.remove(Session, 'before_commit', fail)
+
+
+@pytest.mark.parametrize('commit', [True, False], ids=['commit', 'rollback'])
+def test_hot_delta_waits_for_the_commit(app, question_id, commit):
+    buffer = VoteBuffer(hot_threshold=1)
+    with app.app_context():
+        db.session.get(Question, question_id)
+        assert buffer.apply(Question, question_id, 1)
+        assert buffer.pending(Question, question_id) == 0
+        if commit:
+            db.session.commit()
+        else:
+            db.session.rollback()
+        assert buffer.pending(Question, question_id) == (1 if commit else 0)
+
+
+def test_failed_hot_vote_leaves_no_delta(app, client, make_user, question_id, request):
+    url = f'/api/questions/{question_id}/vote'
+    # Assez de votes pour que la question devienne une clé chaude
+    for _ in range(8):
+        assert client.post(url, headers=make_user()[1], json={'type': 'up'}).status_code == 200
+    assert vote_buffer.pending(Question, question_id) > 0
+
+    request.getfixturevalue('failing_vote_commit')
+    assert client.post(url, headers=make_user()[1], json={'type': 'up'}).status_code == 500
+
+    with app.app_context():
+        vote_buffer.flush()
+        assert vote_buffer.pending(Question, question_id) == 0
+        assert db.session.get(Question, question_id).votes == 8
+        assert QuestionVote.query.filter_by(question_id=question_id).count() == 8
@@ -32,9 +32,8 @@ const MessagesPage = ({ initialConversationId = null }) => {
         if (user) {
             fetchConversations();
 
-            socket.connect();
-            socket.emit('join', { user_id: user.id });
-
+            // La connexion est ouverte par NotificationProvider ; le serveur
+            // place le socket dans la salle de l'utilisateur
             const handleNewMessage = (newMessage) => {
                 fetchConversations(); // Re-fetch conversations to get the latest state
             };
@@ -43,8 +42,6 @@ const MessagesPage = ({ initialConversationId = null }) => {
 
             return () => {
                 socket.off('new_message', handleNewMessage);
-                socket.emit('leave', { user_id: user.id });
-                socket.disconnect();
             };
         }
     }, [user]);
@@ -1,5 +1,6 @@
 import React, { createContext, useContext, useState, useEffect, useCallback } from 'react';
 import { notificationsService } from '../services/api';
+import { socket } from '../services/socket';
 import { useAuth } from './AuthContext';
 
 const NotificationContext = createContext();
@@ -34,11 +35,33 @@ export const NotificationProvider = ({ children }) => {
     }
   }, [isAuthenticated, fetchNotifications]);
 
+  // Notifications and unread count are pushed by the server (rooms user_<id>)
+  useEffect(() => {
+    if (!isAuthenticated) return;
+
+    const handleNotification = (notification) => {
+      setNotifications(prev => [notification, ...prev.filter(n => n.id !== notification.id)]);
+    };
+    const handleUnreadCount = ({ unread_count }) => {
+      setUnreadCount(unread_count);
+    };
+
+    socket.on('notification', handleNotification);
+    socket.on('unread_count', handleUnreadCount);
+    socket.connect();
+
+    return () => {
+      socket.off('notification', handleNotification);
+      socket.off('unread_count', handleUnreadCount);
+      socket.disconnect();
+    };
+  }, [isAuthenticated]);
+
   const markAsRead = async (notificationId) => {
     try {
       await notificationsService.markAsRead(notificationId);
       setNotifications(prev => prev.filter(n => n.id !== notificationId));
-      setUnreadCount(prev => prev - 1);
+      setUnreadCount(prev => Math.max(prev - 1, 0));
     } catch (error) {
       console.error("Failed to mark notification as read:", error);
     }
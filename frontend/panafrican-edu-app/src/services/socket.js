@@ -1,7 +1,29 @@
 import { io } from 'socket.io-client';
 
 const URL = 'http://localhost:5000'; // Your backend URL
+const HEARTBEAT_INTERVAL = 30000; // Must stay below the server presence TTL (90s)
 
 export const socket = io(URL, {
-    autoConnect: false
+    autoConnect: false,
+    // The server authenticates the connection with the same JWT as the REST API
+    auth: (cb) => cb({ token: localStorage.getItem('authToken') })
+});
+
+let heartbeat = null;
+
+socket.on('connect', () => {
+    clearInterval(heartbeat);
+    heartbeat = setInterval(() => socket.emit('heartbeat'), HEARTBEAT_INTERVAL);
+});
+
+socket.on('disconnect', () => {
+    clearInterval(heartbeat);
+    heartbeat = null;
+});
+
+// The server coalesces events sent to the same room into a single `batch` frame
+socket.on('batch', (events) => {
+    events.forEach(({ event, data }) => {
+        socket.listeners(event).forEach((listener) => listener(data));
+    });
 });